@@ -1,6 +1,8 @@
 """
 Configuration générale de l'application
 """
+import os
+import tempfile
 
 class AppConfig:
     """Configuration centralisée de l'application"""
@@ -19,6 +21,131 @@ class AppConfig:
     PASSWORD_MIN_LENGTH = 6
     USERNAME_MIN_LENGTH = 3
 
+    # Nombre maximal de mouvements par lot (POST /produits/stock)
+    STOCK_BATCH_MAX_ITEMS = 1000
+
+    # Nombre maximal d'IDs par instruction SQL pour les opérations groupées
+    BATCH_CHUNK_SIZE = 1000
+
+    # Recherche de produits
+    SEARCH_MAX_RESULTS = 100
+    AUTOCOMPLETE_MAX_RESULTS = 10
+
+    # Instantané en colonnes du catalogue (statistiques)
+    # Intervalle (secondes) entre deux rafraîchissements incrémentaux
+    SNAPSHOT_REFRESH_INTERVAL = float(os.environ.get("SNAPSHOT_REFRESH_INTERVAL", "30"))
+    # Recouvrement (secondes) du marqueur updated_at, pour les transactions validées en retard
+    SNAPSHOT_WATERMARK_OVERLAP = 60
+    # Retard maximal (secondes) de l'instantané sur les écritures : rafraîchi en tâche de fond
+    # dans ce délai, une lecture ne le rafraîchit elle-même qu'au-delà
+    SNAPSHOT_MAX_STALENESS = float(os.environ.get("SNAPSHOT_MAX_STALENESS", "2"))
+
+    # Regroupement des lectures identiques concurrentes (single-flight)
+    # Délai d'attente (secondes) du résultat partagé, par espace de noms de clé
+    SINGLE_FLIGHT_TIMEOUTS = {"produit": 5.0, "produits": 15.0}
+    SINGLE_FLIGHT_DEFAULT_TIMEOUT = 10.0
+
+    # Diffusion des modifications du catalogue entre les workers d'une même machine
+    # Répertoire des sockets Unix des workers et du compteur de version partagé
+    CATALOG_EVENTS_DIR = os.environ.get(
+        "CATALOG_EVENTS_DIR", os.path.join(tempfile.gettempdir(), "m1de-catalog-events")
+    )
+
+    # Flux des modifications du catalogue (Server-Sent Events, /produits/events)
+    # Événements gardés par worker pour la reprise avec Last-Event-ID
+    CATALOG_FEED_BUFFER_SIZE = 1000
+    # Événements en attente par abonné avant de le déconnecter (il reprendra avec Last-Event-ID)
+    CATALOG_FEED_QUEUE_SIZE = 100
+    # Intervalle (secondes) des commentaires de maintien de connexion
+    CATALOG_FEED_HEARTBEAT = 15.0
+    # Nombre maximal d'abonnés par worker
+    CATALOG_FEED_MAX_SUBSCRIBERS = int(os.environ.get("CATALOG_FEED_MAX_SUBSCRIBERS", "5000"))
+    # Délai de reconnexion (millisecondes) indiqué aux clients
+    CATALOG_FEED_RETRY_MS = 3000
+
+    # Écriture groupée des ajouts de produits (group commit), désactivée par défaut
+    # Les ajouts concurrents arrivés pendant la fenêtre partagent un INSERT et un commit
+    GROUP_COMMIT_ENABLED = os.environ.get("GROUP_COMMIT", "0") == "1"
+    GROUP_COMMIT_WINDOW_MS = float(os.environ.get("GROUP_COMMIT_WINDOW_MS", "5"))
+    GROUP_COMMIT_MAX_ROWS = int(os.environ.get("GROUP_COMMIT_MAX_ROWS", "100"))
+
+    # Nombre de threads pour les routes synchrones (par worker)
+    # Fixé par le lanceur de production (server.py) pour correspondre au pool MySQL
+    THREADPOOL_SIZE = int(os.environ.get("THREADPOOL_SIZE", "40"))
+
+    # Échéance des requêtes HTTP (secondes), propagée aux instructions SQL
+    REQUEST_TIMEOUT = float(os.environ.get("REQUEST_TIMEOUT", "10"))
+    # Durées propres à certaines routes : courtes pour les pages unitaires, longues pour les
+    # statistiques dont le premier appel charge tout le catalogue
+    REQUEST_TIMEOUTS = {
+        "view_produit": 2.0,
+        "autocomplete_produits": 1.0,
+        "analytics_prix": 60.0,
+        "analytics_stock": 60.0,
+        "analytics_valeur": 60.0
+    }
+
+    # Délestage : requêtes traitées simultanément par worker, au-delà file d'attente bornée puis 503
+    # Limite globale fixée par variable d'environnement ; sinon (None) taille du threadpool et du pool
+    # MySQL, lue au démarrage de chaque worker, après le dimensionnement du lanceur (server.py)
+    CONCURRENCY_GLOBAL_LIMIT = (
+        int(os.environ["CONCURRENCY_GLOBAL_LIMIT"]) if os.environ.get("CONCURRENCY_GLOBAL_LIMIT") else None
+    )
+    # Part de la limite globale accordée aux routes coûteuses (bcrypt, lecture du catalogue)
+    CONCURRENCY_ROUTE_SHARES = {
+        "login_post": 0.25,
+        "register_post": 0.25,
+        "list_produits": 0.5,
+        "search_produits": 0.5
+    }
+    # Taille des files d'attente, en multiple de la limite
+    CONCURRENCY_QUEUE_FACTOR = 2
+    # Attente maximale (secondes) dans une file avant la réponse 503
+    CONCURRENCY_QUEUE_TIMEOUT = float(os.environ.get("CONCURRENCY_QUEUE_TIMEOUT", "2"))
+    # En-tête Retry-After (secondes) des réponses 503
+    CONCURRENCY_RETRY_AFTER = 1
+
+    # Profilage des requêtes à la demande (désactivé sans jeton ni échantillonnage)
+    # Jeton attendu dans l'en-tête X-Profile ou le paramètre ?profile=
+    PROFILING_TOKEN = os.environ.get("PROFILING_TOKEN", "")
+    # Part des requêtes profilées sans jeton (0 à 1)
+    PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+    # Intervalle d'échantillonnage des piles (millisecondes)
+    PROFILING_INTERVAL_MS = float(os.environ.get("PROFILING_INTERVAL_MS", "2"))
+    # Répertoire des profils (piles au format collapsed et résumé JSON)
+    PROFILING_DIR = os.environ.get("PROFILING_DIR", os.path.join(tempfile.gettempdir(), "m1de-profiles"))
+    # Profils simultanés au plus par worker
+    PROFILING_MAX_CONCURRENT = 2
+
+    # Journalisation structurée (JSON sur la sortie standard, écrit par un thread dédié)
+    # Niveau par défaut et niveaux par module ("models=WARNING,access=ERROR")
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+    LOG_LEVELS = os.environ.get("LOG_LEVELS", "")
+    # Enregistrements en attente d'écriture au plus par worker (au-delà, abandonnés et comptés)
+    LOG_QUEUE_SIZE = 10000
+    # Répétitions d'un même avertissement ou erreur écrites par fenêtre (secondes)
+    LOG_RATE_LIMIT_BURST = int(os.environ.get("LOG_RATE_LIMIT_BURST", "5"))
+    LOG_RATE_LIMIT_WINDOW = float(os.environ.get("LOG_RATE_LIMIT_WINDOW", "60"))
+
+    # Historique des stocks (migration 006)
+    # Intervalle (secondes) entre deux instantanés des stocks modifiés (0 : pas de maintenance)
+    STOCK_SNAPSHOT_INTERVAL = float(os.environ.get("STOCK_SNAPSHOT_INTERVAL", "3600"))
+    # Ancienneté (jours) au-delà de laquelle les mouvements couverts par un instantané sont supprimés
+    STOCK_MOVEMENT_RETENTION_DAYS = int(os.environ.get("STOCK_MOVEMENT_RETENTION_DAYS", "90"))
+    # Mouvements parcourus ou supprimés par transaction de maintenance
+    STOCK_LEDGER_BATCH_SIZE = 10000
+    # Ancienneté minimale (secondes) des mouvements pris par un instantané : un mouvement plus récent
+    # peut appartenir à une transaction pas encore validée (au-delà de l'échéance la plus longue des requêtes)
+    STOCK_SNAPSHOT_SAFETY_MARGIN = float(os.environ.get("STOCK_SNAPSHOT_SAFETY_MARGIN", "120"))
+    # Nombre maximal de mouvements renvoyés par /produits/{id}/stock.json
+    STOCK_HISTORY_MAX_ITEMS = 200
+
+    # Écriture différée des dates de connexion
+    # Délai maximal (secondes) avant qu'une connexion soit écrite en base
+    LAST_LOGIN_MAX_STALENESS = float(os.environ.get("LAST_LOGIN_MAX_STALENESS", "10"))
+    # Nombre d'utilisateurs en attente déclenchant une écriture anticipée
+    LAST_LOGIN_MAX_PENDING = int(os.environ.get("LAST_LOGIN_MAX_PENDING", "500"))
+
 
 # Instance globale de configuration
 app_config = AppConfig()
\ No newline at end of file
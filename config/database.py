@@ -4,9 +4,21 @@ Ce module gère la connexion à MySQL
 """
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector import errors
+from mysql.connector import pooling
 from contextlib import contextmanager
-from typing import Generator, Dict, Any
+from contextvars import ContextVar, Token
+from typing import Generator, Dict, Any, Optional, List, Tuple
+from starlette.requests import Request
+import itertools
+import logging
+import math
 import os
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
 
 
 class DatabaseConfig:
@@ -24,27 +36,531 @@ class DatabaseConfig:
         self.autocommit = False
         self.use_unicode = True
         self.sql_mode = 'STRICT_TRANS_TABLES,NO_ZERO_DATE,NO_ZERO_IN_DATE,ERROR_FOR_DIVISION_BY_ZERO'
+        # Taille du pool de connexions par worker (0 = une connexion par requête)
+        # Fixée par le lanceur de production (server.py) via DB_POOL_SIZE
+        self.pool_size = int(os.environ.get("DB_POOL_SIZE", "0"))
+        # Attente maximale (secondes) d'une connexion libre quand le pool est épuisé
+        self.pool_timeout = float(os.environ.get("DB_POOL_TIMEOUT", "5"))
+        # Réplicas en lecture, "hôte:port,hôte:port" (vide = tout sur le primaire)
+        self.replicas = parse_hosts(os.environ.get("DB_REPLICAS", ""), self.port)
+        # Choix du réplica : "round_robin" ou "least_connections"
+        self.replica_selection = os.environ.get("DB_REPLICA_SELECTION", "round_robin")
+        # Intervalle (secondes) entre deux vérifications de santé des réplicas
+        self.replica_check_interval = float(os.environ.get("DB_REPLICA_CHECK_INTERVAL", "5"))
+        # Durée (secondes) pendant laquelle une session lit sur le primaire après une écriture
+        self.read_your_writes_window = float(os.environ.get("DB_READ_YOUR_WRITES_WINDOW", "5"))
+        # Serveur ("mariadb" ou "mysql") : syntaxe des limites de durée par instruction
+        self.flavor = os.environ.get("DB_FLAVOR", "mariadb")
+        # Délai (secondes) des opérations réseau : filet de sécurité si le serveur ne répond plus
+        self.socket_timeout = int(os.environ.get("DB_SOCKET_TIMEOUT", "60"))
     
-    def get_connection_params(self) -> dict:
-        """Retourne les paramètres de connexion MySQL sécurisés"""
+    def get_connection_params(self, host: Optional[str] = None, port: Optional[int] = None) -> dict:
+        """
+        Retourne les paramètres de connexion MySQL sécurisés
+        
+        Args:
+            host: Hôte d'un réplica (primaire par défaut)
+            port: Port d'un réplica (primaire par défaut)
+        """
         return {
             "database": self.database,
             "user": self.user,
             "password": self.password,
-            "host": self.host,
-            "port": self.port,
+            "host": host or self.host,
+            "port": port or self.port,
             "charset": self.charset,
             "autocommit": self.autocommit,
             "use_unicode": self.use_unicode,
             "sql_mode": self.sql_mode,
+            "connection_timeout": self.socket_timeout,
             "raise_on_warnings": True,
             "get_warnings": True
         }
 
 
+def parse_hosts(value: str, default_port: int) -> List[Tuple[str, int]]:
+    """
+    Lit une liste "hôte:port,hôte" en [(hôte, port)]
+    
+    Args:
+        value: Liste séparée par des virgules
+        default_port: Port des hôtes sans port
+    """
+    hosts = []
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        host, _, port = item.partition(":")
+        hosts.append((host, int(port) if port else default_port))
+    return hosts
+
+
 # Instance globale de configuration
 db_config = DatabaseConfig()
 
+# Pool de connexions du processus courant, créé à la première utilisation
+# (jamais avant le fork des workers, même avec le préchargement de l'application)
+_pool: Optional[pooling.MySQLConnectionPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+# Connexions du pool disponibles : une requête attend qu'une connexion soit rendue
+# (le pool de mysql-connector échoue immédiatement quand il est vide)
+_pool_slots: Optional[threading.BoundedSemaphore] = None
+
+
+def _get_pool() -> pooling.MySQLConnectionPool:
+    """
+    Retourne le pool de connexions du processus courant
+
+    Un nouveau pool est créé après un fork : les connexions ne sont jamais
+    partagées entre le processus maître et les workers.
+    """
+    global _pool, _pool_pid, _pool_slots
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = pooling.MySQLConnectionPool(
+                pool_name=f"app_pool_{os.getpid()}",
+                pool_size=db_config.pool_size,
+                **db_config.get_connection_params()
+            )
+            _pool_slots = threading.BoundedSemaphore(db_config.pool_size)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+class PooledConnection:
+    """Connexion empruntée au pool : la fermer la rend au pool et libère sa place"""
+
+    def __init__(self, connection: Any, slots: threading.BoundedSemaphore):
+        self._connection = connection
+        self._slots: Optional[threading.BoundedSemaphore] = slots
+
+    def close(self) -> None:
+        slots, self._slots = self._slots, None
+        if slots is None:
+            return
+        try:
+            self._connection.close()
+        finally:
+            slots.release()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+
+def close_connection(connection: Any) -> None:
+    """
+    Ferme (ou rend au pool) une connexion, même coupée
+
+    Ne pas tester is_connected() avant : une connexion du pool perdue pendant son
+    usage (redémarrage MySQL, wait_timeout) doit tout de même rendre sa place.
+    """
+    if connection is None:
+        return
+    try:
+        connection.close()
+    except Error as e:
+        logger.warning("Erreur lors de la fermeture d'une connexion MySQL: %s", e)
+
+
+def open_connection() -> mysql.connector.MySQLConnection:
+    """
+    Ouvre une connexion MySQL, depuis le pool s'il est configuré
+
+    Pool épuisé : attend qu'une connexion soit rendue, au plus db_config.pool_timeout
+    secondes et jamais au-delà de l'échéance de la requête HTTP. Fermer une connexion
+    issue du pool la rend au pool.
+
+    Raises:
+        mysql.connector.errors.PoolError: Si aucune connexion ne s'est libérée à temps
+    """
+    if db_config.pool_size <= 0:
+        return mysql.connector.connect(**db_config.get_connection_params())
+    pool = _get_pool()
+    slots = _pool_slots
+    timeout = db_config.pool_timeout
+    remaining = remaining_time()
+    if remaining is not None:
+        timeout = max(0.0, min(timeout, remaining))
+    if not slots.acquire(timeout=timeout):
+        raise mysql.connector.errors.PoolError(f"Pool de connexions épuisé après {timeout:.1f} s d'attente")
+    try:
+        return PooledConnection(pool.get_connection(), slots)
+    except BaseException:
+        slots.release()
+        raise
+
+
+class DeadlineExceeded(Exception):
+    """
+    Levée quand l'échéance de la requête HTTP est dépassée avant ou pendant une
+    instruction SQL
+
+    N'hérite pas de mysql.connector.Error : les modèles ne la confondent pas avec
+    un résultat vide et elle remonte jusqu'au gestionnaire enregistré dans main.py.
+    """
+
+
+# Échéance (time.monotonic()) de la requête HTTP en cours, posée par DeadlineMiddleware
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+# Erreurs MySQL/MariaDB provoquées par une limite de durée (ou la perte du socket)
+_DEADLINE_ERRNOS = {
+    1969,  # ER_STATEMENT_TIMEOUT (MariaDB, max_statement_time)
+    3024,  # ER_QUERY_TIMEOUT (MySQL, MAX_EXECUTION_TIME)
+    1205,  # ER_LOCK_WAIT_TIMEOUT
+    2013,  # CR_SERVER_LOST (délai du socket)
+}
+
+
+def set_deadline(seconds: Optional[float]) -> Token:
+    """
+    Pose l'échéance du contexte courant (requête HTTP)
+
+    Args:
+        seconds: Durée accordée à partir de maintenant (None = sans échéance)
+
+    Returns:
+        Jeton à passer à reset_deadline
+    """
+    return _deadline.set(None if seconds is None else time.monotonic() + seconds)
+
+
+def reset_deadline(token: Token) -> None:
+    """Rétablit l'échéance précédente"""
+    _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Secondes restantes avant l'échéance, ou None sans échéance"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class StatementStats:
+    """Instructions SQL exécutées pendant une requête HTTP et leur durée cumulée"""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Compteurs de la requête HTTP en cours, posés par AccessLogMiddleware ; l'objet est
+# partagé (et non copié) avec les threads du threadpool qui exécutent la requête
+_statement_stats: ContextVar[Optional[StatementStats]] = ContextVar("statement_stats", default=None)
+
+
+def set_statement_stats(stats: Optional[StatementStats]) -> Token:
+    """
+    Pose les compteurs d'instructions SQL du contexte courant (requête HTTP)
+
+    Args:
+        stats: Compteurs alimentés par DeadlineCursor (None = pas de mesure)
+
+    Returns:
+        Jeton à passer à reset_statement_stats
+    """
+    return _statement_stats.set(stats)
+
+
+def reset_statement_stats(token: Token) -> None:
+    """Rétablit les compteurs précédents"""
+    _statement_stats.reset(token)
+
+
+def apply_deadline(statement: str) -> str:
+    """
+    Borne la durée d'une instruction au temps restant avant l'échéance
+
+    MariaDB : SET STATEMENT max_statement_time (et innodb_lock_wait_timeout pour
+    les attentes de verrou) ; MySQL : indication MAX_EXECUTION_TIME (SELECT seulement).
+
+    Raises:
+        DeadlineExceeded: Si l'échéance est déjà passée
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return statement
+    if remaining <= 0:
+        raise DeadlineExceeded("Échéance dépassée avant l'instruction SQL")
+    # Affectation de variable (SET @x = ...) : instantanée, et SET STATEMENT ne s'y applique pas
+    if statement.lstrip()[:4].upper() == "SET ":
+        return statement
+    if db_config.flavor == "mysql":
+        if statement.lstrip()[:6].upper() == "SELECT":
+            head, _, rest = statement.lstrip().partition(" ")
+            return f"{head} /*+ MAX_EXECUTION_TIME({max(1, int(remaining * 1000))}) */ {rest}"
+        return statement
+    return (
+        f"SET STATEMENT max_statement_time={remaining:.3f}, "
+        f"innodb_lock_wait_timeout={max(1, math.ceil(remaining))} FOR {statement}"
+    )
+
+
+class DeadlineCursor:
+    """
+    Curseur dont les instructions respectent l'échéance de la requête HTTP
+
+    La durée de chaque instruction est ajoutée aux compteurs de la requête
+    (temps base de données du journal des accès).
+    """
+
+    def __init__(self, cursor: Any):
+        self._cursor = cursor
+
+    def execute(self, statement: str, params: Any = (), *args: Any, **kwargs: Any) -> Any:
+        stats = _statement_stats.get()
+        started = time.perf_counter() if stats is not None else 0.0
+        try:
+            return self._cursor.execute(apply_deadline(statement), params, *args, **kwargs)
+        except Error as e:
+            if e.errno in _DEADLINE_ERRNOS and remaining_time() is not None:
+                raise DeadlineExceeded(f"Échéance dépassée pendant l'instruction SQL: {e}") from e
+            raise
+        finally:
+            if stats is not None:
+                stats.count += 1
+                stats.seconds += time.perf_counter() - started
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+class DeadlineConnection:
+    """Connexion dont les curseurs respectent l'échéance de la requête HTTP"""
+
+    def __init__(self, connection: mysql.connector.MySQLConnection):
+        self._connection = connection
+
+    def cursor(self, *args: Any, **kwargs: Any) -> DeadlineCursor:
+        return DeadlineCursor(self._connection.cursor(*args, **kwargs))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+
+class ReplicaCursor(DeadlineCursor):
+    """
+    Curseur sur un réplica qui bascule sur le primaire quand une instruction échoue
+
+    L'instruction est relancée sur le primaire : si elle y réussit (ou si l'erreur
+    venait de la connexion), le réplica est écarté ; sinon l'erreur vient de
+    l'instruction elle-même et remonte au modèle sans écarter le réplica.
+    """
+
+    def __init__(self, cursor: Any, owner: 'LazyConnection', replica: 'Replica',
+                 cursor_args: Tuple, cursor_kwargs: Dict[str, Any]):
+        super().__init__(cursor)
+        self._owner: Optional[LazyConnection] = owner
+        self._replica = replica
+        self._cursor_args = cursor_args
+        self._cursor_kwargs = cursor_kwargs
+
+    def execute(self, statement: str, params: Any = (), *args: Any, **kwargs: Any) -> Any:
+        if self._owner is None:
+            return super().execute(statement, params, *args, **kwargs)
+        try:
+            return super().execute(statement, params, *args, **kwargs)
+        except Error as e:
+            replica_error = e
+        owner, self._owner = self._owner, None
+        owner.leave_replica(self._replica)
+        self._cursor = owner._get_connection().cursor(*self._cursor_args, **self._cursor_kwargs)
+        try:
+            result = super().execute(statement, params, *args, **kwargs)
+        except Error:
+            if is_connection_error(replica_error):
+                replica_set.eject(self._replica, replica_error)
+            raise
+        replica_set.eject(self._replica, replica_error)
+        return result
+
+
+class ReplicaConnection(DeadlineConnection):
+    """Connexion à un réplica prêtée à une LazyConnection, dont les curseurs basculent sur le primaire"""
+
+    def __init__(self, connection: mysql.connector.MySQLConnection, owner: 'LazyConnection', replica: 'Replica'):
+        super().__init__(connection)
+        self._owner = owner
+        self._replica = replica
+
+    def cursor(self, *args: Any, **kwargs: Any) -> ReplicaCursor:
+        return ReplicaCursor(self._connection.cursor(*args, **kwargs), self._owner, self._replica, args, kwargs)
+
+
+def is_connection_error(error: Error) -> bool:
+    """
+    True si l'erreur vient de la connexion (serveur injoignable, connexion perdue)
+    et non de l'instruction ; un pool épuisé n'est pas une panne du serveur
+    """
+    if isinstance(error, errors.PoolError):
+        return False
+    if isinstance(error, (errors.InterfaceError, errors.OperationalError)):
+        return True
+    # Erreurs client CR_* (2000-2999) : connexion impossible, perdue, serveur parti...
+    return error.errno is not None and 2000 <= error.errno < 3000
+
+
+class Replica:
+    """Réplica en lecture : état de santé, connexions en cours et pool propre au processus"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.healthy = True
+        # Connexions actuellement prêtées (sélection least_connections)
+        self.active = 0
+        self._pool: Optional[pooling.MySQLConnectionPool] = None
+        self._pool_pid: Optional[int] = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def open(self) -> mysql.connector.MySQLConnection:
+        """Ouvre une connexion au réplica, depuis son pool s'il est configuré"""
+        params = db_config.get_connection_params(self.host, self.port)
+        if db_config.pool_size <= 0:
+            return mysql.connector.connect(**params)
+        if self._pool is None or self._pool_pid != os.getpid():
+            # Premières lectures concurrentes : un seul pool par processus
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = pooling.MySQLConnectionPool(
+                        pool_name=f"replica_pool_{self.host}_{self.port}_{os.getpid()}",
+                        pool_size=db_config.pool_size,
+                        **params
+                    )
+                    self._pool_pid = os.getpid()
+        return self._pool.get_connection()
+
+    def ping(self) -> bool:
+        """Vérifie le réplica avec une connexion dédiée (hors pool)"""
+        connection = None
+        try:
+            params = db_config.get_connection_params(self.host, self.port)
+            params["connection_timeout"] = 2
+            connection = mysql.connector.connect(**params)
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Error:
+            return False
+        finally:
+            if connection and connection.is_connected():
+                connection.close()
+
+
+class ReplicaSet:
+    """
+    Répartit les lectures entre les réplicas en bonne santé
+
+    Un réplica injoignable est écarté dès l'échec d'une connexion ou d'une
+    lecture (ReplicaCursor) ; la vérification périodique le réintègre quand il
+    répond de nouveau (et écarte ceux qui ne répondent plus). Un réplica dont le
+    pool est épuisé est seulement sauté.
+    """
+
+    def __init__(self, hosts: List[Tuple[str, int]], selection: str, check_interval: float):
+        """
+        Args:
+            hosts: Réplicas (hôte, port)
+            selection: "round_robin" ou "least_connections"
+            check_interval: Intervalle (secondes) des vérifications de santé
+        """
+        self.replicas = [Replica(host, port) for host, port in hosts]
+        self.selection = selection
+        self.check_interval = check_interval
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _candidates(self) -> List[Replica]:
+        """Réplicas en bonne santé, dans l'ordre où les essayer"""
+        with self._lock:
+            healthy = [replica for replica in self.replicas if replica.healthy]
+            if not healthy:
+                return []
+            if self.selection == "least_connections":
+                return sorted(healthy, key=lambda replica: replica.active)
+            start = next(self._counter) % len(healthy)
+            return healthy[start:] + healthy[:start]
+
+    def acquire(self) -> Optional[Tuple[Replica, mysql.connector.MySQLConnection]]:
+        """
+        Ouvre une connexion vers un réplica
+
+        Returns:
+            (réplica, connexion), ou None si aucun réplica n'est disponible
+        """
+        for replica in self._candidates():
+            try:
+                connection = replica.open()
+            except Error as e:
+                if is_connection_error(e):
+                    self.eject(replica, e)
+                continue
+            with self._lock:
+                replica.active += 1
+            return replica, connection
+        return None
+
+    def release(self, replica: Replica, connection: mysql.connector.MySQLConnection) -> None:
+        """Ferme (ou rend au pool) une connexion obtenue par acquire"""
+        with self._lock:
+            replica.active -= 1
+        close_connection(connection)
+
+    def eject(self, replica: Replica, reason: Any = None) -> None:
+        """Écarte un réplica jusqu'à la prochaine vérification réussie"""
+        with self._lock:
+            was_healthy, replica.healthy = replica.healthy, False
+        if was_healthy:
+            logger.warning("Réplica %s écarté: %s", replica.name, reason)
+
+    def check(self) -> None:
+        """Vérifie chaque réplica : réintègre ceux qui répondent, écarte les autres"""
+        for replica in self.replicas:
+            if replica.ping():
+                if not replica.healthy:
+                    logger.info("Réplica %s réintégré", replica.name)
+                replica.healthy = True
+            else:
+                self.eject(replica, "vérification de santé en échec")
+
+    def start(self) -> None:
+        """Démarre les vérifications périodiques (à appeler dans chaque worker)"""
+        if not self.replicas or (self._thread and self._thread.is_alive()):
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-health-check", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Arrête les vérifications périodiques"""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.check_interval):
+            self.check()
+
+
+# Réplicas en lecture du processus courant
+replica_set = ReplicaSet(db_config.replicas, db_config.replica_selection, db_config.replica_check_interval)
+
+# Clé de session : date jusqu'à laquelle les lectures de la session restent sur le primaire
+SESSION_PRIMARY_UNTIL = "db_primary_until"
+
 
 @contextmanager
 def get_db_connection():
@@ -54,32 +570,165 @@ def get_db_connection():
     """
     connection = None
     try:
-        connection = mysql.connector.connect(**db_config.get_connection_params())
+        connection = open_connection()
         yield connection
     except Error as e:
-        print(f"Erreur de connexion MySQL: {e}")
+        logger.error("Erreur de connexion MySQL: %s", e)
         if connection and connection.is_connected():
             connection.rollback()
         raise
     finally:
-        if connection and connection.is_connected():
-            connection.close()
+        close_connection(connection)
+
+
+class ConnectionUnavailable(Exception):
+    """
+    Levée quand la connexion paresseuse ne peut pas être ouverte
+
+    N'hérite pas de mysql.connector.Error : les modèles, qui interceptent Error,
+    ne confondent pas une base injoignable avec un résultat vide.
+    """
+
+
+class LazyConnection:
+    """
+    Proxy de connexion MySQL ouvert au premier usage
+
+    Expose la même interface qu'une MySQLConnection (cursor, commit, rollback...) ;
+    une requête qui n'interroge pas la base ne prend jamais de connexion.
+    Les lectures passées par read_connection vont sur un réplica, sauf pendant
+    les secondes qui suivent une écriture de la même session.
+    """
+
+    def __init__(self, session: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            session: Session HTTP, qui retient la date de la dernière écriture
+        """
+        self._connection: Optional[mysql.connector.MySQLConnection] = None
+        self._replica: Optional[Replica] = None
+        self._replica_connection: Optional[mysql.connector.MySQLConnection] = None
+        self._replica_view: Optional[ReplicaConnection] = None
+        self._session = session
+        self._primary_pinned = False
+
+    @property
+    def acquired(self) -> bool:
+        """True si une connexion réelle a été ouverte"""
+        return self._connection is not None
+
+    def _get_connection(self) -> mysql.connector.MySQLConnection:
+        if self._connection is None:
+            try:
+                self._connection = open_connection()
+            except Error as e:
+                logger.error("Erreur de connexion MySQL: %s", e)
+                raise ConnectionUnavailable(str(e)) from e
+        return self._connection
+
+    def for_read(self) -> Any:
+        """
+        Connexion à utiliser pour une lecture
+
+        Returns:
+            Une connexion à un réplica, ou cette connexion (primaire) si aucun
+            réplica n'est disponible ou si la session vient d'écrire
+        """
+        if self.reads_primary or not replica_set.replicas:
+            return self
+        if self._replica_connection is None:
+            acquired = replica_set.acquire()
+            if acquired is None:
+                return self
+            self._replica, self._replica_connection = acquired
+            self._replica_view = ReplicaConnection(self._replica_connection, self, self._replica)
+        return self._replica_view
 
+    def leave_replica(self, replica: Replica) -> None:
+        """
+        Rend la connexion au réplica après une erreur (ReplicaCursor) : la lecture
+        suivante en prendra une autre, sur un réplica ou le primaire
+        """
+        if self._replica is replica and self._replica_connection is not None:
+            replica_set.release(self._replica, self._replica_connection)
+            self._replica = self._replica_connection = self._replica_view = None
 
-def get_db() -> Generator[mysql.connector.MySQLConnection, None, None]:
+    @property
+    def reads_primary(self) -> bool:
+        """True si les lectures doivent voir les écritures de la session (requête épinglée ou écriture récente)"""
+        if self._primary_pinned:
+            return True
+        return self._session is not None and self._session.get(SESSION_PRIMARY_UNTIL, 0) > time.time()
+
+    def pin_primary(self) -> None:
+        """Envoie toutes les lectures suivantes de la requête sur le primaire"""
+        self._primary_pinned = True
+
+    def cursor(self, *args: Any, **kwargs: Any) -> DeadlineCursor:
+        """Curseur sur le primaire, borné par l'échéance de la requête HTTP"""
+        return DeadlineCursor(self._get_connection().cursor(*args, **kwargs))
+
+    def commit(self) -> None:
+        """Valide la transaction et garde les lectures de la session sur le primaire"""
+        self._get_connection().commit()
+        self.mark_written()
+
+    def mark_written(self) -> None:
+        """
+        Garde les lectures de la requête et de la session sur le primaire
+
+        Appelé par commit, ou directement quand l'écriture a été validée par la
+        connexion d'une autre requête (écriture groupée).
+        """
+        self._primary_pinned = True
+        if self._session is not None:
+            self._session[SESSION_PRIMARY_UNTIL] = time.time() + db_config.read_your_writes_window
+
+    def __getattr__(self, name: str) -> Any:
+        # Appelé seulement pour les attributs absents du proxy (cursor, commit...)
+        return getattr(self._get_connection(), name)
+
+    def is_connected(self) -> bool:
+        """Indique si une connexion réelle est ouverte, sans en ouvrir une"""
+        return self._connection is not None and self._connection.is_connected()
+
+    def close(self) -> None:
+        """Ferme (ou rend au pool) les connexions qui ont été ouvertes"""
+        if self._replica_connection is not None:
+            replica_set.release(self._replica, self._replica_connection)
+            self._replica = self._replica_connection = self._replica_view = None
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            close_connection(connection)
+
+
+def read_connection(connection: Any) -> Any:
+    """
+    Connexion à utiliser pour une lecture (méthodes find_* des modèles)
+
+    Args:
+        connection: LazyConnection de la requête, ou connexion directe (scripts)
+
+    Returns:
+        Un réplica pour une LazyConnection qui le permet, sinon la connexion reçue
+    """
+    if isinstance(connection, LazyConnection):
+        return connection.for_read()
+    return connection
+
+
+def get_db(request: Request) -> Generator[LazyConnection, None, None]:
     """
     Dependency pour FastAPI
-    Fournit une connexion à la base de données MySQL qui sera fermée automatiquement
+    Fournit une connexion MySQL paresseuse : elle n'est ouverte qu'à la première
+    requête SQL et fermée automatiquement à la fin de la requête HTTP
     """
-    connection = None
+    connection = LazyConnection(request.scope.get("session"))
     try:
-        connection = mysql.connector.connect(**db_config.get_connection_params())
         yield connection
-    except Error as e:
-        print(f"Erreur de connexion MySQL: {e}")
-        if connection and connection.is_connected():
+    except (Error, DeadlineExceeded):
+        if connection.is_connected():
             connection.rollback()
         raise
     finally:
-        if connection and connection.is_connected():
-            connection.close()
\ No newline at end of file
+        connection.close()
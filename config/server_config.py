@@ -0,0 +1,159 @@
+"""
+Configuration du serveur de production
+Calcule ensemble le nombre de workers, la taille du threadpool et celle du pool
+de connexions MySQL à partir des cœurs, de la mémoire et de max_connections
+"""
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+
+class ServerConfig:
+    """Paramètres du lanceur de production (surchargeables par variables d'environnement)"""
+
+    HOST = os.environ.get("SERVER_HOST", "0.0.0.0")
+    PORT = int(os.environ.get("SERVER_PORT", "8000"))
+
+    # Limites de connexions HTTP
+    KEEPALIVE_SECONDS = int(os.environ.get("SERVER_KEEPALIVE", "5"))
+    BACKLOG = int(os.environ.get("SERVER_BACKLOG", "2048"))
+
+    # Arrêt et recyclage des workers
+    GRACEFUL_TIMEOUT = int(os.environ.get("SERVER_GRACEFUL_TIMEOUT", "30"))
+    WORKER_TIMEOUT = int(os.environ.get("SERVER_WORKER_TIMEOUT", "60"))
+    MAX_REQUESTS = int(os.environ.get("SERVER_MAX_REQUESTS", "10000"))
+    MAX_REQUESTS_JITTER = int(os.environ.get("SERVER_MAX_REQUESTS_JITTER", "1000"))
+
+    # Estimation de la mémoire résidente d'un worker (Mo) et marge laissée au système
+    WORKER_MEMORY_MB = int(os.environ.get("SERVER_WORKER_MEMORY_MB", "150"))
+    MEMORY_HEADROOM = 0.75
+
+    # Connexions MySQL réservées (administration, migrations, scripts)
+    DB_RESERVED_CONNECTIONS = int(os.environ.get("DB_RESERVED_CONNECTIONS", "10"))
+    # Valeur par défaut de max_connections sous MySQL/MariaDB
+    DB_DEFAULT_MAX_CONNECTIONS = 151
+    # Bornes du pool par worker (mysql-connector limite un pool à 32 connexions)
+    DB_POOL_MIN_PER_WORKER = 2
+    DB_POOL_MAX_PER_WORKER = 32
+    # Connexions du pool de chaque worker laissées aux threads de fond (dates de connexion,
+    # instantané des statistiques, historique des stocks, types de produits)
+    DB_BACKGROUND_CONNECTIONS = int(os.environ.get("DB_BACKGROUND_CONNECTIONS", "2"))
+
+
+server_config = ServerConfig()
+
+
+@dataclass(frozen=True)
+class ServerSizing:
+    """Résultat du dimensionnement du serveur"""
+    workers: int
+    threadpool_size: int
+    db_pool_size: int
+    max_connections: int
+
+    @property
+    def total_db_connections(self) -> int:
+        """Nombre maximal de connexions MySQL ouvertes par l'ensemble des workers"""
+        return self.workers * self.db_pool_size
+
+
+def available_cores() -> int:
+    """
+    Retourne le nombre de cœurs utilisables par le processus
+
+    Tient compte de l'affinité CPU (taskset, conteneurs) lorsque c'est possible
+    """
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+def available_memory_mb() -> Optional[int]:
+    """
+    Retourne la mémoire disponible en Mo
+
+    Utilise la limite cgroup v2 si elle est plus basse que la mémoire de l'hôte
+
+    Returns:
+        Mémoire disponible en Mo ou None si elle ne peut pas être déterminée
+    """
+    available = None
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    available = int(line.split()[1]) // 1024
+                    break
+    except OSError:
+        pass
+
+    try:
+        with open("/sys/fs/cgroup/memory.max") as cgroup_limit:
+            value = cgroup_limit.read().strip()
+        if value != "max":
+            limit = int(value) // (1024 * 1024)
+            available = limit if available is None else min(available, limit)
+    except (OSError, ValueError):
+        pass
+
+    return available
+
+
+def compute_sizing(max_connections: int,
+                   cores: Optional[int] = None,
+                   memory_mb: Optional[int] = None,
+                   workers: Optional[int] = None) -> ServerSizing:
+    """
+    Dimensionne workers, threadpool et pool MySQL de façon cohérente
+
+    Chaque requête synchrone occupe au plus un thread et une connexion, et la somme des
+    pools reste sous max_connections moins les connexions réservées. Les threads de fond
+    d'un worker (DB_BACKGROUND_CONNECTIONS) puisent dans le même pool que ses requêtes :
+    le threadpool a la taille du pool moins ces connexions, pour qu'un pool saturé par
+    les requêtes ne retarde pas l'écriture des dates de connexion ou de l'instantané.
+
+    Args:
+        max_connections: Valeur de max_connections du serveur MySQL
+        cores: Nombre de cœurs (détecté si None)
+        memory_mb: Mémoire disponible en Mo (détectée si None)
+        workers: Nombre de workers imposé (calculé si None)
+
+    Returns:
+        ServerSizing
+
+    Raises:
+        ValueError: si max_connections ne permet pas de servir un seul worker
+    """
+    cores = cores or available_cores()
+    if memory_mb is None:
+        memory_mb = available_memory_mb()
+
+    background = max(0, server_config.DB_BACKGROUND_CONNECTIONS)
+    # Au moins une connexion par worker pour les requêtes, en plus de celles des threads de fond
+    min_pool = max(server_config.DB_POOL_MIN_PER_WORKER, background + 1)
+
+    budget = max_connections - server_config.DB_RESERVED_CONNECTIONS
+    if budget < min_pool:
+        raise ValueError(
+            f"max_connections={max_connections} est insuffisant "
+            f"({server_config.DB_RESERVED_CONNECTIONS} connexions réservées)"
+        )
+
+    if workers is None:
+        workers = 2 * cores + 1
+        if memory_mb is not None:
+            by_memory = int(memory_mb * server_config.MEMORY_HEADROOM) // server_config.WORKER_MEMORY_MB
+            workers = min(workers, max(1, by_memory))
+
+    # Réduit le nombre de workers tant que chacun n'a pas son pool minimal
+    workers = max(1, min(workers, budget // min_pool))
+
+    pool_size = min(budget // workers, server_config.DB_POOL_MAX_PER_WORKER)
+
+    return ServerSizing(
+        workers=workers,
+        threadpool_size=pool_size - background,
+        db_pool_size=pool_size,
+        max_connections=max_connections,
+    )
@@ -0,0 +1,65 @@
+"""
+Contrôleur des statistiques du catalogue
+Calculées sur l'instantané en colonnes (NumPy), sans requête par appel
+"""
+from typing import Optional
+
+from fastapi import Depends, Query, status
+from fastapi.responses import JSONResponse
+from fastapi.templating import Jinja2Templates
+
+from config.database import get_db
+from services.catalog_snapshot_service import catalog_snapshot_service
+
+
+# Percentiles renvoyés par /produits/analytics/prix
+PRICE_PERCENTILES = (10, 25, 50, 75, 90, 99)
+
+# Périodes acceptées par /produits/analytics/valeur
+PERIODS = {"mois": "M", "annee": "Y"}
+
+
+class AnalyticsController:
+    """Contrôleur des statistiques du catalogue (API JSON)"""
+
+    def __init__(self, templates: Jinja2Templates):
+        self.templates = templates
+
+    def price_percentiles(self, type_p: Optional[str] = None, db=Depends(get_db)):
+        """
+        Percentiles du prix HT, pour tout le catalogue ou un type
+        """
+        snapshot = catalog_snapshot_service.get(db)
+        if snapshot is None:
+            return self._unavailable()
+        return JSONResponse({"type_p": type_p, **snapshot.price_percentiles(PRICE_PERCENTILES, type_p)})
+
+    def stock_histogram(self, bins: int = Query(20, ge=1, le=200), type_p: Optional[str] = None,
+                        db=Depends(get_db)):
+        """
+        Histogramme des quantités en stock
+        """
+        snapshot = catalog_snapshot_service.get(db)
+        if snapshot is None:
+            return self._unavailable()
+        return JSONResponse({"type_p": type_p, **snapshot.stock_histogram(bins, type_p)})
+
+    def value_by_period(self, periode: str = Query("mois", pattern="^(mois|annee)$"),
+                        type_p: Optional[str] = None, db=Depends(get_db)):
+        """
+        Valeur du stock par mois ou par année d'entrée des produits
+        """
+        snapshot = catalog_snapshot_service.get(db)
+        if snapshot is None:
+            return self._unavailable()
+        return JSONResponse({
+            "type_p": type_p,
+            "periode": periode,
+            "valeurs": snapshot.value_by_period(PERIODS[periode], type_p)
+        })
+
+    def _unavailable(self) -> JSONResponse:
+        return JSONResponse(
+            {"error": "Statistiques indisponibles"},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
@@ -2,18 +2,23 @@
 Contrôleur d'authentification
 Gère les routes liées à la connexion, déconnexion et inscription
 """
+import logging
+
 from fastapi import Form, Request, Depends, status
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-import psycopg
 
 from config.database import get_db
-from models.user_model import User
+from models.user_model import User, UserAlreadyExists
 from services.auth_service import auth_service
+from services.last_login_service import last_login_service
 from services.session_service import session_service
 from services.validation_service import validation_service
 
 
+logger = logging.getLogger(__name__)
+
+
 class AuthController:
     """Contrôleur pour l'authentification"""
     
@@ -53,16 +58,16 @@ class AuthController:
                     {"request": request, "error": "Login ou mot de passe incorrect"}
                 )
             
-            # Mise à jour de la date de connexion
-            user.update_last_login(db)
+            # Mise à jour différée de la date de connexion (hors du chemin critique)
+            last_login_service.record(user.user_id)
             
             # Création de la session
             session_service.create_user_session(request, user)
             
             return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
             
-        except Exception as e:
-            print(f"Erreur lors de la connexion: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la connexion")
             return self.templates.TemplateResponse(
                 "auth/login.html", 
                 {"request": request, "error": "Erreur de connexion"}
@@ -97,9 +102,9 @@ class AuthController:
             )
         
         try:
-            # Vérification de l'unicité du login/email
-            existing_user = User.find_by_login_or_email(db, login.strip(), email.strip())
-            if existing_user:
+            # Vérification préalable, avant le hachage bcrypt : un doublon évident est
+            # refusé sans le payer (l'index unique reste la garantie en cas de course)
+            if User.find_by_login_or_email(db, login.strip(), email.strip()):
                 return self.templates.TemplateResponse(
                     "auth/register.html", 
                     {"request": request, "error": "Ce login ou cette adresse email est déjà utilisé(e)"}
@@ -113,8 +118,17 @@ class AuthController:
                 password_hash=password_hash
             )
             
-            # Sauvegarde en base de données
-            if new_user.save(db):
+            # Sauvegarde en base de données (inscription concurrente du même login ou email :
+            # l'unicité est garantie par les index uniques)
+            try:
+                saved = new_user.save(db)
+            except UserAlreadyExists:
+                return self.templates.TemplateResponse(
+                    "auth/register.html", 
+                    {"request": request, "error": "Ce login ou cette adresse email est déjà utilisé(e)"}
+                )
+            
+            if saved:
                 # Création de la session pour l'utilisateur nouvellement inscrit
                 session_service.create_user_session(request, new_user)
                 return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
@@ -124,8 +138,8 @@ class AuthController:
                     {"request": request, "error": "Erreur lors de la création du compte"}
                 )
                 
-        except Exception as e:
-            print(f"Erreur lors de l'inscription: {e}")
+        except Exception:
+            logger.exception("Erreur lors de l'inscription")
             return self.templates.TemplateResponse(
                 "auth/register.html", 
                 {"request": request, "error": "Erreur lors de la création du compte"}
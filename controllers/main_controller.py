@@ -2,11 +2,12 @@
 Contrôleur principal de l'application
 Gère les pages principales comme l'accueil
 """
-from fastapi import Request
-from fastapi.responses import HTMLResponse
+from fastapi import Depends, Request
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 
 from services.session_service import session_service
+from services.load_shedding_service import load_shedding_service
 
 
 class MainController:
@@ -24,4 +25,11 @@ class MainController:
         return self.templates.TemplateResponse(
             "index.html", 
             {"request": request, "user": current_user}
-        )
\ No newline at end of file
+        )
+    
+    def concurrency_stats(self, user: dict = Depends(session_service.require_user)):
+        """
+        Limites de concurrence du worker : requêtes en cours, en attente,
+        délestées et temps d'attente (API JSON, connexion requise)
+        """
+        return JSONResponse(load_shedding_service.stats())
@@ -1,15 +1,37 @@
 """
 Contrôleur de produits
 """
-from fastapi import Form, Request, Depends, status, Path
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import Body, Form, Request, Depends, status, Path, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
-import psycopg
-from datetime import date
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date, datetime
 
+from config.app_config import app_config
 from config.database import get_db
-from models.produit_model import Produit
+from models.produit_model import Produit, ProduitConflict
+from models.stats_model import ProduitTypeStats
+from models import stock_model
 from services.session_service import session_service
+from services.search_service import search_service
+from services.single_flight_service import single_flight_service
+from services.group_commit_service import group_commit_service
+from services.catalog_feed_service import catalog_feed_service
+from services.produit_type_service import produit_type_service
+
+
+class StockMovement(BaseModel):
+    """Variation de stock d'un produit (delta négatif pour une sortie)"""
+    id_p: int = Field(..., gt=0)
+    delta: int
+
+
+class StockMovementBatch(BaseModel):
+    """Lot de variations de stock appliqué dans une seule transaction"""
+    movements: List[StockMovement] = Field(..., min_length=1, max_length=app_config.STOCK_BATCH_MAX_ITEMS)
+
 
 class ProduitController:
     """Contrôleur pour la gestion des produits"""
@@ -17,34 +39,157 @@ class ProduitController:
     def __init__(self, templates: Jinja2Templates):
         self.templates = templates
     
-    def list_produits(self, request: Request, db=Depends(get_db)):
+    def list_produits(self, request: Request, type_p: Optional[str] = None, db=Depends(get_db)):
         """
-        Affiche la liste de tous les produits
+        Affiche la liste de tous les produits, ou de ceux d'un type
+        Les affichages simultanés partagent une seule lecture du catalogue
         """
-        produits = Produit.find_all(db)
+        produit_type_service.ensure_loaded(db)
+        if type_p:
+            produits = single_flight_service.do(
+                ("produits", type_p), lambda: Produit.find_by_type(db, type_p), connection=db
+            )
+        else:
+            produits = single_flight_service.do(("produits",), lambda: Produit.find_all(db), connection=db)
         user = session_service.get_current_user(request)
         flash_messages = session_service.get_flash_messages(request)
         return self.templates.TemplateResponse(
             "produit/produits.html", 
-            {"request": request, "produits": produits, "user": user, "flash_messages": flash_messages}
+            {"request": request, "produits": produits, "user": user, "flash_messages": flash_messages,
+             "types": produit_type_service.libelles(), "type_p": type_p}
         )
     
-    def add_produit_form(self, request: Request, db=Depends(get_db)):
+    def search_produits(self, request: Request, q: str = "", db=Depends(get_db)):
         """
-        Affiche le formulaire d'ajout de produit
+        Affiche les produits correspondant à la recherche, classés par pertinence
         """
+        search_service.ensure_loaded(db)
+        produit_type_service.ensure_loaded(db)
+        results = search_service.search(q, limit=app_config.SEARCH_MAX_RESULTS)
+        produits = Produit.find_by_ids(db, [result["id_p"] for result in results])
         user = session_service.get_current_user(request)
-        if not user:
-            return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        flash_messages = session_service.get_flash_messages(request)
+        return self.templates.TemplateResponse(
+            "produit/produits.html", 
+            {"request": request, "produits": produits, "user": user, "flash_messages": flash_messages, "query": q,
+             "types": produit_type_service.libelles()}
+        )
+    
+    def autocomplete_produits(self, q: str = "", db=Depends(get_db)):
+        """
+        Suggestions de produits pour la saisie en cours (API JSON)
+        La connexion n'est utilisée qu'à la construction de l'index
+        """
+        search_service.ensure_loaded(db)
+        return JSONResponse(search_service.autocomplete(q, limit=app_config.AUTOCOMPLETE_MAX_RESULTS))
+    
+    def stats_produits(self, request: Request, db=Depends(get_db)):
+        """
+        Affiche la synthèse du stock par type de produit
+        """
+        stats = ProduitTypeStats.find_all(db)
+        user = session_service.get_current_user(request)
+        totals = {
+            "nb_produits": sum(stat.nb_produits for stat in stats),
+            "valeur_stock": sum(stat.valeur_stock for stat in stats),
+            "nb_stock_faible": sum(stat.nb_stock_faible for stat in stats),
+            "nb_rupture": sum(stat.nb_rupture for stat in stats)
+        }
+        return self.templates.TemplateResponse(
+            "produit/produits_stats.html",
+            {"request": request, "stats": stats, "totals": totals, "user": user}
+        )
+    
+    def stats_produits_data(self, db=Depends(get_db)):
+        """
+        Synthèse du stock par type de produit (API JSON)
+        """
+        return JSONResponse([stat.to_dict() for stat in ProduitTypeStats.find_all(db)])
+    
+    async def catalog_events(self, request: Request, last_event_id: Optional[int] = None):
+        """
+        Flux Server-Sent Events des modifications du catalogue
         
+        La reprise utilise l'en-tête Last-Event-ID (reconnexion automatique du
+        navigateur) ou le paramètre last_event_id.
+        """
+        header = request.headers.get("last-event-id", "")
+        if header.isdigit():
+            last_event_id = int(header)
+        if catalog_feed_service.full:
+            return JSONResponse(
+                {"error": "Trop d'abonnés au flux du catalogue"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(app_config.CATALOG_FEED_RETRY_MS // 1000)}
+            )
+        return StreamingResponse(
+            catalog_feed_service.stream(last_event_id),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    def single_flight_stats(self, user: dict = Depends(session_service.require_user)):
+        """
+        Compteurs du regroupement des lectures de ce worker (API JSON, connexion requise)
+        """
+        return JSONResponse(single_flight_service.stats())
+    
+    def group_commit_stats(self, user: dict = Depends(session_service.require_user)):
+        """
+        Tailles des lots et latence ajoutée par l'écriture groupée des ajouts (API JSON, connexion requise)
+        """
+        return JSONResponse(group_commit_service.stats())
+    
+    def stock_history(self, id: int, day: Optional[str] = Query(None, alias="date"), limit: int = 50,
+                      user: dict = Depends(session_service.require_user), db=Depends(get_db)):
+        """
+        Historique du stock d'un produit (API JSON, connexion requise)
+        
+        Args:
+            id: ID du produit
+            day: Date du stock demandé (paramètre ?date=, AAAA-MM-JJ ou AAAA-MM-JJTHH:MM:SS), maintenant par défaut
+            limit: Nombre de mouvements renvoyés, jusqu'à cette date
+        """
+        try:
+            at = datetime.fromisoformat(day) if day else datetime.now()
+        except ValueError:
+            return JSONResponse({"error": "Date invalide"}, status_code=status.HTTP_400_BAD_REQUEST)
+        if day and len(day) == 10:
+            # Jour seul : stock à la fin de la journée
+            at = at.replace(hour=23, minute=59, second=59, microsecond=999999)
+        
+        stock = stock_model.StockSnapshot.stock_at(db, id, at)
+        movements = stock_model.StockMovement.find_by_produit(
+            db, id, before=at, limit=max(0, min(limit, app_config.STOCK_HISTORY_MAX_ITEMS))
+        )
+        if stock is None or movements is None:
+            return JSONResponse(
+                {"error": "Erreur lors de la lecture de l'historique des stocks"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        return JSONResponse(jsonable_encoder({
+            "id_p": id,
+            "date": at,
+            "stock_p": stock.get("stock_p"),
+            "as_of": stock.get("as_of"),
+            "movements": [movement.to_dict() for movement in movements]
+        }))
+    
+    def add_produit_form(self, request: Request, user: dict = Depends(session_service.require_user),
+                         db=Depends(get_db)):
+        """
+        Affiche le formulaire d'ajout de produit
+        """
+        produit_type_service.ensure_loaded(db)
         today = date.today()
         return self.templates.TemplateResponse(
             "produit/produit_add.html",
-            {"request": request, "user": user, "today": today}
+            {"request": request, "user": user, "today": today, "types": produit_type_service.libelles()}
         )
         
     def add_produit(self, 
                     request: Request,
+                    user: dict = Depends(session_service.require_user),
                     type_p: str = Form(...),
                     designation_p: str = Form(...),
                     prix_ht: float = Form(...),
@@ -54,10 +199,6 @@ class ProduitController:
         """
         Traite le formulaire d'ajout de produit
         """
-        user = session_service.get_current_user(request)
-        if not user:
-            return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
-        
         # Conversion de la date au format YYYY-MM-DD
         try:
             day, month, year = map(int, date_in.split('/'))
@@ -70,10 +211,13 @@ class ProduitController:
             designation_p=designation_p,
             prix_ht=prix_ht,
             date_in=formatted_date,
-            stock_p=stock_p
+            stock_p=stock_p,
+            # Type inconnu (None) : créé par Produit.save
+            id_type=produit_type_service.id_for(type_p),
+            updated_by=user["id"]
         )
         
-        if new_produit.save(db):
+        if group_commit_service.save(db, new_produit):
             # Ajouter un message de succès
             session_service.add_flash_message(
                 request, 
@@ -89,24 +233,25 @@ class ProduitController:
                     "request": request, 
                     "user": user, 
                     "error": error_message,
-                    "today": date.today()
+                    "today": date.today(),
+                    "types": produit_type_service.libelles()
                 }
             )
     
-    def delete_produit(self, request: Request, id: int, db=Depends(get_db)):
+    def delete_produit(self, request: Request, id: int,
+                       user: dict = Depends(session_service.require_user),
+                       db=Depends(get_db)):
         """
         Supprime un produit par son ID
         
         Args:
             request: Objet Request de FastAPI
             id: ID du produit à supprimer
+            user: Utilisateur connecté (redirection vers /login sinon)
             db: Connexion à la base de données
         """
-        user = session_service.get_current_user(request)
-        if not user:
-            return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
-        
         # Récupérer le produit pour avoir son nom avant suppression
+        db.pin_primary()
         produit = Produit.find_by_id(db, id)
         
         if not produit:
@@ -118,7 +263,7 @@ class ProduitController:
             return RedirectResponse(url="/produits", status_code=status.HTTP_303_SEE_OTHER)
         
         # Supprimer le produit
-        if Produit.delete_by_id(db, id):
+        if Produit.delete_by_id(db, id, user_id=user["id"]):
             session_service.add_flash_message(
                 request, 
                 f"Le produit '{produit.designation_p}' a été supprimé avec succès !", 
@@ -136,8 +281,9 @@ class ProduitController:
     def view_produit(self, request: Request, id: int, db=Depends(get_db)):
         """
         Affiche les détails d'un produit par son ID
+        Les affichages simultanés du même produit partagent une seule lecture
         """
-        produit = Produit.find_by_id(db, id)
+        produit = single_flight_service.do(("produit", id), lambda: Produit.find_by_id(db, id), connection=db)
         user = session_service.get_current_user(request)
         flash_messages = session_service.get_flash_messages(request)
         
@@ -154,14 +300,14 @@ class ProduitController:
             {"request": request, "produit": produit, "user": user, "flash_messages": flash_messages}
         )
 
-    def edit_produit_form(self, request: Request, id: int, db=Depends(get_db)):
+    def edit_produit_form(self, request: Request, id: int,
+                          user: dict = Depends(session_service.require_user),
+                          db=Depends(get_db)):
         """
         Affiche le formulaire d'édition d'un produit
+        Lu sur le primaire : la version affichée doit être la version courante
         """
-        user = session_service.get_current_user(request)
-        if not user:
-            return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
-        
+        db.pin_primary()
         produit = Produit.find_by_id(db, id)
         if not produit:
             session_service.add_flash_message(
@@ -171,28 +317,32 @@ class ProduitController:
             )
             return RedirectResponse(url="/produits", status_code=status.HTTP_303_SEE_OTHER)
         
+        produit_type_service.ensure_loaded(db)
         return self.templates.TemplateResponse(
             "produit/produit_edit.html",
-            {"request": request, "produit": produit, "user": user}
+            {"request": request, "produit": produit, "user": user, "types": produit_type_service.libelles()}
         )
     
     def edit_produit(self, 
                      request: Request,
                      id: int,
+                     user: dict = Depends(session_service.require_user),
                      type_p: str = Form(...),
                      designation_p: str = Form(...),
                      prix_ht: float = Form(...),
                      date_in: str = Form(...),
                      stock_p: int = Form(...),
+                     version: int = Form(...),
                      db=Depends(get_db)):
         """
         Traite le formulaire de modification de produit
-        """
-        user = session_service.get_current_user(request)
-        if not user:
-            return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
         
-        # Vérifier que le produit existe
+        La version envoyée par le formulaire est celle affichée à l'éditeur : si le
+        produit a changé depuis, la modification est refusée et les valeurs
+        actuelles sont réaffichées avec celles saisies.
+        """
+        # Vérifier que le produit existe (sur le primaire, comme la version comparée)
+        db.pin_primary()
         produit = Produit.find_by_id(db, id)
         if not produit:
             session_service.add_flash_message(
@@ -216,13 +366,27 @@ class ProduitController:
         
         # Mettre à jour les propriétés du produit
         produit.type_p = type_p
+        produit.id_type = produit_type_service.id_for(type_p)
         produit.designation_p = designation_p
         produit.prix_ht = prix_ht
         produit.date_in = formatted_date
         produit.stock_p = stock_p
+        produit.version = version
+        produit.updated_by = user["id"]
         
         # Sauvegarder les modifications
-        if produit.save(db):
+        try:
+            saved = produit.save(db)
+        except ProduitConflict:
+            return self._edit_conflict_response(request, db, id, user, {
+                "type_p": type_p,
+                "designation_p": designation_p,
+                "prix_ht": prix_ht,
+                "date_in": formatted_date,
+                "stock_p": stock_p
+            })
+        
+        if saved:
             session_service.add_flash_message(
                 request, 
                 f"Le produit '{designation_p}' a été modifié avec succès !", 
@@ -237,6 +401,139 @@ class ProduitController:
                     "request": request, 
                     "produit": produit, 
                     "user": user, 
-                    "error": error_message
+                    "error": error_message,
+                    "types": produit_type_service.libelles()
                 }
-            )
\ No newline at end of file
+            )
+    
+    def _edit_conflict_response(self, request: Request, db, id: int, user: dict, submitted: dict):
+        """
+        Réponse à une modification concurrente : formulaire rechargé avec les
+        valeurs actuelles du produit et rappel des valeurs saisies
+        """
+        current = Produit.find_by_id(db, id)
+        if not current:
+            session_service.add_flash_message(
+                request, 
+                "Le produit a été supprimé pendant sa modification.", 
+                "error"
+            )
+            return RedirectResponse(url="/produits", status_code=status.HTTP_303_SEE_OTHER)
+        
+        return self.templates.TemplateResponse(
+            "produit/produit_edit.html",
+            {
+                "request": request, 
+                "produit": current, 
+                "user": user, 
+                "submitted": submitted,
+                "types": produit_type_service.libelles(),
+                "error": "Ce produit a été modifié par un autre utilisateur pendant votre saisie. "
+                         "Vérifiez les valeurs actuelles puis enregistrez à nouveau vos modifications."
+            },
+            status_code=status.HTTP_409_CONFLICT
+        )
+    
+    def adjust_stock(self,
+                     request: Request,
+                     user: dict = Depends(session_service.require_user),
+                     batch: StockMovementBatch = Body(...),
+                     db=Depends(get_db)):
+        """
+        Applique un lot de mouvements de stock (API JSON)
+        
+        Chaque mouvement est appliqué atomiquement et seulement si le stock reste
+        positif ; la réponse indique le résultat de chaque mouvement.
+        """
+        movements = [(movement.id_p, movement.delta) for movement in batch.movements]
+        results = Produit.adjust_stocks(db, movements, user_id=user["id"])
+        if results is None:
+            return JSONResponse(
+                {"error": "Erreur lors de la modification des stocks"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        
+        return JSONResponse({
+            "applied": sum(results),
+            "rejected": len(results) - sum(results),
+            "results": [
+                {"id_p": id_p, "delta": delta, "ok": ok}
+                for (id_p, delta), ok in zip(movements, results)
+            ]
+        })
+    
+    def batch_delete(self,
+                     request: Request,
+                     user: dict = Depends(session_service.require_user),
+                     ids: List[int] = Form([]),
+                     db=Depends(get_db)):
+        """
+        Supprime les produits sélectionnés dans la liste
+        """
+        if not ids:
+            session_service.add_flash_message(request, "Aucun produit sélectionné.", "warning")
+            return RedirectResponse(url="/produits", status_code=status.HTTP_303_SEE_OTHER)
+        
+        deleted = Produit.delete_by_ids(db, ids, chunk_size=app_config.BATCH_CHUNK_SIZE, user_id=user["id"])
+        if deleted is None:
+            session_service.add_flash_message(
+                request, 
+                "Erreur lors de la suppression des produits.", 
+                "error"
+            )
+        else:
+            session_service.add_flash_message(
+                request, 
+                f"{deleted} produit(s) supprimé(s).", 
+                "success"
+            )
+        return RedirectResponse(url="/produits", status_code=status.HTTP_303_SEE_OTHER)
+    
+    def batch_update(self,
+                     request: Request,
+                     user: dict = Depends(session_service.require_user),
+                     operation: str = Form(...),
+                     value: float = Form(...),
+                     scope: str = Form("selection"),
+                     ids: List[int] = Form([]),
+                     db=Depends(get_db)):
+        """
+        Modifie en une opération les produits sélectionnés ou tous ceux d'un type
+        
+        Args:
+            operation: "prix" (variation en %) ou "stock" (nouvelle valeur)
+            value: Pourcentage ou stock selon l'opération
+            scope: "selection" pour les produits cochés, sinon le type de produit visé
+            ids: IDs des produits cochés
+        """
+        if scope == "selection":
+            if not ids:
+                session_service.add_flash_message(request, "Aucun produit sélectionné.", "warning")
+                return RedirectResponse(url="/produits", status_code=status.HTTP_303_SEE_OTHER)
+            target = {"ids": ids}
+        else:
+            target = {"type_p": scope}
+        
+        if operation == "prix" and value > -100:
+            updated = Produit.update_prices(db, value, chunk_size=app_config.BATCH_CHUNK_SIZE,
+                                            user_id=user["id"], **target)
+        elif operation == "stock" and value >= 0:
+            updated = Produit.reset_stocks(db, int(value), chunk_size=app_config.BATCH_CHUNK_SIZE,
+                                           user_id=user["id"], **target)
+        else:
+            session_service.add_flash_message(request, "Opération groupée invalide.", "error")
+            return RedirectResponse(url="/produits", status_code=status.HTTP_303_SEE_OTHER)
+        
+        if updated is None:
+            session_service.add_flash_message(
+                request, 
+                "Erreur lors de la modification des produits.", 
+                "error"
+            )
+        else:
+            session_service.add_flash_message(
+                request, 
+                f"{updated} produit(s) modifié(s).", 
+                "success"
+            )
+        return RedirectResponse(url="/produits", status_code=status.HTTP_303_SEE_OTHER)
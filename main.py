@@ -2,16 +2,100 @@
 Application FastAPI suivant le pattern MVC
 Point d'entrée principal de l'application
 """
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
 
 from config.app_config import app_config
+from config.database import replica_set, DeadlineExceeded, ConnectionUnavailable
 from controllers.main_controller import MainController
 from controllers.auth_controller import AuthController
 from controllers.produit_controller import ProduitController
+from controllers.analytics_controller import AnalyticsController
+from services.session_service import LoginRequired
+from services.single_flight_service import SingleFlightTimeout
+from services.load_shedding_service import LoadSheddingMiddleware, load_shedding_service
+from services.deadline_service import DeadlineMiddleware
+from services.profiling_service import ProfilingMiddleware
+from services.logging_service import AccessLogMiddleware, logging_service
+from services.last_login_service import last_login_service
+from services.catalog_snapshot_service import catalog_snapshot_service
+from services.catalog_events_service import catalog_events_service
+from services.produit_type_service import produit_type_service
+from services.stock_ledger_service import stock_ledger_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Cycle de vie de l'application (exécuté dans chaque worker)
+    Démarre la journalisation structurée (thread d'écriture du worker),
+    charge le dictionnaire des types de produits, ajuste le threadpool des routes synchrones et les limites
+    de délestage à la taille du pool MySQL et démarre l'écriture différée des dates de connexion (vidée à l'arrêt)
+    ainsi que le rafraîchissement de l'instantané du catalogue et la réception
+    des modifications faites par les autres workers, les vérifications de
+    santé des réplicas et la maintenance de l'historique des stocks
+    """
+    import anyio.to_thread
+    logging_service.start()
+    produit_type_service.start()
+    anyio.to_thread.current_default_thread_limiter().total_tokens = app_config.THREADPOOL_SIZE
+    load_shedding_service.start()
+    last_login_service.start()
+    catalog_snapshot_service.start()
+    catalog_events_service.start()
+    replica_set.start()
+    stock_ledger_service.start()
+    try:
+        yield
+    finally:
+        stock_ledger_service.stop()
+        replica_set.stop()
+        catalog_events_service.stop()
+        catalog_snapshot_service.stop()
+        last_login_service.stop()
+        logging_service.stop()
+
+
+async def login_required_handler(request: Request, exc: LoginRequired) -> RedirectResponse:
+    """Redirige les requêtes anonymes vers le formulaire de connexion"""
+    return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+
+
+async def single_flight_timeout_handler(request: Request, exc: SingleFlightTimeout) -> HTMLResponse:
+    """Répond 503 quand une lecture partagée reste trop longtemps en cours"""
+    return HTMLResponse(
+        "Service momentanément indisponible, veuillez réessayer.",
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"}
+    )
+
+
+async def connection_unavailable_handler(request: Request, exc: ConnectionUnavailable) -> HTMLResponse:
+    """Répond 503 quand aucune connexion MySQL n'a pu être obtenue (pool épuisé, base injoignable)"""
+    return HTMLResponse(
+        "Service momentanément indisponible, veuillez réessayer.",
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"}
+    )
+
+
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded) -> HTMLResponse:
+    """Affiche une page d'erreur quand la requête dépasse son échéance"""
+    return request.app.state.templates.TemplateResponse(
+        "error.html",
+        {
+            "request": request,
+            "user": request.session.get("user") if "session" in request.scope else None,
+            "title": "Délai dépassé",
+            "message": "Le traitement de votre demande a pris trop de temps. Veuillez réessayer."
+        },
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT
+    )
 
 
 def create_app() -> FastAPI:
@@ -25,15 +109,37 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title="Application de connexion MVC",
         description="Application démonstrant le pattern MVC avec FastAPI",
-        version="1.0.0"
+        version="1.0.0",
+        lifespan=lifespan
     )
     
+    # Profilage à la demande : ajouté en premier, il ne mesure que le traitement
+    # de la requête (pas l'attente dans les files du délestage)
+    app.add_middleware(ProfilingMiddleware)
+    
     # Configuration du middleware de session
     app.add_middleware(
         SessionMiddleware, 
         secret_key=app_config.SECRET_KEY
     )
     
+    # Délestage : ajouté après la session, il s'exécute avant sa lecture
+    app.add_middleware(LoadSheddingMiddleware)
+    
+    # Échéance des requêtes : ajoutée en dernier, elle s'exécute en premier
+    # (l'attente dans les files du délestage est décomptée)
+    app.add_middleware(DeadlineMiddleware)
+    
+    # Journal des accès : ajouté après l'échéance, il mesure toute la durée de la
+    # requête et pose l'identifiant repris par tous les enregistrements
+    app.add_middleware(AccessLogMiddleware)
+    
+    # Redirection vers la connexion pour les routes protégées par require_user
+    app.add_exception_handler(LoginRequired, login_required_handler)
+    app.add_exception_handler(SingleFlightTimeout, single_flight_timeout_handler)
+    app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+    app.add_exception_handler(ConnectionUnavailable, connection_unavailable_handler)
+    
     # Configuration des fichiers statiques
     app.mount(
         app_config.STATIC_URL, 
@@ -43,19 +149,22 @@ def create_app() -> FastAPI:
     
     # Configuration des templates
     templates = Jinja2Templates(directory=app_config.TEMPLATES_DIR)
+    app.state.templates = templates
     
     # Initialisation des contrôleurs
     main_controller = MainController(templates)
     auth_controller = AuthController(templates)
     produit_controller = ProduitController(templates)
+    analytics_controller = AnalyticsController(templates)
     
     # Enregistrement des routes
-    register_routes(app, main_controller, auth_controller, produit_controller)
+    register_routes(app, main_controller, auth_controller, produit_controller, analytics_controller)
     
     return app
 
 
-def register_routes(app: FastAPI, main_controller: MainController, auth_controller: AuthController, produit_controller: ProduitController):
+def register_routes(app: FastAPI, main_controller: MainController, auth_controller: AuthController, produit_controller: ProduitController,
+                    analytics_controller: AnalyticsController):
     """
     Enregistre toutes les routes de l'application
     
@@ -63,6 +172,8 @@ def register_routes(app: FastAPI, main_controller: MainController, auth_controll
         app: Instance FastAPI
         main_controller: Contrôleur principal
         auth_controller: Contrôleur d'authentification
+        produit_controller: Contrôleur de produits
+        analytics_controller: Contrôleur des statistiques du catalogue
     """
     # Routes principales
     app.add_api_route(
@@ -111,6 +222,13 @@ def register_routes(app: FastAPI, main_controller: MainController, auth_controll
         name="register_post"
     )
     
+    app.add_api_route(
+        "/concurrency.json",
+        main_controller.concurrency_stats,
+        methods=["GET"],
+        name="concurrency_stats"
+    )
+    
     app.add_api_route(
         "/produits",
         produit_controller.list_produits,
@@ -119,6 +237,78 @@ def register_routes(app: FastAPI, main_controller: MainController, auth_controll
         name="list_produits"
     )
     
+    app.add_api_route(
+        "/produits/search",
+        produit_controller.search_produits,
+        methods=["GET"],
+        response_class=HTMLResponse,
+        name="search_produits"
+    )
+    
+    app.add_api_route(
+        "/produits/autocomplete",
+        produit_controller.autocomplete_produits,
+        methods=["GET"],
+        name="autocomplete_produits"
+    )
+    
+    app.add_api_route(
+        "/produits/stats",
+        produit_controller.stats_produits,
+        methods=["GET"],
+        response_class=HTMLResponse,
+        name="stats_produits"
+    )
+    
+    app.add_api_route(
+        "/produits/stats.json",
+        produit_controller.stats_produits_data,
+        methods=["GET"],
+        name="stats_produits_data"
+    )
+    
+    app.add_api_route(
+        "/produits/events",
+        produit_controller.catalog_events,
+        methods=["GET"],
+        name="catalog_events"
+    )
+    
+    app.add_api_route(
+        "/produits/single-flight.json",
+        produit_controller.single_flight_stats,
+        methods=["GET"],
+        name="single_flight_stats"
+    )
+    
+    app.add_api_route(
+        "/produits/group-commit.json",
+        produit_controller.group_commit_stats,
+        methods=["GET"],
+        name="group_commit_stats"
+    )
+    
+    app.add_api_route(
+        "/produits/analytics/prix",
+        analytics_controller.price_percentiles,
+        methods=["GET"],
+        name="analytics_prix"
+    )
+    
+    app.add_api_route(
+        "/produits/analytics/stock",
+        analytics_controller.stock_histogram,
+        methods=["GET"],
+        name="analytics_stock"
+    )
+    
+    app.add_api_route(
+        "/produits/analytics/valeur",
+        analytics_controller.value_by_period,
+        methods=["GET"],
+        name="analytics_valeur"
+    )
+    
     app.add_api_route(
         "/produits/add",
         produit_controller.add_produit_form,
@@ -134,6 +324,27 @@ def register_routes(app: FastAPI, main_controller: MainController, auth_controll
         name="add_produit_post"
     )
     
+    app.add_api_route(
+        "/produits/stock",
+        produit_controller.adjust_stock,
+        methods=["POST"],
+        name="adjust_stock"
+    )
+    
+    app.add_api_route(
+        "/produits/batch/delete",
+        produit_controller.batch_delete,
+        methods=["POST"],
+        name="batch_delete_produits"
+    )
+    
+    app.add_api_route(
+        "/produits/batch/update",
+        produit_controller.batch_update,
+        methods=["POST"],
+        name="batch_update_produits"
+    )
+    
     app.add_api_route(
         "/produits/{id}/delete",
         produit_controller.delete_produit,
@@ -141,6 +352,13 @@ def register_routes(app: FastAPI, main_controller: MainController, auth_controll
         name="delete_produit"
     )
     
+    app.add_api_route(
+        "/produits/{id}/stock.json",
+        produit_controller.stock_history,
+        methods=["GET"],
+        name="stock_history"
+    )
+    
     app.add_api_route(
         "/produits/{id}",
         produit_controller.view_produit,
@@ -169,7 +387,7 @@ def register_routes(app: FastAPI, main_controller: MainController, auth_controll
 app = create_app()
 
 
-# Point d'entrée pour le développement
+# Point d'entrée pour le développement (production : python server.py)
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
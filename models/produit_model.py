@@ -1,25 +1,133 @@
-from typing import Optional, Dict, Any
+import logging
+from typing import Optional, Dict, Any, List, Tuple, Callable
 from datetime import datetime
 import mysql.connector
 from mysql.connector import Error
 
+from config.database import read_connection
+from models.produit_type_model import ProduitType
+from models.stats_model import SUMMARY_SLOTS
+
+
+logger = logging.getLogger(__name__)
+
+# Lecture des produits avec le libellé de leur type (clé primaire de `produit_type`)
+SELECT_PRODUITS = (
+    'SELECT p.*, t.libelle AS type_p FROM `produit` p '
+    'JOIN `produit_type` t ON t.id_type = p.id_type'
+)
+
+# Clé d'un type désigné par son libellé (index unique), pour filtrer `produit` sur id_type
+TYPE_ID_SUBQUERY = '(SELECT id_type FROM `produit_type` WHERE libelle = %s)'
+
+
+class ProduitConflict(Exception):
+    """
+    Levée par Produit.save quand le produit a été modifié (ou supprimé)
+    depuis sa lecture : la version attendue n'est plus la version courante
+    """
+
+
 class Produit:
     """
     Modèle représentant un produit
     Encapsule toutes les opérations liées aux produits
+    
+    type_p est le libellé du type, id_type sa clé dans `produit_type` ; un
+    produit enregistré sans id_type reçoit celle de son libellé (type créé au besoin).
+    updated_by est l'utilisateur auteur de la dernière écriture, repris par les
+    triggers de l'historique des stocks (migration 006).
     """
     
+    # Écouteurs notifiés après chaque modification validée (commit) du catalogue
+    # Signature : listener(event, payload) avec event parmi
+    # "create", "update", "delete", "stock", "batch_update"
+    _change_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+    
     def __init__(self, id_p: Optional[int] = None, type_p: str = "", designation_p: str = "", 
                  prix_ht: float = 0.0, date_in: Optional[datetime] = None, 
-                 timeS_in: Optional[str] = None, stock_p: int = 0):
+                 timeS_in: Optional[str] = None, stock_p: int = 0, version: int = 0,
+                 id_type: Optional[int] = None, updated_by: Optional[int] = None):
         self.id_p = id_p
         self.type_p = type_p
+        self.id_type = id_type
         self.designation_p = designation_p
         self.prix_ht = prix_ht
         self.date_in = date_in
         self.timeS_in = timeS_in
         self.stock_p = stock_p
+        self.version = version
+        self.updated_by = updated_by
         
+    @staticmethod
+    def add_change_listener(listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """
+        Enregistre un écouteur des modifications du catalogue
+        
+        Args:
+            listener: Fonction appelée avec (event, payload) après chaque commit
+        """
+        if listener not in Produit._change_listeners:
+            Produit._change_listeners.append(listener)
+    
+    @staticmethod
+    def _notify(event: str, **payload: Any) -> None:
+        """Notifie les écouteurs ; leurs erreurs n'annulent jamais l'écriture"""
+        for listener in Produit._change_listeners:
+            try:
+                listener(event, payload)
+            except Exception:
+                logger.exception("Erreur d'un écouteur du catalogue (%s)", event)
+    
+    @staticmethod
+    def _types_of(cursor, ids: List[int], chunk_size: int = 1000) -> List[int]:
+        """
+        Types actuels de produits (clés id_type), pour verrouiller leur synthèse
+        
+        Args:
+            cursor: Curseur de la transaction en cours
+            ids: IDs des produits
+            chunk_size: Nombre maximal d'IDs par instruction
+        """
+        types = set()
+        unique_ids = sorted(set(ids))
+        for start in range(0, len(unique_ids), chunk_size):
+            chunk = unique_ids[start:start + chunk_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f'SELECT DISTINCT id_type FROM `produit` WHERE id_p IN ({placeholders})', tuple(chunk))
+            types.update(row[0] for row in cursor.fetchall())
+        return sorted(types)
+    
+    @staticmethod
+    def _lock_summaries(cursor, id_types: List[Optional[int]]) -> None:
+        """
+        Verrouille, dans l'ordre des id_type, les lignes de synthèse que les triggers
+        de cette transaction vont modifier (tranche de la connexion, migration 007)
+        
+        Les triggers modifient la synthèse dans l'ordre des produits écrits : deux
+        écritures multi-lignes concurrentes pourraient verrouiller les mêmes types
+        dans des ordres opposés et s'interbloquer. Appelé avant toute écriture de
+        `produit`, dans la même transaction ; les lignes absentes sont créées.
+        Un changement de type concurrent entre la lecture des types et l'écriture
+        reste possible : l'éventuel interblocage est alors une erreur comme une autre.
+        
+        Args:
+            cursor: Curseur de la transaction en cours
+            id_types: Types dont la synthèse sera modifiée
+        """
+        types = sorted({id_type for id_type in id_types if id_type is not None})
+        if not types:
+            return
+        placeholders = ", ".join(["(%s, CONNECTION_ID() MOD %s)"] * len(types))
+        params = []
+        for id_type in types:
+            params.extend((id_type, SUMMARY_SLOTS))
+        cursor.execute(
+            f'INSERT INTO `produit_type_summary` (id_type, slot) VALUES {placeholders} '
+            'ON DUPLICATE KEY UPDATE nb_produits = nb_produits',
+            tuple(params)
+        )
+    
     @staticmethod
     def find_by_id(connection: mysql.connector.MySQLConnection, id: int) -> Optional['Produit']:
         """
@@ -34,9 +142,9 @@ class Produit:
         """
         cursor = None
         try:
-            cursor = connection.cursor(dictionary=True)
+            cursor = read_connection(connection).cursor(dictionary=True)
             cursor.execute(
-                'SELECT * FROM `produit` WHERE id_p = %s',
+                f'{SELECT_PRODUITS} WHERE p.id_p = %s',
                 (id,)
             )
             result = cursor.fetchone()
@@ -49,11 +157,14 @@ class Produit:
                     prix_ht=result["prix_ht"],
                     date_in=result.get("date_in"), # Utilisation de get pour éviter KeyError (si la clé n'existe pas)
                     timeS_in=result.get("timeS_in"),
-                    stock_p=result["stock_p"]
+                    stock_p=result["stock_p"],
+                    version=result.get("version", 0),
+                    id_type=result.get("id_type"),
+                    updated_by=result.get("updated_by")
                 )
             return None
         except Error as e:
-            print(f"Erreur MySQL lors de la recherche par ID: {e}")
+            logger.error("Erreur MySQL lors de la recherche par ID: %s", e)
             return None
         finally:
             if cursor:
@@ -73,8 +184,8 @@ class Produit:
         cursor = None
         produits = []
         try:
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute('SELECT * FROM `produit`')
+            cursor = read_connection(connection).cursor(dictionary=True)
+            cursor.execute(SELECT_PRODUITS)
             results = cursor.fetchall()
             
             for result in results:
@@ -85,16 +196,64 @@ class Produit:
                     prix_ht=result["prix_ht"],
                     date_in=result.get("date_in"),
                     timeS_in=result.get("timeS_in"),
-                    stock_p=result["stock_p"]
+                    stock_p=result["stock_p"],
+                    version=result.get("version", 0),
+                    id_type=result.get("id_type"),
+                    updated_by=result.get("updated_by")
                 ))
             return produits
         except Error as e:
-            print(f"Erreur MySQL lors de la récupération de tous les produits: {e}")
+            logger.error("Erreur MySQL lors de la récupération de tous les produits: %s", e)
             return []
         finally:
             if cursor:
                 cursor.close()
                 
+    @staticmethod
+    def find_by_ids(connection: mysql.connector.MySQLConnection, ids: List[int]) -> list['Produit']:
+        """
+        Récupère plusieurs produits par leurs IDs, dans l'ordre des IDs fournis
+        
+        Args:
+            connection: Connexion à la bdd
+            ids: IDs des produits
+            
+        Returns:
+            Liste de produits (les IDs inexistants sont ignorés)
+        """
+        if not ids:
+            return []
+        
+        cursor = None
+        try:
+            cursor = read_connection(connection).cursor(dictionary=True)
+            placeholders = ", ".join(["%s"] * len(ids))
+            cursor.execute(
+                f'{SELECT_PRODUITS} WHERE p.id_p IN ({placeholders})',
+                tuple(ids)
+            )
+            by_id = {}
+            for result in cursor.fetchall():
+                by_id[result["id_p"]] = Produit(
+                    id_p=result["id_p"],
+                    type_p=result["type_p"],
+                    designation_p=result["designation_p"],
+                    prix_ht=result["prix_ht"],
+                    date_in=result.get("date_in"),
+                    timeS_in=result.get("timeS_in"),
+                    stock_p=result["stock_p"],
+                    version=result.get("version", 0),
+                    id_type=result.get("id_type"),
+                    updated_by=result.get("updated_by")
+                )
+            return [by_id[id] for id in ids if id in by_id]
+        except Error as e:
+            logger.error("Erreur MySQL lors de la recherche par IDs: %s", e)
+            return []
+        finally:
+            if cursor:
+                cursor.close()
+    
     @staticmethod
     def find_by_type(connection: mysql.connector.MySQLConnection, type_p: str) -> list['Produit']:
         """
@@ -110,9 +269,9 @@ class Produit:
         cursor = None
         produits = []
         try:
-            cursor = connection.cursor(dictionary=True)
+            cursor = read_connection(connection).cursor(dictionary=True)
             cursor.execute(
-                'SELECT * FROM `produit` WHERE type_p = %s',
+                f'{SELECT_PRODUITS} WHERE p.id_type = {TYPE_ID_SUBQUERY}',
                 (type_p,)
             )
             results = cursor.fetchall()
@@ -125,67 +284,247 @@ class Produit:
                     prix_ht=result["prix_ht"],
                     date_in=result.get("date_in"),
                     timeS_in=result.get("timeS_in"),
-                    stock_p=result["stock_p"]
+                    stock_p=result["stock_p"],
+                    version=result.get("version", 0),
+                    id_type=result.get("id_type"),
+                    updated_by=result.get("updated_by")
                 ))
             return produits
         except Error as e:
-            print(f"Erreur MySQL lors de la recherche par type: {e}")
+            logger.error("Erreur MySQL lors de la recherche par type: %s", e)
             return []
         finally:
             if cursor:
                 cursor.close()
                 
+    @staticmethod
+    def find_columns(connection: mysql.connector.MySQLConnection,
+                     since: Optional[datetime] = None) -> Optional[List[tuple]]:
+        """
+        Récupère les colonnes utiles aux statistiques, sans construire d'objets Produit
+        
+        Args:
+            connection: Connexion à la bdd
+            since: Ne renvoie que les produits créés ou modifiés depuis cette date
+            
+        Returns:
+            Liste de tuples (id_p, type_p, prix_ht, stock_p, date_in, updated_at),
+            ou None en cas d'erreur
+        """
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            if since is None:
+                cursor.execute(
+                    'SELECT p.id_p, t.libelle, p.prix_ht, p.stock_p, p.date_in, p.updated_at FROM `produit` p '
+                    'JOIN `produit_type` t ON t.id_type = p.id_type'
+                )
+            else:
+                cursor.execute(
+                    'SELECT p.id_p, t.libelle, p.prix_ht, p.stock_p, p.date_in, p.updated_at FROM `produit` p '
+                    'JOIN `produit_type` t ON t.id_type = p.id_type WHERE p.updated_at >= %s',
+                    (since,)
+                )
+            return cursor.fetchall()
+        except Error as e:
+            logger.error("Erreur MySQL lors de la lecture des colonnes: %s", e)
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+    
+    @staticmethod
+    def find_ids(connection: mysql.connector.MySQLConnection) -> Optional[List[int]]:
+        """
+        Récupère les IDs de tous les produits
+        
+        Args:
+            connection: Connexion à la bdd
+            
+        Returns:
+            Liste des IDs, ou None en cas d'erreur
+        """
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT id_p FROM `produit`')
+            return [row[0] for row in cursor.fetchall()]
+        except Error as e:
+            logger.error("Erreur MySQL lors de la lecture des IDs: %s", e)
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+    
+    @staticmethod
+    def count(connection: mysql.connector.MySQLConnection) -> Optional[int]:
+        """
+        Compte les produits
+        
+        Args:
+            connection: Connexion à la bdd
+            
+        Returns:
+            Nombre de produits, ou None en cas d'erreur
+        """
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT COUNT(*) FROM `produit`')
+            return cursor.fetchone()[0]
+        except Error as e:
+            logger.error("Erreur MySQL lors du comptage des produits: %s", e)
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+    
     def save(self, connection: mysql.connector.MySQLConnection) -> bool:
         """
         Sauvegarde le produit en base de données MySQL
         
+        La mise à jour est optimiste : elle n'est appliquée que si la version du
+        produit en base est encore celle lue (self.version), puis incrémente la version.
+        
         Args:
             connection: Connexion à la base de données MySQL
             
         Returns:
             True si la sauvegarde a réussi, False sinon
+            
+        Raises:
+            ProduitConflict: si le produit a été modifié ou supprimé entre-temps
         """
         cursor = None
+        # Clé résolue ici : oubliée si la transaction (et donc un type créé) est annulée
+        resolve_type = self.id_type is None
         
         try:
             cursor = connection.cursor(dictionary=True)
+            if resolve_type:
+                self.id_type = ProduitType.get_or_create(connection, self.type_p)
             if self.id_p is None:
                 # Créer un nouveau produit
+                Produit._lock_summaries(cursor, [self.id_type])
                 cursor.execute(
-                    'INSERT INTO `produit` (type_p, designation_p, prix_ht, date_in, stock_p) VALUES (%s, %s, %s, %s, %s)',
-                    (self.type_p, self.designation_p, self.prix_ht, self.date_in, self.stock_p)
+                    'INSERT INTO `produit` (id_type, designation_p, prix_ht, date_in, stock_p, updated_by) '
+                    'VALUES (%s, %s, %s, %s, %s, %s)',
+                    (self.id_type, self.designation_p, self.prix_ht, self.date_in, self.stock_p, self.updated_by)
                 )
                 
                 if cursor.rowcount > 0:
                     self.id_p = cursor.lastrowid
                     connection.commit()
+                    Produit._notify("create", produit=self)
                     return True
+                if resolve_type:
+                    self.id_type = None
                 return False
             else:
-                # Mettre à jour un produit existant
+                # Mettre à jour un produit existant si personne ne l'a modifié entre-temps
+                cursor.execute('SELECT id_type FROM `produit` WHERE id_p = %s', (self.id_p,))
+                current = cursor.fetchone()
+                Produit._lock_summaries(cursor, [self.id_type, current["id_type"] if current else None])
                 cursor.execute(
-                    'UPDATE `produit` SET type_p = %s, designation_p = %s, prix_ht = %s, date_in = %s, stock_p = %s WHERE id_p = %s',
-                    (self.type_p, self.designation_p, self.prix_ht, self.date_in, self.stock_p, self.id_p)
+                    'UPDATE `produit` SET id_type = %s, designation_p = %s, prix_ht = %s, date_in = %s, stock_p = %s, '
+                    'updated_by = %s, version = version + 1 WHERE id_p = %s AND version = %s',
+                    (self.id_type, self.designation_p, self.prix_ht, self.date_in, self.stock_p, self.updated_by,
+                     self.id_p, self.version)
                 )
+                if cursor.rowcount == 0:
+                    connection.rollback()
+                    if resolve_type:
+                        self.id_type = None
+                    raise ProduitConflict(f"Produit {self.id_p} modifié depuis la version {self.version}")
                 connection.commit()
+                self.version += 1
+                Produit._notify("update", produit=self)
                 return True
             
         except Error as e:
-            print(f"Erreur MySQL lors de la sauvegarde: {e}")
+            logger.error("Erreur MySQL lors de la sauvegarde: %s", e)
             connection.rollback()
+            if resolve_type:
+                self.id_type = None
             return False
         finally:
             if cursor:
                 cursor.close()
                 
     @staticmethod
-    def delete_by_id(connection: mysql.connector.MySQLConnection, id: int) -> bool:
+    def insert_many(connection: mysql.connector.MySQLConnection, produits: List['Produit']) -> bool:
+        """
+        Insère plusieurs nouveaux produits en une instruction et un seul commit
+        
+        Les IDs sont déduits du premier ID généré : une insertion multi-lignes
+        reçoit des valeurs consécutives (pas de @@auto_increment_increment) tant
+        que innodb_autoinc_lock_mode vaut 0 ou 1 (défaut de MariaDB).
+        
+        Args:
+            connection: Connexion à la bdd
+            produits: Produits sans ID
+            
+        Returns:
+            True si tous les produits ont été insérés (IDs renseignés), False sinon
+        """
+        if not produits:
+            return True
+        
+        cursor = None
+        # Clés résolues ici : oubliées si la transaction (et donc un type créé) est annulée
+        resolved = [produit for produit in produits if produit.id_type is None]
+        try:
+            cursor = connection.cursor()
+            type_ids: Dict[str, int] = {}
+            for produit in resolved:
+                if produit.type_p not in type_ids:
+                    type_ids[produit.type_p] = ProduitType.get_or_create(connection, produit.type_p)
+                produit.id_type = type_ids[produit.type_p]
+            Produit._lock_summaries(cursor, [produit.id_type for produit in produits])
+            placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(produits))
+            params = []
+            for produit in produits:
+                params.extend((produit.id_type, produit.designation_p, produit.prix_ht, produit.date_in,
+                               produit.stock_p, produit.updated_by))
+            cursor.execute(
+                f'INSERT INTO `produit` (id_type, designation_p, prix_ht, date_in, stock_p, updated_by) '
+                f'VALUES {placeholders}',
+                tuple(params)
+            )
+            if cursor.rowcount != len(produits):
+                connection.rollback()
+                for produit in resolved:
+                    produit.id_type = None
+                return False
+            first_id = cursor.lastrowid
+            cursor.execute('SELECT @@auto_increment_increment')
+            increment = cursor.fetchone()[0]
+            connection.commit()
+        except Error as e:
+            logger.error("Erreur MySQL lors de l'insertion groupée: %s", e)
+            connection.rollback()
+            for produit in resolved:
+                produit.id_type = None
+            return False
+        finally:
+            if cursor:
+                cursor.close()
+        
+        for index, produit in enumerate(produits):
+            produit.id_p = first_id + index * increment
+            Produit._notify("create", produit=produit)
+        return True
+    
+    @staticmethod
+    def delete_by_id(connection: mysql.connector.MySQLConnection, id: int,
+                     user_id: Optional[int] = None) -> bool:
         """
         Supprime un produit par son ID
         
         Args:
             connection: Connexion à la bdd
             id: ID du produit à supprimer
+            user_id: Utilisateur auteur de la suppression (historique des stocks)
             
         Returns:
             True si la suppression a réussi, False sinon
@@ -193,20 +532,219 @@ class Produit:
         cursor = None
         try:
             cursor = connection.cursor()
+            cursor.execute('SET @stock_user_id = %s', (user_id,))
+            Produit._lock_summaries(cursor, Produit._types_of(cursor, [id]))
             cursor.execute(
                 'DELETE FROM `produit` WHERE id_p = %s',
                 (id,)
             )
             connection.commit()
-            return cursor.rowcount > 0
+            if cursor.rowcount > 0:
+                Produit._notify("delete", ids=[id])
+                return True
+            return False
         except Error as e:
-            print(f"Erreur MySQL lors de la suppression: {e}")
+            logger.error("Erreur MySQL lors de la suppression: %s", e)
             connection.rollback()
             return False
         finally:
             if cursor:
                 cursor.close()
 
+    @staticmethod
+    def adjust_stock(connection: mysql.connector.MySQLConnection, id: int, delta: int,
+                     user_id: Optional[int] = None) -> bool:
+        """
+        Modifie le stock d'un produit de façon atomique
+        
+        Args:
+            connection: Connexion à la bdd
+            id: ID du produit
+            delta: Variation du stock (négative pour une sortie)
+            user_id: Utilisateur auteur du mouvement
+            
+        Returns:
+            True si le stock a été modifié, False si le produit n'existe pas,
+            si le stock est insuffisant ou en cas d'erreur
+        """
+        results = Produit.adjust_stocks(connection, [(id, delta)], user_id)
+        return bool(results and results[0])
+    
+    @staticmethod
+    def adjust_stocks(connection: mysql.connector.MySQLConnection,
+                      movements: List[Tuple[int, int]], user_id: Optional[int] = None) -> Optional[List[bool]]:
+        """
+        Applique un lot de variations de stock dans une seule transaction
+        
+        Chaque variation est un UPDATE conditionnel (stock_p = stock_p + delta tant
+        que le stock reste positif, un stock NULL valant 0) : pas de lecture
+        préalable, pas de mise à jour perdue. Une variation nulle réussit sans
+        écriture si le produit existe. Les lignes sont verrouillées dans l'ordre
+        des clés primaires pour éviter les interblocages entre lots concurrents.
+        Chaque variation appliquée ajoute un mouvement à l'historique des stocks,
+        dans la même transaction.
+        
+        Args:
+            connection: Connexion à la bdd
+            movements: Liste de couples (id_p, delta)
+            user_id: Utilisateur auteur des mouvements
+            
+        Returns:
+            Liste de booléens (un par mouvement, dans l'ordre reçu) indiquant si le
+            mouvement a été appliqué, ou None si la transaction a échoué
+        """
+        cursor = None
+        results = [False] * len(movements)
+        try:
+            cursor = connection.cursor()
+            Produit._lock_summaries(cursor, Produit._types_of(cursor, [id_p for id_p, delta in movements if delta]))
+            for index in sorted(range(len(movements)), key=lambda i: movements[i][0]):
+                id_p, delta = movements[index]
+                if delta == 0:
+                    cursor.execute('SELECT 1 FROM `produit` WHERE id_p = %s', (id_p,))
+                    results[index] = cursor.fetchone() is not None
+                    continue
+                cursor.execute(
+                    'UPDATE `produit` SET stock_p = COALESCE(stock_p, 0) + %s, updated_by = %s, version = version + 1 '
+                    'WHERE id_p = %s AND COALESCE(stock_p, 0) + %s >= 0',
+                    (delta, user_id, id_p, delta)
+                )
+                results[index] = cursor.rowcount > 0
+            connection.commit()
+            applied = [movement for movement, ok in zip(movements, results) if ok and movement[1]]
+            if applied:
+                Produit._notify("stock", movements=applied)
+            return results
+        except Error as e:
+            logger.error("Erreur MySQL lors de la modification des stocks: %s", e)
+            connection.rollback()
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+
+    @staticmethod
+    def _execute_batch(connection: mysql.connector.MySQLConnection, event: str, statement: str, params: tuple,
+                       ids: Optional[List[int]] = None, type_p: Optional[str] = None,
+                       chunk_size: int = 1000, user_id: Optional[int] = None) -> Optional[int]:
+        """
+        Exécute une instruction ensembliste sur une liste d'IDs ou un type de produit
+        
+        Les longues listes d'IDs sont découpées en paquets de chunk_size, tous
+        exécutés dans la même transaction.
+        
+        Args:
+            connection: Connexion à la bdd
+            event: Événement notifié aux écouteurs après le commit
+            statement: Instruction sans clause WHERE (UPDATE ... SET ... ou DELETE FROM ...)
+            params: Paramètres de l'instruction
+            ids: IDs des produits visés
+            type_p: Type des produits visés (si ids est None)
+            chunk_size: Nombre maximal d'IDs par instruction
+            user_id: Utilisateur auteur de l'opération (@stock_user_id, lu par le
+                trigger de suppression de l'historique des stocks)
+            
+        Returns:
+            Nombre de lignes affectées, ou None en cas d'erreur
+        """
+        cursor = None
+        affected = 0
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SET @stock_user_id = %s', (user_id,))
+            if ids is not None:
+                Produit._lock_summaries(cursor, Produit._types_of(cursor, ids, chunk_size))
+                unique_ids = sorted(set(ids))
+                for start in range(0, len(unique_ids), chunk_size):
+                    chunk = unique_ids[start:start + chunk_size]
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    cursor.execute(f'{statement} WHERE id_p IN ({placeholders})', params + tuple(chunk))
+                    affected += cursor.rowcount
+            else:
+                cursor.execute('SELECT id_type FROM `produit_type` WHERE libelle = %s', (type_p,))
+                Produit._lock_summaries(cursor, [row[0] for row in cursor.fetchall()])
+                cursor.execute(f'{statement} WHERE id_type = {TYPE_ID_SUBQUERY}', params + (type_p,))
+                affected = cursor.rowcount
+            connection.commit()
+            if affected:
+                Produit._notify(event, ids=unique_ids if ids is not None else None, type_p=type_p)
+            return affected
+        except Error as e:
+            logger.error("Erreur MySQL lors de l'opération groupée: %s", e)
+            connection.rollback()
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+    
+    @staticmethod
+    def delete_by_ids(connection: mysql.connector.MySQLConnection, ids: List[int],
+                      chunk_size: int = 1000, user_id: Optional[int] = None) -> Optional[int]:
+        """
+        Supprime plusieurs produits en une transaction
+        
+        Args:
+            connection: Connexion à la bdd
+            ids: IDs des produits à supprimer
+            chunk_size: Nombre maximal d'IDs par instruction
+            user_id: Utilisateur auteur de la suppression
+            
+        Returns:
+            Nombre de produits supprimés, ou None en cas d'erreur
+        """
+        if not ids:
+            return 0
+        return Produit._execute_batch(connection, "delete", 'DELETE FROM `produit`', (), ids=ids,
+                                      chunk_size=chunk_size, user_id=user_id)
+    
+    @staticmethod
+    def update_prices(connection: mysql.connector.MySQLConnection, percent: float,
+                      ids: Optional[List[int]] = None, type_p: Optional[str] = None,
+                      chunk_size: int = 1000, user_id: Optional[int] = None) -> Optional[int]:
+        """
+        Applique une variation de prix en pourcentage à plusieurs produits
+        
+        Args:
+            connection: Connexion à la bdd
+            percent: Variation en pourcentage (ex : 10 pour +10 %, -5 pour -5 %)
+            ids: IDs des produits visés
+            type_p: Type des produits visés (si ids est None)
+            chunk_size: Nombre maximal d'IDs par instruction
+            user_id: Utilisateur auteur de l'opération
+            
+        Returns:
+            Nombre de produits modifiés, ou None en cas d'erreur
+        """
+        return Produit._execute_batch(
+            connection, "batch_update",
+            'UPDATE `produit` SET prix_ht = ROUND(prix_ht * %s, 2), updated_by = %s, version = version + 1',
+            (1 + percent / 100, user_id), ids=ids, type_p=type_p, chunk_size=chunk_size, user_id=user_id
+        )
+    
+    @staticmethod
+    def reset_stocks(connection: mysql.connector.MySQLConnection, stock_p: int,
+                     ids: Optional[List[int]] = None, type_p: Optional[str] = None,
+                     chunk_size: int = 1000, user_id: Optional[int] = None) -> Optional[int]:
+        """
+        Fixe le stock de plusieurs produits à une même valeur
+        
+        Args:
+            connection: Connexion à la bdd
+            stock_p: Nouveau stock
+            ids: IDs des produits visés
+            type_p: Type des produits visés (si ids est None)
+            chunk_size: Nombre maximal d'IDs par instruction
+            user_id: Utilisateur auteur de l'opération
+            
+        Returns:
+            Nombre de produits modifiés, ou None en cas d'erreur
+        """
+        return Produit._execute_batch(
+            connection, "batch_update",
+            'UPDATE `produit` SET stock_p = %s, updated_by = %s, version = version + 1',
+            (stock_p, user_id), ids=ids, type_p=type_p, chunk_size=chunk_size, user_id=user_id
+        )
+
     def to_dict(self) -> Dict[str, Any]:
         """
         Convertit l'objet Produit en dictionnaire
@@ -217,11 +755,14 @@ class Produit:
         return {
             "id_p": self.id_p,
             "type_p": self.type_p,
+            "id_type": self.id_type,
             "designation_p": self.designation_p,
             "prix_ht": self.prix_ht,
             "date_in": self.date_in,
             "timeS_in": self.timeS_in,
-            "stock_p": self.stock_p
+            "stock_p": self.stock_p,
+            "version": self.version,
+            "updated_by": self.updated_by
         }
         
     def __repr__(self) -> str:
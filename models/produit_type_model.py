@@ -0,0 +1,98 @@
+"""
+Modèle ProduitType - Types de produits
+Table `produit_type` (migration 005) : chaque produit référence son type par `id_type`
+"""
+import logging
+from typing import Optional, Dict, Any, List
+import mysql.connector
+from mysql.connector import Error
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProduitType:
+    """
+    Type de produit (libellé et clé entière)
+    """
+
+    def __init__(self, id_type: Optional[int] = None, libelle: str = ""):
+        self.id_type = id_type
+        self.libelle = libelle
+
+    @staticmethod
+    def find_all(connection: mysql.connector.MySQLConnection) -> Optional[List['ProduitType']]:
+        """
+        Récupère tous les types de produits
+
+        Args:
+            connection: Connexion à la bdd
+
+        Returns:
+            Liste des types triée par libellé, ou None en cas d'erreur
+        """
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute('SELECT id_type, libelle FROM `produit_type` ORDER BY libelle')
+            return [
+                ProduitType(id_type=result["id_type"], libelle=result["libelle"])
+                for result in cursor.fetchall()
+            ]
+        except Error as e:
+            logger.error("Erreur MySQL lors de la lecture des types de produits: %s", e)
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+
+    @staticmethod
+    def get_or_create(connection: mysql.connector.MySQLConnection, libelle: str) -> int:
+        """
+        Clé d'un type de produit, créé s'il n'existe pas
+
+        Exécuté dans la transaction de l'appelant, sans commit : le type n'est
+        validé qu'avec le produit qui l'utilise. La lecture précède l'insertion
+        pour ne pas consommer de valeur d'auto-incrément quand le type existe.
+
+        Args:
+            connection: Connexion à la bdd
+            libelle: Libellé du type
+
+        Returns:
+            id_type du type
+
+        Raises:
+            mysql.connector.Error: En cas d'erreur MySQL (gérée par l'appelant)
+        """
+        cursor = connection.cursor()
+        try:
+            cursor.execute('SELECT id_type FROM `produit_type` WHERE libelle = %s', (libelle,))
+            row = cursor.fetchone()
+            if row:
+                return row[0]
+            # Création concurrente du même type : LAST_INSERT_ID renvoie la clé existante
+            cursor.execute(
+                'INSERT INTO `produit_type` (libelle) VALUES (%s) '
+                'ON DUPLICATE KEY UPDATE id_type = LAST_INSERT_ID(id_type)',
+                (libelle,)
+            )
+            return cursor.lastrowid
+        finally:
+            cursor.close()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convertit le type en dictionnaire
+
+        Returns:
+            Dictionnaire représentant le type
+        """
+        return {
+            "id_type": self.id_type,
+            "libelle": self.libelle
+        }
+
+    def __repr__(self) -> str:
+        """Représentation string du type"""
+        return f"ProduitType(id={self.id_type}, libelle='{self.libelle}')"
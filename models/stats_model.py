@@ -0,0 +1,125 @@
+"""
+Modèle ProduitTypeStats - Synthèse du stock par type de produit
+Lit la table `produit_type_summary`, tenue à jour par des triggers (migrations 003, 005 et 007)
+"""
+import logging
+from typing import Optional, Dict, Any, List
+from decimal import Decimal
+import mysql.connector
+from mysql.connector import Error
+
+
+logger = logging.getLogger(__name__)
+
+# Tranches de la synthèse par type (CONNECTION_ID() MOD 16 dans les triggers de la migration 007)
+SUMMARY_SLOTS = 16
+
+
+class ProduitTypeStats:
+    """
+    Synthèse du stock d'un type de produit
+    """
+
+    def __init__(self, type_p: str, nb_produits: int = 0, valeur_stock: Decimal = Decimal("0"),
+                 nb_stock_faible: int = 0, nb_rupture: int = 0, id_type: Optional[int] = None):
+        self.type_p = type_p
+        self.id_type = id_type
+        self.nb_produits = nb_produits
+        self.valeur_stock = valeur_stock
+        self.nb_stock_faible = nb_stock_faible
+        self.nb_rupture = nb_rupture
+
+    @staticmethod
+    def find_all(connection: mysql.connector.MySQLConnection) -> List['ProduitTypeStats']:
+        """
+        Récupère la synthèse de tous les types de produits
+        Coût proportionnel au nombre de types (et de tranches), pas au nombre de produits
+
+        Args:
+            connection: Connexion à la bdd
+
+        Returns:
+            Liste de synthèses triée par type
+        """
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(
+                'SELECT s.id_type, t.libelle AS type_p, SUM(s.nb_produits) AS nb_produits, '
+                'SUM(s.valeur_stock) AS valeur_stock, SUM(s.nb_stock_faible) AS nb_stock_faible, '
+                'SUM(s.nb_rupture) AS nb_rupture FROM `produit_type_summary` s '
+                'JOIN `produit_type` t ON t.id_type = s.id_type '
+                'GROUP BY s.id_type, t.libelle HAVING SUM(s.nb_produits) > 0 ORDER BY t.libelle'
+            )
+            return [
+                ProduitTypeStats(
+                    type_p=result["type_p"],
+                    nb_produits=int(result["nb_produits"]),
+                    valeur_stock=result["valeur_stock"],
+                    nb_stock_faible=int(result["nb_stock_faible"]),
+                    nb_rupture=int(result["nb_rupture"]),
+                    id_type=result["id_type"]
+                )
+                for result in cursor.fetchall()
+            ]
+        except Error as e:
+            logger.error("Erreur MySQL lors de la lecture des statistiques: %s", e)
+            return []
+        finally:
+            if cursor:
+                cursor.close()
+
+    @staticmethod
+    def rebuild(connection: mysql.connector.MySQLConnection) -> Optional[int]:
+        """
+        Recalcule entièrement la synthèse à partir de la table `produit`
+        Corrige une éventuelle dérive ; les écritures concurrentes attendent la fin
+        de la transaction puis sont répercutées par les triggers. Les totaux sont
+        écrits dans la tranche 0, les autres tranches repartent de zéro
+
+        Args:
+            connection: Connexion à la bdd
+
+        Returns:
+            Nombre de types recalculés, ou None en cas d'erreur
+        """
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            cursor.execute('DELETE FROM `produit_type_summary`')
+            cursor.execute(
+                'INSERT INTO `produit_type_summary` (id_type, slot, nb_produits, valeur_stock, nb_stock_faible, nb_rupture) '
+                'SELECT id_type, 0, COUNT(*), COALESCE(SUM(prix_ht * COALESCE(stock_p, 0)), 0), '
+                'SUM(COALESCE(stock_p, 0) BETWEEN 1 AND 10), SUM(COALESCE(stock_p, 0) <= 0) '
+                'FROM `produit` GROUP BY id_type'
+            )
+            count = cursor.rowcount
+            connection.commit()
+            return count
+        except Error as e:
+            logger.error("Erreur MySQL lors de la reconstruction des statistiques: %s", e)
+            connection.rollback()
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convertit la synthèse en dictionnaire
+
+        Returns:
+            Dictionnaire représentant la synthèse
+        """
+        return {
+            "type_p": self.type_p,
+            "id_type": self.id_type,
+            "nb_produits": self.nb_produits,
+            "valeur_stock": float(self.valeur_stock),
+            "nb_stock_faible": self.nb_stock_faible,
+            "nb_rupture": self.nb_rupture
+        }
+
+    def __repr__(self) -> str:
+        """Représentation string de la synthèse"""
+        return f"ProduitTypeStats(type='{self.type_p}', produits={self.nb_produits}, valeur={self.valeur_stock})"
@@ -0,0 +1,301 @@
+"""
+Modèles StockMovement et StockSnapshot - Historique des stocks
+Tables `stock_movement` (un mouvement par changement de stock_p, écrit par les
+triggers de la migration 006) et `stock_snapshot` (stock de chaque produit après
+un mouvement donné, pris en tâche de fond par services/stock_ledger_service.py)
+"""
+import logging
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+import mysql.connector
+from mysql.connector import Error
+
+from config.database import read_connection
+
+logger = logging.getLogger(__name__)
+
+# Verrou nommé de la maintenance de l'historique : un seul worker à la fois
+MAINTENANCE_LOCK = "stock_ledger"
+
+
+class StockMovement:
+    """
+    Mouvement de stock d'un produit (table append-only)
+    """
+
+    def __init__(self, id_movement: int, id_p: int, delta: int, stock_after: int, operation: str,
+                 created_at: datetime, user_id: Optional[int] = None, user_login: Optional[str] = None):
+        self.id_movement = id_movement
+        self.id_p = id_p
+        self.delta = delta
+        self.stock_after = stock_after
+        self.operation = operation
+        self.created_at = created_at
+        self.user_id = user_id
+        self.user_login = user_login
+
+    @staticmethod
+    def find_by_produit(connection: mysql.connector.MySQLConnection, id_p: int,
+                        before: Optional[datetime] = None, limit: int = 50) -> Optional[List['StockMovement']]:
+        """
+        Derniers mouvements d'un produit, du plus récent au plus ancien
+
+        Args:
+            connection: Connexion à la bdd
+            id_p: ID du produit
+            before: Ne renvoie que les mouvements antérieurs ou égaux à cette date
+            limit: Nombre maximal de mouvements
+
+        Returns:
+            Liste de mouvements (avec le login de leur auteur), ou None en cas d'erreur
+        """
+        cursor = None
+        try:
+            cursor = read_connection(connection).cursor(dictionary=True)
+            condition, params = ('', (id_p,)) if before is None else (' AND m.created_at <= %s', (id_p, before))
+            cursor.execute(
+                'SELECT m.*, u.user_login FROM `stock_movement` m '
+                f'LEFT JOIN `user` u ON u.user_id = m.user_id WHERE m.id_p = %s{condition} '
+                'ORDER BY m.created_at DESC, m.id_movement DESC LIMIT %s',
+                params + (limit,)
+            )
+            return [
+                StockMovement(
+                    id_movement=result["id_movement"],
+                    id_p=result["id_p"],
+                    delta=result["delta"],
+                    stock_after=result["stock_after"],
+                    operation=result["operation"],
+                    created_at=result["created_at"],
+                    user_id=result.get("user_id"),
+                    user_login=result.get("user_login")
+                )
+                for result in cursor.fetchall()
+            ]
+        except Error as e:
+            logger.error("Erreur MySQL lors de la lecture des mouvements de stock: %s", e)
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convertit le mouvement en dictionnaire
+
+        Returns:
+            Dictionnaire représentant le mouvement
+        """
+        return {
+            "id_movement": self.id_movement,
+            "id_p": self.id_p,
+            "delta": self.delta,
+            "stock_after": self.stock_after,
+            "operation": self.operation,
+            "created_at": self.created_at,
+            "user_id": self.user_id,
+            "user_login": self.user_login
+        }
+
+    def __repr__(self) -> str:
+        """Représentation string du mouvement"""
+        return f"StockMovement(id={self.id_movement}, produit={self.id_p}, delta={self.delta}, stock={self.stock_after})"
+
+
+class StockSnapshot:
+    """
+    Instantanés du stock par produit et compactage des mouvements
+
+    Un instantané est le stock d'un produit après un mouvement (last_movement_id),
+    daté du mouvement : le stock à une date est celui de l'instantané ou du
+    mouvement le plus récent antérieur à cette date. Les mouvements couverts par
+    un instantané peuvent être supprimés sans changer ce résultat aux dates des
+    instantanés ; entre deux instantanés, la précision devient celle de leur intervalle.
+    """
+
+    @staticmethod
+    def stock_at(connection: mysql.connector.MySQLConnection, id_p: int,
+                 at: datetime) -> Optional[Dict[str, Any]]:
+        """
+        Stock d'un produit à une date
+
+        Lit l'instantané le plus proche avant la date, puis le dernier mouvement
+        entre cet instantané et la date (index (id_p, created_at)) : deux lectures
+        bornées, quelle que soit l'ancienneté de la date.
+
+        Args:
+            connection: Connexion à la bdd
+            id_p: ID du produit
+            at: Date demandée
+
+        Returns:
+            {"stock_p": stock, "as_of": date du dernier changement connu}, {} si le
+            produit n'avait pas d'historique à cette date, None en cas d'erreur
+        """
+        cursor = None
+        try:
+            cursor = read_connection(connection).cursor(dictionary=True)
+            cursor.execute(
+                'SELECT stock_p, snapshot_at FROM `stock_snapshot` '
+                'WHERE id_p = %s AND snapshot_at <= %s ORDER BY snapshot_at DESC, last_movement_id DESC LIMIT 1',
+                (id_p, at)
+            )
+            snapshot = cursor.fetchone()
+            since = snapshot["snapshot_at"] if snapshot else None
+            cursor.execute(
+                'SELECT stock_after, created_at FROM `stock_movement` '
+                'WHERE id_p = %s AND created_at <= %s AND created_at > COALESCE(%s, \'1000-01-01\') '
+                'ORDER BY created_at DESC, id_movement DESC LIMIT 1',
+                (id_p, at, since)
+            )
+            movement = cursor.fetchone()
+            if movement:
+                return {"stock_p": movement["stock_after"], "as_of": movement["created_at"]}
+            if snapshot:
+                return {"stock_p": snapshot["stock_p"], "as_of": snapshot["snapshot_at"]}
+            return {}
+        except Error as e:
+            logger.error("Erreur MySQL lors de la lecture du stock à une date: %s", e)
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+
+    @staticmethod
+    def take(connection: mysql.connector.MySQLConnection, chunk_size: int = 10000,
+             safety_margin: float = 120) -> Optional[int]:
+        """
+        Prend un instantané des produits dont le stock a changé depuis le précédent
+
+        Les mouvements postérieurs au dernier instantané sont parcourus par plages
+        de chunk_size IDs, une transaction courte par plage : pour chaque produit,
+        le stock après son dernier mouvement de la plage.
+
+        Les IDs sont attribués à l'insertion, pas à la validation : un mouvement
+        d'ID inférieur peut devenir visible après un autre. Seuls les mouvements
+        de plus de safety_margin secondes sont pris, pour que l'instantané suivant,
+        qui repart du plus grand ID pris, ne saute aucun mouvement validé en retard.
+
+        Args:
+            connection: Connexion à la bdd
+            chunk_size: Nombre maximal de mouvements parcourus par transaction
+            safety_margin: Ancienneté minimale (secondes) des mouvements pris,
+                           supérieure à la durée de la plus longue transaction
+
+        Returns:
+            Nombre d'instantanés écrits, ou None en cas d'erreur
+        """
+        cursor = None
+        written = 0
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT COALESCE(MAX(last_movement_id), 0) FROM `stock_snapshot`')
+            start = cursor.fetchone()[0]
+            # Parcours de la clé primaire depuis la fin : seuls les mouvements récents sont sautés
+            cursor.execute(
+                'SELECT id_movement FROM `stock_movement` '
+                'WHERE id_movement > %s AND created_at < NOW(6) - INTERVAL %s SECOND '
+                'ORDER BY id_movement DESC LIMIT 1',
+                (start, safety_margin)
+            )
+            row = cursor.fetchone()
+            end = row[0] if row else start
+            connection.commit()
+            while start < end:
+                upper = min(start + chunk_size, end)
+                cursor.execute(
+                    'INSERT IGNORE INTO `stock_snapshot` (id_p, last_movement_id, snapshot_at, stock_p) '
+                    'SELECT m.id_p, m.id_movement, m.created_at, m.stock_after FROM `stock_movement` m '
+                    'JOIN (SELECT MAX(id_movement) AS id_movement FROM `stock_movement` '
+                    'WHERE id_movement > %s AND id_movement <= %s GROUP BY id_p) last '
+                    'ON last.id_movement = m.id_movement',
+                    (start, upper)
+                )
+                written += cursor.rowcount
+                connection.commit()
+                start = upper
+            return written
+        except Error as e:
+            logger.error("Erreur MySQL lors de l'instantané des stocks: %s", e)
+            connection.rollback()
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+
+    @staticmethod
+    def compact(connection: mysql.connector.MySQLConnection, retention_days: int,
+                batch_size: int = 10000) -> Optional[int]:
+        """
+        Supprime les mouvements plus anciens que la rétention et couverts par un instantané
+
+        Suppression par lots de batch_size lignes, un commit par lot, pour ne pas
+        tenir de longue transaction ni de verrous sur les écritures du catalogue.
+
+        Args:
+            connection: Connexion à la bdd
+            retention_days: Ancienneté (jours) au-delà de laquelle un mouvement est compacté
+            batch_size: Nombre maximal de mouvements supprimés par transaction
+
+        Returns:
+            Nombre de mouvements supprimés, ou None en cas d'erreur
+        """
+        cursor = None
+        deleted = 0
+        try:
+            cursor = connection.cursor()
+            while True:
+                cursor.execute(
+                    'DELETE FROM `stock_movement` '
+                    'WHERE created_at < NOW(6) - INTERVAL %s DAY AND EXISTS ('
+                    'SELECT 1 FROM `stock_snapshot` s WHERE s.id_p = stock_movement.id_p '
+                    'AND s.last_movement_id >= stock_movement.id_movement) '
+                    'ORDER BY id_movement LIMIT %s',
+                    (retention_days, batch_size)
+                )
+                count = cursor.rowcount
+                connection.commit()
+                deleted += count
+                if count < batch_size:
+                    return deleted
+        except Error as e:
+            logger.error("Erreur MySQL lors du compactage des mouvements de stock: %s", e)
+            connection.rollback()
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+
+    @staticmethod
+    def acquire_lock(connection: mysql.connector.MySQLConnection) -> bool:
+        """
+        Prend sans attendre le verrou nommé de la maintenance (GET_LOCK)
+
+        Returns:
+            True si le verrou est obtenu, False s'il est tenu par un autre worker ou en cas d'erreur
+        """
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT GET_LOCK(%s, 0)', (MAINTENANCE_LOCK,))
+            return cursor.fetchone()[0] == 1
+        except Error as e:
+            logger.error("Erreur MySQL lors de la prise du verrou de l'historique des stocks: %s", e)
+            return False
+        finally:
+            if cursor:
+                cursor.close()
+
+    @staticmethod
+    def release_lock(connection: mysql.connector.MySQLConnection) -> None:
+        """Libère le verrou nommé de la maintenance"""
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT RELEASE_LOCK(%s)', (MAINTENANCE_LOCK,))
+            cursor.fetchone()
+        except Error as e:
+            logger.error("Erreur MySQL lors de la libération du verrou de l'historique des stocks: %s", e)
+        finally:
+            if cursor:
+                cursor.close()
@@ -2,10 +2,28 @@
 Modèle User - Gestion des utilisateurs
 Ce module contient la logique métier et les opérations CRUD pour les utilisateurs
 """
+import logging
 from typing import Optional, Dict, Any
 from datetime import datetime
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, IntegrityError, errorcode
+
+from config.database import read_connection
+
+
+logger = logging.getLogger(__name__)
+
+
+class UserAlreadyExists(Exception):
+    """
+    Levée à l'insertion quand le login ou l'email est déjà pris
+    L'unicité est garantie par les index uniques de la table `user` (migration 001)
+    """
+
+
+def normalize_email(email: str) -> str:
+    """Normalise un email tel qu'il est stocké en base (sans espaces, en minuscules)"""
+    return email.strip().lower()
 
 
 class User:
@@ -38,7 +56,7 @@ class User:
         """
         cursor = None
         try:
-            cursor = connection.cursor(dictionary=True)
+            cursor = read_connection(connection).cursor(dictionary=True)
             cursor.execute(
                 'SELECT * FROM `user` WHERE user_login = %s', 
                 (login,)
@@ -56,7 +74,7 @@ class User:
                 )
             return None
         except Error as e:
-            print(f"Erreur MySQL lors de la recherche par login: {e}")
+            logger.error("Erreur MySQL lors de la recherche par login: %s", e)
             return None
         finally:
             if cursor:
@@ -76,10 +94,10 @@ class User:
         """
         cursor = None
         try:
-            cursor = connection.cursor(dictionary=True)
+            cursor = read_connection(connection).cursor(dictionary=True)
             cursor.execute(
                 'SELECT * FROM `user` WHERE user_mail = %s', 
-                (email,)
+                (normalize_email(email),)
             )
             result = cursor.fetchone()
             
@@ -94,7 +112,7 @@ class User:
                 )
             return None
         except Error as e:
-            print(f"Erreur MySQL lors de la recherche par email: {e}")
+            logger.error("Erreur MySQL lors de la recherche par email: %s", e)
             return None
         finally:
             if cursor:
@@ -105,6 +123,9 @@ class User:
         """
         Recherche un utilisateur par login OU email
         
+        Un UNION de deux recherches exactes utilise les index uniques
+        de chaque colonne, là où un OR peut provoquer un parcours de table
+        
         Args:
             connection: Connexion à la base de données MySQL
             login: Login de l'utilisateur
@@ -115,10 +136,13 @@ class User:
         """
         cursor = None
         try:
-            cursor = connection.cursor(dictionary=True)
+            cursor = read_connection(connection).cursor(dictionary=True)
             cursor.execute(
-                'SELECT * FROM `user` WHERE user_login = %s OR user_mail = %s', 
-                (login, email)
+                'SELECT * FROM `user` WHERE user_login = %s '
+                'UNION '
+                'SELECT * FROM `user` WHERE user_mail = %s '
+                'LIMIT 1', 
+                (login, normalize_email(email))
             )
             result = cursor.fetchone()
             
@@ -133,7 +157,7 @@ class User:
                 )
             return None
         except Error as e:
-            print(f"Erreur MySQL lors de la recherche par login/email: {e}")
+            logger.error("Erreur MySQL lors de la recherche par login/email: %s", e)
             return None
         finally:
             if cursor:
@@ -164,8 +188,12 @@ class User:
             
         Returns:
             True si la sauvegarde a réussi, False sinon
+            
+        Raises:
+            UserAlreadyExists: si le login ou l'email est déjà utilisé
         """
         cursor = None
+        self.email = normalize_email(self.email)
         try:
             cursor = connection.cursor(dictionary=True)
             
@@ -190,8 +218,14 @@ class User:
                 connection.commit()
                 return True
                 
+        except IntegrityError as e:
+            connection.rollback()
+            if e.errno == errorcode.ER_DUP_ENTRY:
+                raise UserAlreadyExists(str(e)) from e
+            logger.error("Erreur MySQL lors de la sauvegarde: %s", e)
+            return False
         except Error as e:
-            print(f"Erreur MySQL lors de la sauvegarde: {e}")
+            logger.error("Erreur MySQL lors de la sauvegarde: %s", e)
             connection.rollback()
             return False
         finally:
@@ -218,7 +252,48 @@ class User:
             connection.commit()
             return True
         except Error as e:
-            print(f"Erreur MySQL lors de la mise à jour de la date de connexion: {e}")
+            logger.error("Erreur MySQL lors de la mise à jour de la date de connexion: %s", e)
+            connection.rollback()
+            return False
+        finally:
+            if cursor:
+                cursor.close()
+    
+    @staticmethod
+    def update_last_logins(connection: mysql.connector.MySQLConnection, logins: Dict[int, datetime]) -> bool:
+        """
+        Met à jour en une seule requête la date de connexion de plusieurs utilisateurs
+        Utilisée par le tampon d'écriture différée (services/last_login_service.py)
+        
+        Args:
+            connection: Connexion à la base de données MySQL
+            logins: Dictionnaire user_id -> date de dernière connexion
+            
+        Returns:
+            True si la mise à jour a réussi, False sinon
+        """
+        if not logins:
+            return True
+        
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            user_ids = list(logins)
+            cases = " ".join(["WHEN %s THEN %s"] * len(user_ids))
+            placeholders = ", ".join(["%s"] * len(user_ids))
+            params = []
+            for user_id in user_ids:
+                params.extend((user_id, logins[user_id]))
+            params.extend(user_ids)
+            cursor.execute(
+                f'UPDATE `user` SET user_date_login = CASE user_id {cases} END '
+                f'WHERE user_id IN ({placeholders})',
+                tuple(params)
+            )
+            connection.commit()
+            return True
+        except Error as e:
+            logger.error("Erreur MySQL lors de la mise à jour groupée des dates de connexion: %s", e)
             connection.rollback()
             return False
         finally:
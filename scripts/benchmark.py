@@ -0,0 +1,392 @@
+"""
+Micro-benchmarks des unités les plus sollicitées
+Modèles, services et rendu des templates, mesurés sans serveur ni base : les
+lignes MySQL viennent d'une connexion factice remplie avec une graine fixe.
+Chaque benchmark est mesuré en plusieurs exécutions indépendantes ; les résultats
+peuvent être enregistrés comme référence (propre à la machine, non versionnée)
+puis comparés en tenant compte de la dispersion entre exécutions
+
+Utilisation :
+    python scripts/benchmark.py                                   # tous les benchmarks
+    python scripts/benchmark.py -k render -k find_all             # sélection par sous-chaîne
+    python scripts/benchmark.py --save                            # référence locale (benchmarks/baseline.json)
+    python scripts/benchmark.py --compare --threshold 0.25 --repeat 7
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+# Racine du projet (répertoire contenant main.py)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Référence locale par défaut (ignorée par git : les temps dépendent de la machine)
+DEFAULT_BASELINE = os.path.join(PROJECT_ROOT, "benchmarks", "baseline.json")
+
+# Graine des données générées (résultats comparables d'une exécution à l'autre)
+SEED = 20240601
+
+# Nombre minimal de mesures et durée visée par exécution d'un benchmark (secondes)
+MIN_ROUNDS = 5
+MAX_TIME = 0.3
+
+# Exécutions indépendantes par benchmark (calibrage et mesures refaits à chaque fois)
+DEFAULT_REPEAT = 5
+
+# Durée minimale d'une mesure : les appels rapides sont répétés dans chaque mesure
+MIN_ROUND_TIME = 0.02
+
+# Dégradation tolérée par défaut du temps minimal (0.2 = 20 %)
+DEFAULT_THRESHOLD = 0.2
+
+# Une dégradation n'est signalée qu'au-delà de ce multiple de la dispersion relative
+# entre exécutions de la référence, en plus du seuil
+NOISE_FACTOR = 4.0
+
+# Tolérance maximale, en multiple du seuil, quelle que soit la dispersion de la référence
+MAX_TOLERANCE_FACTOR = 2.0
+
+# Types de produits des lignes générées
+PRODUCT_TYPES = ("Informatique", "Bureau", "Électroménager", "Jardin", "Outillage", "Papeterie")
+
+
+class Benchmark(NamedTuple):
+    """Benchmark enregistré : setup(rng, taille) retourne la fonction mesurée"""
+    name: str
+    setup: Callable[[random.Random, Optional[int]], Callable[[], Any]]
+    size: Optional[int]
+
+    @property
+    def id(self) -> str:
+        return self.name if self.size is None else f"{self.name}[{self.size}]"
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, sizes: Sequence[Optional[int]] = (None,)):
+    """Enregistre une fonction de préparation, une fois par taille"""
+    def register(setup):
+        for size in sizes:
+            BENCHMARKS.append(Benchmark(name, setup, size))
+        return setup
+    return register
+
+
+class FakeCursor:
+    """Curseur factice renvoyant des lignes préparées"""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+
+    def execute(self, query: str, params: Any = None) -> None:
+        pass
+
+    def fetchall(self) -> List[Dict[str, Any]]:
+        return self.rows
+
+    def close(self) -> None:
+        pass
+
+
+class FakeConnection:
+    """Connexion factice tenant lieu de la base locale pour les méthodes find_*"""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+
+    def cursor(self, dictionary: bool = False) -> FakeCursor:
+        return FakeCursor(self.rows)
+
+
+def generate_rows(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    """Lignes de la table produit, telles que renvoyées par un curseur dictionnaire"""
+    first_day = date(2020, 1, 1)
+    return [
+        {
+            "id_p": id_p,
+            "type_p": rng.choice(PRODUCT_TYPES),
+            "designation_p": f"Produit {rng.choice(PRODUCT_TYPES).lower()} n°{id_p}",
+            "prix_ht": Decimal(rng.randint(100, 100000)) / 100,
+            "date_in": first_day + timedelta(days=rng.randint(0, 1500)),
+            "timeS_in": None,
+            "stock_p": rng.randint(0, 500),
+            "version": rng.randint(0, 5),
+        }
+        for id_p in range(1, count + 1)
+    ]
+
+
+def generate_produits(rng: random.Random, count: int) -> list:
+    from models.produit_model import Produit
+    return Produit.find_all(FakeConnection(generate_rows(rng, count)))
+
+
+@benchmark("produit.find_all", sizes=(10, 1000, 100000))
+def bench_find_all(rng: random.Random, size: int) -> Callable[[], Any]:
+    """Matérialisation des lignes en objets Produit"""
+    from models.produit_model import Produit
+    connection = FakeConnection(generate_rows(rng, size))
+    return lambda: Produit.find_all(connection)
+
+
+@benchmark("produit.to_dict", sizes=(1000,))
+def bench_to_dict(rng: random.Random, size: int) -> Callable[[], Any]:
+    produits = generate_produits(rng, size)
+    return lambda: [produit.to_dict() for produit in produits]
+
+
+@benchmark("auth.hash_password")
+def bench_hash_password(rng: random.Random, size: None) -> Callable[[], Any]:
+    from services.auth_service import auth_service
+    password = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(12))
+    return lambda: auth_service.hash_password(password)
+
+
+@benchmark("auth.verify_password")
+def bench_verify_password(rng: random.Random, size: None) -> Callable[[], Any]:
+    from services.auth_service import auth_service
+    password = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(12))
+    password_hash = auth_service.hash_password(password)
+    return lambda: auth_service.verify_password(password, password_hash)
+
+
+@benchmark("validation.registration", sizes=(100,))
+def bench_validate_registration(rng: random.Random, size: int) -> Callable[[], Any]:
+    """Inscriptions valides et invalides (login court, email ou mot de passe incorrects)"""
+    from services.validation_service import validation_service
+    samples = []
+    for index in range(size):
+        login = f"utilisateur{index}" if rng.random() < 0.8 else "ab"
+        email = f"{login}@example.com" if rng.random() < 0.8 else f"{login}.example.com"
+        password = "motdepasse123" if rng.random() < 0.8 else "abc"
+        samples.append((login, email, password))
+    return lambda: [validation_service.validate_registration_data(*sample) for sample in samples]
+
+
+@benchmark("session.flash_messages", sizes=(100,))
+def bench_flash_messages(rng: random.Random, size: int) -> Callable[[], Any]:
+    """Cycles ajout de messages flash (échappement HTML) puis lecture par la page suivante"""
+    from starlette.requests import Request
+    from services.session_service import session_service
+    request = Request({"type": "http", "session": {}})
+    messages = [f"Le produit 'Produit <{index}>' a été ajouté avec succès !" for index in range(3)]
+
+    def run():
+        for _ in range(size):
+            for message in messages:
+                session_service.add_flash_message(request, message, "success")
+            session_service.get_flash_messages(request)
+    return run
+
+
+@benchmark("template.produits", sizes=(10, 1000, 100000))
+def bench_render_produits(rng: random.Random, size: int) -> Callable[[], Any]:
+    """Rendu de produits.html (liste complète)"""
+    from fastapi.templating import Jinja2Templates
+    from config.app_config import app_config
+    templates = Jinja2Templates(directory=os.path.join(PROJECT_ROOT, app_config.TEMPLATES_DIR))
+    template = templates.get_template("produit/produits.html")
+    context = {
+        "request": None,
+        "produits": generate_produits(rng, size),
+        "user": {"user_id": 1, "login": "benchmark", "email": "benchmark@example.com"},
+        "flash_messages": [{"message": "Le produit a été ajouté avec succès !", "category": "success"}],
+        "query": "",
+    }
+    return lambda: template.render(context)
+
+
+def measure(fn: Callable[[], Any]) -> Dict[str, Any]:
+    """
+    Mesure fn : calibre le nombre d'appels par mesure, puis enchaîne les mesures
+    (au moins MIN_ROUNDS, dans la limite de MAX_TIME)
+
+    Returns:
+        Statistiques du temps d'un appel (secondes) et nombre de mesures
+    """
+    fn()  # Chauffe (imports paresseux, caches)
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_ROUND_TIME:
+            break
+        number *= 10 if elapsed < MIN_ROUND_TIME / 10 else 2
+
+    timings = [elapsed / number]
+    deadline = time.perf_counter() + MAX_TIME
+    while len(timings) < MIN_ROUNDS or time.perf_counter() < deadline:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - started) / number)
+    return {
+        "rounds": len(timings),
+        "iterations": number,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def measure_repeated(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """
+    Exécute measure repeat fois et résume les exécutions
+
+    La valeur comparée est le temps minimal : la charge de la machine ne peut que
+    l'allonger. La médiane des minimums des exécutions écarte une exécution
+    isolée, plus rapide ou plus lente que les autres.
+
+    Returns:
+        "min" : médiane des temps minimaux des exécutions (valeur comparée),
+        "median" : médiane des temps médians des exécutions, "spread" : écart
+        absolu médian des minimums rapporté à "min" (bruit de la machine), et
+        les minimums de chaque exécution
+    """
+    runs = [measure(fn) for _ in range(max(1, repeat))]
+    minimums = [run["min"] for run in runs]
+    best = statistics.median(minimums)
+    return {
+        "runs": len(runs),
+        "rounds": sum(run["rounds"] for run in runs),
+        "min": best,
+        "median": statistics.median(run["median"] for run in runs),
+        "spread": statistics.median(abs(value - best) for value in minimums) / best if best > 0 else 0.0,
+        "run_minimums": minimums,
+    }
+
+
+def format_time(seconds: float) -> str:
+    for unit, factor in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= factor:
+            return f"{seconds / factor:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def run(selection: List[str], repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Exécute les benchmarks sélectionnés (tous si selection est vide), repeat fois chacun"""
+    results = {}
+    print(f"{'benchmark':<34} {'mesures':>8} {'min':>11} {'médiane':>11} {'dispersion':>11} {'ops/s':>10}")
+    for bench in BENCHMARKS:
+        if selection and not any(pattern in bench.id for pattern in selection):
+            continue
+        fn = bench.setup(random.Random(SEED), bench.size)
+        stats = measure_repeated(fn, repeat)
+        results[bench.id] = stats
+        print(f"{bench.id:<34} {stats['rounds']:>8} {format_time(stats['min']):>11} "
+              f"{format_time(stats['median']):>11} {stats['spread']:>10.1%} "
+              f"{1 / stats['min']:>10.1f}")
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare les temps minimaux (médiane des exécutions) à la référence
+
+    La dégradation tolérée est threshold, relevée à NOISE_FACTOR fois la dispersion
+    entre exécutions de la référence (sans dépasser MAX_TOLERANCE_FACTOR fois threshold) :
+    un écart de l'ordre du bruit de la machine n'est pas une régression. La dispersion
+    de la mesure courante n'est pas prise en compte : une mesure bruitée ne doit pas
+    élargir sa propre tolérance.
+
+    Returns:
+        Benchmarks dont le temps minimal dépasse la référence de plus que la tolérance
+    """
+    if baseline.get("machine") != platform.machine() or baseline.get("python") != platform.python_version():
+        print(f"\nAttention : référence mesurée sur {baseline.get('machine')} / Python {baseline.get('python')}")
+    print(f"\n=== Comparaison avec {baseline.get('revision') or '?'} ({baseline.get('created_at')})")
+    regressions = []
+    for name, stats in results.items():
+        old = baseline["benchmarks"].get(name)
+        if old is None:
+            print(f"{name:<34} (absent de la référence)")
+            continue
+        change = stats["min"] / old["min"] - 1
+        noise = min(NOISE_FACTOR * old.get("spread", 0.0), MAX_TOLERANCE_FACTOR * threshold)
+        tolerance = max(threshold, noise)
+        marker = "REGRESSION" if change > tolerance else "ok"
+        print(f"{name:<34} {format_time(old['min']):>11} -> {format_time(stats['min']):>11} "
+              f"{change:+7.1%}  (tolérance {tolerance:.0%})  {marker}")
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def git_revision() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks des modèles, services et templates")
+    parser.add_argument("-k", dest="selection", action="append", default=[],
+                        help="Ne lance que les benchmarks dont le nom contient cette chaîne")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE,
+                        help=f"Enregistre les résultats (référence) dans ce fichier JSON "
+                             f"(par défaut {os.path.relpath(DEFAULT_BASELINE, PROJECT_ROOT)})")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE,
+                        help=f"Compare à une référence (par défaut {os.path.relpath(DEFAULT_BASELINE, PROJECT_ROOT)})")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Dégradation tolérée du temps minimal (0.2 = 20 %%), relevée selon la dispersion")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="Exécutions indépendantes par benchmark")
+    parser.add_argument("--list", action="store_true", help="Affiche les benchmarks et quitte")
+    args = parser.parse_args()
+
+    if args.list:
+        for bench in BENCHMARKS:
+            print(bench.id)
+        return 0
+
+    if args.compare and not os.path.exists(args.compare):
+        print(f"Référence {args.compare} absente : l'enregistrer d'abord sur cette machine avec --save")
+        return 1
+
+    results = run(args.selection, args.repeat)
+    if not results:
+        print("Aucun benchmark sélectionné")
+        return 1
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "revision": git_revision(),
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "seed": SEED,
+                "repeat": args.repeat,
+                "benchmarks": results,
+            }, f, indent=2)
+        print(f"\nRésultats enregistrés dans {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} régression(s) au-delà de la tolérance : {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
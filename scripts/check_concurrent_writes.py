@@ -0,0 +1,132 @@
+"""
+Vérification des écritures concurrentes sur le catalogue
+Plusieurs connexions appliquent en parallèle des écritures multi-lignes qui
+traversent plusieurs types (mouvements de stock, remises à zéro, variations de
+prix nulles) ; à la fin, aucune transaction ne doit avoir échoué (interblocage
+compris) et la synthèse par type doit correspondre au recalcul depuis `produit`.
+
+À lancer sur une base de test (scripts/generate_data.py) : les stocks sont modifiés.
+
+Utilisation :
+    python scripts/check_concurrent_writes.py --writers 8 --duration 20
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import mysql.connector
+from mysql.connector import Error
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database import db_config  # noqa: E402
+from models.produit_model import Produit  # noqa: E402
+from models.stats_model import ProduitTypeStats  # noqa: E402
+
+
+class ErrorCounter(logging.Handler):
+    """Compte les erreurs MySQL journalisées par les modèles (interblocages à part)"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.errors = Counter()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        message = record.getMessage()
+        self.errors["deadlock" if "1213" in message or "Deadlock" in message else "other"] += 1
+
+
+def writer(ids: List[int], batch_size: int, end: float, seed: int, outcomes: Counter, lock: threading.Lock) -> None:
+    """Boucle d'écritures d'une connexion jusqu'à la date de fin"""
+    rng = random.Random(seed)
+    connection = mysql.connector.connect(**db_config.get_connection_params())
+    try:
+        while time.monotonic() < end:
+            # Ordre quelconque : les produits d'un lot couvrent plusieurs types
+            batch = rng.sample(ids, min(batch_size, len(ids)))
+            operation = rng.choice(("stock", "reset", "prix"))
+            if operation == "stock":
+                results = Produit.adjust_stocks(connection, [(id_p, rng.choice((-1, 1))) for id_p in batch])
+                ok = results is not None
+            elif operation == "reset":
+                ok = Produit.reset_stocks(connection, rng.randint(0, 20), ids=batch) is not None
+            else:
+                ok = Produit.update_prices(connection, 0, ids=batch) is not None
+            with lock:
+                outcomes[f"{operation}_{'ok' if ok else 'failed'}"] += 1
+    finally:
+        connection.close()
+
+
+def expected_summary(connection) -> Dict[int, Tuple[int, float, int, int]]:
+    """Synthèse recalculée depuis `produit` : id_type -> (produits, valeur, stock faible, rupture)"""
+    cursor = connection.cursor()
+    cursor.execute(
+        'SELECT id_type, COUNT(*), COALESCE(SUM(prix_ht * COALESCE(stock_p, 0)), 0), '
+        'SUM(COALESCE(stock_p, 0) BETWEEN 1 AND 10), SUM(COALESCE(stock_p, 0) <= 0) '
+        'FROM `produit` GROUP BY id_type'
+    )
+    rows = {row[0]: (int(row[1]), round(float(row[2]), 2), int(row[3]), int(row[4])) for row in cursor.fetchall()}
+    cursor.close()
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Écritures concurrentes multi-types : interblocages et synthèse")
+    parser.add_argument("--writers", type=int, default=8, help="Connexions écrivant en parallèle")
+    parser.add_argument("--duration", type=float, default=20.0, help="Durée (secondes)")
+    parser.add_argument("--batch-size", type=int, default=50, help="Produits par écriture")
+    parser.add_argument("--seed", type=int, default=1, help="Graine du tirage des lots")
+    args = parser.parse_args()
+
+    counter = ErrorCounter()
+    logging.getLogger("models").addHandler(counter)
+
+    try:
+        connection = mysql.connector.connect(**db_config.get_connection_params())
+    except Error as e:
+        print(f"Erreur de connexion MySQL: {e}")
+        return 1
+    try:
+        ids = Produit.find_ids(connection)
+        if not ids:
+            print("Catalogue vide : lancer d'abord scripts/generate_data.py")
+            return 1
+
+        outcomes: Counter = Counter()
+        lock = threading.Lock()
+        end = time.monotonic() + args.duration
+        threads = [
+            threading.Thread(target=writer, args=(ids, args.batch_size, end, args.seed + index, outcomes, lock))
+            for index in range(args.writers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        expected = expected_summary(connection)
+        actual = {
+            stat.id_type: (stat.nb_produits, round(float(stat.valeur_stock), 2), stat.nb_stock_faible, stat.nb_rupture)
+            for stat in ProduitTypeStats.find_all(connection)
+        }
+    finally:
+        connection.close()
+
+    print(f"{args.writers} écrivains, {args.duration:g} s : "
+          + ", ".join(f"{name}={count}" for name, count in sorted(outcomes.items())))
+    failed = sum(count for name, count in outcomes.items() if name.endswith("_failed"))
+    mismatches = sorted(id_type for id_type in set(expected) | set(actual) if expected.get(id_type) != actual.get(id_type))
+    print(f"Transactions en échec : {failed} (interblocages : {counter.errors['deadlock']})")
+    print(f"Types dont la synthèse diffère du recalcul : {len(mismatches)}" + (f" {mismatches[:10]}" if mismatches else ""))
+    return 1 if failed or mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,409 @@
+"""
+Génération d'un catalogue et d'une base d'utilisateurs synthétiques
+Produits français réalistes (types très inégalement représentés, prix, stocks
+et dates d'entrée plausibles) et utilisateurs avec des hachages bcrypt
+précalculés, chargés en masse pour tester l'application à l'échelle de la production
+
+Utilisation :
+    python scripts/generate_data.py --produits 100000 --users 10000
+    python scripts/generate_data.py --produits 10000000 --method load-data --truncate
+    python scripts/generate_data.py --produits 1000000 --users 0 --dump /tmp/donnees   # fichiers TSV seulement
+
+Tous les utilisateurs générés ont le mot de passe --password ("motdepasse" par
+défaut). Les caches de l'application (recherche, statistiques) sont construits au
+démarrage : relancer l'application après un chargement.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import unicodedata
+from datetime import date, datetime, timedelta
+from itertools import accumulate, islice
+from math import log
+from random import Random
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import mysql.connector
+from mysql.connector import Error
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database import db_config  # noqa: E402
+
+
+# Colonnes chargées (id_p, user_id, version et updated_at gardent leur valeur par défaut)
+PRODUIT_COLUMNS = ("id_type", "designation_p", "prix_ht", "date_in", "timeS_in", "stock_p")
+USER_COLUMNS = ("user_login", "user_password", "user_mail", "user_date_new", "user_date_login")
+
+# Types de produits : (type, noms, qualificatifs, déclinaisons, prix médian HT, dispersion du prix)
+# Classés du plus au moins fréquent : le poids du rang r est 1 / r^skew (loi de Zipf)
+PRODUCT_TYPES = (
+    ("Alimentation", ("Café en grains", "Thé vert", "Pâtes", "Riz basmati", "Huile d'olive", "Chocolat noir",
+                      "Confiture", "Miel", "Biscuits", "Farine"),
+     ("bio", "équitable", "artisanal", "extra", "premium", "du terroir"),
+     ("100 g", "250 g", "500 g", "1 kg", "1 L", "lot de 3"), 4.5, 0.6),
+    ("Électronique", ("Casque audio", "Chargeur USB-C", "Clé USB", "Enceinte", "Écouteurs", "Câble HDMI",
+                      "Batterie externe", "Webcam", "Montre connectée", "Radio réveil"),
+     ("Bluetooth", "sans fil", "compact", "haute fidélité", "étanche", "rapide"),
+     ("noir", "blanc", "32 Go", "64 Go", "2 m", "20 W"), 35.0, 0.8),
+    ("Papeterie", ("Carnet", "Stylo bille", "Classeur", "Bloc-notes", "Agrafeuse", "Marqueurs", "Cahier",
+                   "Surligneurs", "Enveloppes", "Trombones"),
+     ("recyclé", "ligné", "quadrillé", "métallique", "effaçable", "couleur"),
+     ("A4", "A5", "lot de 10", "noir", "bleu", "boîte de 100"), 3.5, 0.7),
+    ("Meubles", ("Chaise de bureau", "Table basse", "Fauteuil", "Bibliothèque", "Armoire", "Lit",
+                 "Commode", "Étagère murale", "Bureau", "Canapé"),
+     ("en chêne", "ergonomique", "scandinave", "en pin", "design", "pliant"),
+     ("2 portes", "3 étagères", "90x200", "140x190", "gris", "blanc"), 150.0, 0.7),
+    ("Informatique", ("Souris", "Clavier", "Écran LED", "Disque SSD", "Routeur Wi-Fi", "Imprimante",
+                      "Ordinateur portable", "Carte mémoire", "Hub USB", "Tapis de souris"),
+     ("sans fil", "mécanique", "gaming", "professionnel", "ultra-fin", "rétroéclairé"),
+     ("24 pouces", "27 pouces", "512 Go", "1 To", "AZERTY", "noir"), 60.0, 1.0),
+    ("Vêtements", ("T-shirt", "Pull", "Jean", "Veste", "Chemise", "Robe", "Écharpe", "Pantalon",
+                   "Sweat à capuche", "Manteau"),
+     ("en coton", "en laine", "slim", "oversize", "imperméable", "en lin"),
+     ("taille S", "taille M", "taille L", "taille XL", "bleu marine", "gris chiné"), 29.0, 0.6),
+    ("Électroménager", ("Aspirateur", "Cafetière", "Bouilloire", "Grille-pain", "Four micro-ondes",
+                        "Robot pâtissier", "Fer à repasser", "Mixeur", "Lave-linge", "Réfrigérateur"),
+     ("silencieux", "programmable", "inox", "compact", "sans sac", "classe A"),
+     ("1,7 L", "20 L", "800 W", "2000 W", "blanc", "noir"), 80.0, 0.9),
+    ("Bricolage", ("Perceuse", "Tournevis", "Marteau", "Scie", "Niveau à bulle", "Mètre ruban",
+                   "Ponceuse", "Visseuse", "Boîte à outils", "Chevilles"),
+     ("sans fil", "professionnel", "magnétique", "renforcé", "électrique", "multifonction"),
+     ("18 V", "5 m", "lot de 50", "set de 12", "600 W", "compact"), 25.0, 0.9),
+    ("Jardin", ("Tondeuse", "Arrosoir", "Tuyau d'arrosage", "Sécateur", "Salon de jardin", "Terreau",
+                "Pot de fleurs", "Barbecue", "Bâche", "Graines de tomates"),
+     ("en résine", "thermique", "électrique", "universel", "résistant", "en terre cuite"),
+     ("10 L", "20 m", "40 L", "4 places", "lot de 5", "Ø 30 cm"), 20.0, 1.0),
+    ("Sport", ("Ballon de football", "Tapis de yoga", "Haltères", "Raquette de tennis", "Vélo",
+               "Gourde", "Corde à sauter", "Sac de sport", "Casque de vélo", "Chaussettes de running"),
+     ("antidérapant", "réglable", "léger", "renforcé", "isotherme", "respirant"),
+     ("taille 5", "2 kg", "750 ml", "taille M", "lot de 3", "bleu"), 22.0, 0.9),
+    ("Jouets", ("Puzzle", "Jeu de société", "Peluche", "Voiture télécommandée", "Poupée",
+                "Jeu de construction", "Trottinette", "Cubes en bois", "Déguisement", "Ballon sauteur"),
+     ("éducatif", "en bois", "musical", "lumineux", "géant", "magnétique"),
+     ("1000 pièces", "dès 3 ans", "dès 6 ans", "lot de 12", "30 cm", "rouge"), 18.0, 0.7),
+    ("Beauté", ("Crème hydratante", "Shampooing", "Parfum", "Rouge à lèvres", "Mascara", "Gel douche",
+                "Sérum", "Vernis à ongles", "Masque visage", "Baume à lèvres"),
+     ("bio", "à l'aloe vera", "hypoallergénique", "sans parfum", "nourrissant", "à l'argan"),
+     ("50 ml", "100 ml", "250 ml", "400 ml", "lot de 2", "rose"), 9.0, 0.7),
+    ("Librairie", ("Roman policier", "Bande dessinée", "Livre de cuisine", "Guide de voyage",
+                   "Dictionnaire", "Manga", "Atlas", "Livre jeunesse", "Essai", "Recueil de poèmes"),
+     ("illustré", "de poche", "relié", "grand format", "édition collector", "en couleur"),
+     ("tome 1", "tome 2", "édition 2024", "coffret", "français", "bilingue"), 12.0, 0.5),
+    ("Animalerie", ("Croquettes pour chat", "Croquettes pour chien", "Litière", "Arbre à chat",
+                    "Laisse", "Gamelle", "Panier", "Jouet pour chien", "Aquarium", "Graines pour oiseaux"),
+     ("sans céréales", "agglomérante", "réglable", "en inox", "antidérapant", "XXL"),
+     ("2 kg", "10 kg", "10 L", "60 L", "taille M", "lot de 2"), 15.0, 0.8),
+    ("Cuisine", ("Poêle", "Casserole", "Couteau de chef", "Planche à découper", "Saladier", "Cocotte",
+                 "Moule à gâteau", "Fouet", "Service de table", "Verres à vin"),
+     ("anti-adhésive", "en fonte", "en inox", "en bambou", "en silicone", "en porcelaine"),
+     ("Ø 24 cm", "Ø 28 cm", "4 L", "set de 6", "lot de 3", "20 cm"), 24.0, 0.7),
+    ("Décoration", ("Bougie parfumée", "Cadre photo", "Coussin", "Miroir", "Vase", "Horloge murale",
+                    "Tapis", "Rideaux", "Lampe de chevet", "Plaid"),
+     ("en velours", "en rotin", "bohème", "en céramique", "doré", "en lin"),
+     ("40x40 cm", "160x230 cm", "Ø 50 cm", "lot de 2", "blanc", "terracotta"), 19.0, 0.8),
+    ("Hygiène", ("Dentifrice", "Brosse à dents", "Savon", "Déodorant", "Coton-tiges", "Mouchoirs",
+                 "Papier toilette", "Lingettes", "Rasoir", "Gel hydroalcoolique"),
+     ("au charbon", "sensitive", "extra-doux", "recyclable", "écologique", "menthe"),
+     ("75 ml", "lot de 4", "boîte de 100", "12 rouleaux", "200 ml", "lot de 2"), 4.0, 0.6),
+    ("Bébé", ("Couches", "Biberon", "Poussette", "Siège auto", "Body", "Tétine", "Lit parapluie",
+              "Chaise haute", "Gigoteuse", "Thermomètre de bain"),
+     ("taille 3", "anti-colique", "pliable", "évolutif", "en coton bio", "réglable"),
+     ("0-6 mois", "6-12 mois", "lot de 2", "240 ml", "paquet de 50", "gris"), 25.0, 1.0),
+    ("Auto-moto", ("Essuie-glaces", "Huile moteur", "Housse de siège", "Chargeur allume-cigare",
+                   "Câbles de démarrage", "Casque moto", "Ampoule H7", "Tapis de sol", "Gilet jaune",
+                   "Liquide de refroidissement"),
+     ("universel", "renforcé", "longue durée", "haute visibilité", "5W30", "homologué"),
+     ("5 L", "1 L", "lot de 2", "taille L", "jeu de 4", "12 V"), 18.0, 0.8),
+    ("Chaussures", ("Baskets", "Bottines", "Sandales", "Mocassins", "Chaussons", "Escarpins",
+                    "Chaussures de randonnée", "Bottes de pluie", "Espadrilles", "Derbies"),
+     ("en cuir", "en toile", "imperméables", "légères", "fourrées", "à lacets"),
+     ("pointure 38", "pointure 40", "pointure 42", "pointure 44", "noir", "camel"), 45.0, 0.6),
+)
+
+# Marques fictives ajoutées aux désignations
+BRANDS = ("Lumina", "Provenzo", "Atelier Morel", "Dufresne", "Bel Azur", "Kerlann", "Montclair",
+          "Maison Leroux", "Véga", "Arvor", "Solèa", "Boréal", "Cap Horn", "Vauclair", "Orféa",
+          "Les Tilleuls", "Mistral", "Granit", "Brocéliande", "Saint-Clair")
+
+FIRST_NAMES = ("Marie", "Jean", "Camille", "Lucas", "Léa", "Hugo", "Chloé", "Louis", "Manon", "Gabriel",
+               "Emma", "Arthur", "Inès", "Jules", "Sarah", "Nathan", "Zoé", "Thomas", "Louise", "Théo",
+               "Jade", "Raphaël", "Alice", "Paul", "Juliette", "Adam", "Lina", "Maël", "Anaïs", "Noé",
+               "Océane", "Antoine", "Clément", "Mathilde", "Élodie", "François", "Hélène", "Benoît")
+LAST_NAMES = ("Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy",
+              "Moreau", "Simon", "Laurent", "Lefèvre", "Michel", "Garcia", "David", "Bertrand", "Roux",
+              "Vincent", "Fournier", "Morel", "Girard", "André", "Mercier", "Dupont", "Lambert", "Bonnet",
+              "François", "Martinez", "Legrand", "Garnier", "Faure", "Rousseau", "Blanc", "Guérin")
+# Domaines des emails et leur poids
+MAIL_DOMAINS = (("gmail.com", 40), ("orange.fr", 15), ("hotmail.fr", 10), ("free.fr", 9), ("yahoo.fr", 7),
+                ("outlook.fr", 7), ("laposte.net", 5), ("sfr.fr", 4), ("wanadoo.fr", 3))
+
+
+def batched(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def ascii_fold(text: str) -> str:
+    """Supprime les accents ("Léa" -> "Lea") pour les logins et les emails"""
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+def round_price(rng: Random, value: float) -> str:
+    """Prix psychologiques : majoritairement en ,99 ou ,50"""
+    roll = rng.random()
+    if value >= 2 and roll < 0.6:
+        return f"{int(value) - 0.01:.2f}"
+    if value >= 1 and roll < 0.8:
+        return f"{int(value) + 0.5:.2f}"
+    return f"{max(value, 0.5):.2f}"
+
+
+def produit_rows(rng: Random, count: int, skew: float, years: int, type_ids: Dict[str, int]) -> Iterator[Tuple]:
+    """
+    Produits générés (dans l'ordre de PRODUIT_COLUMNS)
+
+    Args:
+        count: Nombre de produits
+        skew: Exposant de la loi de Zipf des types (0 = types équiprobables)
+        years: Ancienneté maximale des dates d'entrée (les dates récentes sont plus fréquentes)
+        type_ids: id_type de chaque type de PRODUCT_TYPES
+    """
+    cumulative = list(accumulate(1 / rank ** skew for rank in range(1, len(PRODUCT_TYPES) + 1)))
+    today = date.today()
+    span = years * 365
+    for _ in range(count):
+        type_p, nouns, qualifiers, variants, median, sigma = rng.choices(PRODUCT_TYPES, cum_weights=cumulative)[0]
+        designation = f"{rng.choice(nouns)} {rng.choice(qualifiers)} {rng.choice(BRANDS)} {rng.choice(variants)}"
+        prix_ht = round_price(rng, min(median * rng.lognormvariate(0, sigma), 99999.0))
+
+        roll = rng.random()
+        if roll < 0.05:
+            stock_p = 0
+        elif roll < 0.20:
+            stock_p = rng.randint(1, 10)
+        else:
+            stock_p = min(11 + int(rng.lognormvariate(log(50), 0.9)), 5000)
+
+        date_in = today - timedelta(days=int(span * rng.random() ** 2))
+        time_in = datetime.combine(date_in, datetime.min.time()) + timedelta(seconds=rng.randint(8 * 3600, 19 * 3600))
+        yield (type_ids[type_p], designation, prix_ht, date_in.isoformat(), time_in.strftime("%Y-%m-%d %H:%M:%S"), stock_p)
+
+
+def user_rows(rng: Random, count: int, first_index: int, hashes: Sequence[str], years: int) -> Iterator[Tuple]:
+    """
+    Utilisateurs générés (dans l'ordre de USER_COLUMNS)
+
+    Args:
+        first_index: Suffixe numérique du premier login (les logins restent uniques d'un chargement à l'autre)
+        hashes: Hachages bcrypt précalculés, attribués à tour de rôle
+    """
+    domains = [domain for domain, _ in MAIL_DOMAINS]
+    cumulative = list(accumulate(weight for _, weight in MAIL_DOMAINS))
+    now = datetime.now().replace(microsecond=0)
+    span = years * 365 * 86400
+    for index in range(first_index, first_index + count):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        login = ascii_fold(f"{first_name}.{last_name}".lower()).replace(" ", "")[:40] + str(index)
+        mail = f"{login}@{rng.choices(domains, cum_weights=cumulative)[0]}"
+        created = now - timedelta(seconds=rng.randint(0, span))
+        last_login = created + timedelta(seconds=int((now - created).total_seconds() * rng.random() ** 0.3))
+        yield (login, hashes[index % len(hashes)], mail,
+               created.strftime("%Y-%m-%d %H:%M:%S"), last_login.strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def precompute_hashes(password: str, count: int) -> List[str]:
+    """Hachages bcrypt du mot de passe commun (sels différents), calculés une seule fois"""
+    from services.auth_service import auth_service
+    started = time.perf_counter()
+    hashes = [auth_service.hash_password(password) for _ in range(count)]
+    print(f"{count} hachage(s) bcrypt précalculé(s) en {time.perf_counter() - started:.1f} s")
+    return hashes
+
+
+class Progress:
+    """Affiche l'avancement d'un chargement"""
+
+    def __init__(self, table: str, total: int):
+        self.table = table
+        self.total = total
+        self.done = 0
+        self.started = time.perf_counter()
+
+    def advance(self, rows: int) -> None:
+        self.done += rows
+        elapsed = time.perf_counter() - self.started
+        print(f"{self.table}: {self.done}/{self.total} lignes ({self.done / elapsed:.0f} lignes/s)", flush=True)
+
+
+def tsv_line(row: Tuple) -> str:
+    """Ligne au format par défaut de LOAD DATA (tabulations, pas de caractère à échapper)"""
+    return "\t".join(str(value) for value in row) + "\n"
+
+
+def insert_rows(connection, table: str, columns: Sequence[str], rows: Iterable[Tuple],
+                batch_size: int, progress: Progress) -> None:
+    """Chargement par INSERT multi-lignes, un commit par lot"""
+    placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    column_list = ", ".join(f"`{column}`" for column in columns)
+    cursor = connection.cursor()
+    try:
+        for batch in batched(rows, batch_size):
+            cursor.execute(
+                f"INSERT INTO `{table}` ({column_list}) VALUES " + ", ".join([placeholder] * len(batch)),
+                [value for row in batch for value in row]
+            )
+            connection.commit()
+            progress.advance(len(batch))
+    finally:
+        cursor.close()
+
+
+def load_data_rows(connection, table: str, columns: Sequence[str], rows: Iterable[Tuple],
+                   chunk_size: int, progress: Progress) -> None:
+    """Chargement par LOAD DATA LOCAL INFILE, un fichier temporaire et un commit par tranche"""
+    column_list = ", ".join(f"`{column}`" for column in columns)
+    cursor = connection.cursor()
+    try:
+        for chunk in batched(rows, chunk_size):
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".tsv", delete=False) as f:
+                f.writelines(tsv_line(row) for row in chunk)
+            try:
+                cursor.execute(
+                    f"LOAD DATA LOCAL INFILE %s INTO TABLE `{table}` CHARACTER SET utf8mb4 "
+                    f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({column_list})",
+                    (f.name,)
+                )
+                connection.commit()
+            finally:
+                os.unlink(f.name)
+            progress.advance(len(chunk))
+    finally:
+        cursor.close()
+
+
+def dump_rows(directory: str, table: str, rows: Iterable[Tuple], progress: Progress) -> None:
+    """Écrit les lignes dans <directory>/<table>.tsv (format de LOAD DATA)"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{table}.tsv"), "w", encoding="utf-8") as f:
+        for chunk in batched(rows, 100000):
+            f.writelines(tsv_line(row) for row in chunk)
+            progress.advance(len(chunk))
+
+
+def resolve_types(connection) -> Dict[str, int]:
+    """id_type des types de PRODUCT_TYPES, créés s'ils n'existent pas"""
+    from models.produit_type_model import ProduitType
+    type_ids = {type_p: ProduitType.get_or_create(connection, type_p) for type_p, *_ in PRODUCT_TYPES}
+    connection.commit()
+    return type_ids
+
+
+def next_user_index(connection) -> int:
+    """Suffixe du premier login : au-delà des utilisateurs existants"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute('SELECT COALESCE(MAX(user_id), 0) + 1 FROM `user`')
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def truncate_produits(connection) -> None:
+    """
+    Vide le catalogue et l'historique des stocks
+
+    TRUNCATE ne déclenche pas les triggers : la synthèse est reconstruite après le chargement.
+    Il remet aussi l'AUTO_INCREMENT à 1 : stock_movement et stock_snapshot sont vidés dans la
+    même étape, sans quoi les nouveaux produits hériteraient de l'historique des anciens id.
+    """
+    cursor = connection.cursor()
+    try:
+        for table in ("stock_movement", "stock_snapshot", "produit"):
+            cursor.execute(f'TRUNCATE TABLE `{table}`')
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Génération de données synthétiques")
+    parser.add_argument("--produits", type=int, default=10000, help="Nombre de produits (10k à 10M)")
+    parser.add_argument("--users", type=int, default=1000, help="Nombre d'utilisateurs")
+    parser.add_argument("--seed", type=int, default=42, help="Graine (mêmes données à chaque exécution)")
+    parser.add_argument("--skew", type=float, default=1.1, help="Exposant de Zipf de la répartition des types")
+    parser.add_argument("--years", type=int, default=5, help="Ancienneté maximale des produits et comptes")
+    parser.add_argument("--method", choices=("insert", "load-data"), default="insert",
+                        help="INSERT multi-lignes, ou LOAD DATA LOCAL INFILE (local_infile=ON sur le serveur)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Lignes par INSERT multi-lignes")
+    parser.add_argument("--chunk-size", type=int, default=500000, help="Lignes par fichier LOAD DATA")
+    parser.add_argument("--password", default="motdepasse", help="Mot de passe de tous les utilisateurs générés")
+    parser.add_argument("--hash-pool", type=int, default=8, help="Nombre de hachages bcrypt distincts")
+    parser.add_argument("--truncate", action="store_true", help="Vide les produits et leur historique de stock avant le chargement")
+    parser.add_argument("--dump", metavar="DIR",
+                        help="Écrit produit_type.tsv, produit.tsv et user.tsv sans se connecter à MySQL")
+    args = parser.parse_args()
+
+    hashes = precompute_hashes(args.password, args.hash_pool) if args.users else []
+
+    if args.dump:
+        # Sans base : types numérotés dans l'ordre de PRODUCT_TYPES
+        type_ids = {type_p: index for index, (type_p, *_) in enumerate(PRODUCT_TYPES, start=1)}
+        dump_rows(args.dump, "produit_type", [(id_type, type_p) for type_p, id_type in type_ids.items()],
+                  Progress("produit_type", len(type_ids)))
+        produits = produit_rows(Random(args.seed), args.produits, args.skew, args.years, type_ids)
+        dump_rows(args.dump, "produit", produits, Progress("produit", args.produits))
+        if args.users:
+            users = user_rows(Random(args.seed + 1), args.users, 1, hashes, args.years)
+            dump_rows(args.dump, "user", users, Progress("user", args.users))
+        return 0
+
+    connection = None
+    try:
+        params = {**db_config.get_connection_params(), "raise_on_warnings": False, "get_warnings": False}
+        if args.method == "load-data":
+            params["allow_local_infile"] = True
+        connection = mysql.connector.connect(**params)
+
+        if args.truncate:
+            truncate_produits(connection)
+
+        def load(table, columns, rows, total):
+            progress = Progress(table, total)
+            if args.method == "load-data":
+                load_data_rows(connection, table, columns, rows, args.chunk_size, progress)
+            else:
+                insert_rows(connection, table, columns, rows, args.batch_size, progress)
+
+        if args.produits:
+            produits = produit_rows(Random(args.seed), args.produits, args.skew, args.years, resolve_types(connection))
+            load("produit", PRODUIT_COLUMNS, produits, args.produits)
+        if args.users:
+            users = user_rows(Random(args.seed + 1), args.users, next_user_index(connection), hashes, args.years)
+            load("user", USER_COLUMNS, users, args.users)
+
+        if args.truncate:
+            from models.stats_model import ProduitTypeStats
+            ProduitTypeStats.rebuild(connection)
+        # Statistiques de l'optimiseur à jour après un chargement massif
+        cursor = connection.cursor()
+        cursor.execute('ANALYZE TABLE `produit`, `user`')
+        cursor.fetchall()
+        cursor.close()
+        return 0
+    except Error as e:
+        print(f"Erreur MySQL lors du chargement: {e}")
+        return 1
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
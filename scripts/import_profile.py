@@ -0,0 +1,117 @@
+"""
+Profilage du temps d'import de l'application
+Lance `python -X importtime -c "import main"` dans un processus neuf,
+affiche les modules les plus coûteux et vérifie le budget de démarrage
+
+Utilisation :
+    python scripts/import_profile.py                 # rapport des 20 imports les plus lents
+    python scripts/import_profile.py --top 50
+    python scripts/import_profile.py --check         # échoue si `import main` dépasse le budget
+    python scripts/import_profile.py --check --budget-ms 1500 --runs 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, NamedTuple
+
+# Racine du projet (répertoire contenant main.py)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget par défaut pour `import main`, en millisecondes
+DEFAULT_BUDGET_MS = 1500
+
+# Modules qui ne doivent jamais être chargés au démarrage
+FORBIDDEN_AT_STARTUP = ("psycopg", "passlib", "bcrypt")
+
+
+class ImportEntry(NamedTuple):
+    """Une ligne du rapport -X importtime"""
+    self_us: int
+    cumulative_us: int
+    depth: int
+    module: str
+
+
+def run_importtime(target: str = "main") -> List[ImportEntry]:
+    """
+    Importe un module dans un interpréteur neuf avec -X importtime
+
+    Args:
+        target: Nom du module à importer
+
+    Returns:
+        Liste des entrées du rapport, dans l'ordre d'import
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Échec de l'import de {target}:\n{result.stderr}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # Format : "import time:  <self> | <cumulé> | <indentation><module>"
+        self_part, cumulative_part, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append(ImportEntry(int(self_part), int(cumulative_part), depth, name.strip()))
+    return entries
+
+
+def total_import_ms(entries: List[ImportEntry], target: str = "main") -> float:
+    """Retourne le temps cumulé d'import du module cible en millisecondes"""
+    for entry in reversed(entries):
+        if entry.module == target:
+            return entry.cumulative_us / 1000
+    raise ValueError(f"Module {target} absent du rapport")
+
+
+def print_report(entries: List[ImportEntry], top: int) -> None:
+    """Affiche les modules les plus coûteux (temps propre et cumulé)"""
+    print(f"{'propre (ms)':>12} {'cumulé (ms)':>12}  module")
+    for entry in sorted(entries, key=lambda e: e.self_us, reverse=True)[:top]:
+        print(f"{entry.self_us / 1000:12.1f} {entry.cumulative_us / 1000:12.1f}  {entry.module}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Profilage du temps d'import de l'application")
+    parser.add_argument("--target", default="main", help="Module à importer (défaut : main)")
+    parser.add_argument("--top", type=int, default=20, help="Nombre de modules affichés")
+    parser.add_argument("--check", action="store_true", help="Vérifie le budget au lieu d'afficher le rapport")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Budget en millisecondes")
+    parser.add_argument("--runs", type=int, default=3, help="Nombre de mesures (la meilleure est retenue)")
+    args = parser.parse_args()
+
+    runs = [run_importtime(args.target) for _ in range(max(1, args.runs))]
+    best = min(runs, key=lambda entries: total_import_ms(entries, args.target))
+    elapsed_ms = total_import_ms(best, args.target)
+
+    if not args.check:
+        print_report(best, args.top)
+        print(f"\nimport {args.target} : {elapsed_ms:.1f} ms (meilleure de {len(runs)} mesures)")
+        return 0
+
+    errors = []
+    if elapsed_ms > args.budget_ms:
+        errors.append(f"import {args.target} : {elapsed_ms:.1f} ms > budget de {args.budget_ms:.0f} ms")
+    loaded = {entry.module.split(".")[0] for entry in best}
+    for module in FORBIDDEN_AT_STARTUP:
+        if module in loaded:
+            errors.append(f"le module '{module}' est importé au démarrage")
+
+    if errors:
+        for error in errors:
+            print(f"ÉCHEC : {error}")
+        return 1
+
+    print(f"OK : import {args.target} en {elapsed_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
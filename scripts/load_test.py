@@ -0,0 +1,641 @@
+"""
+Test de charge HTTP de l'application
+Des utilisateurs virtuels (un thread et une connexion keep-alive chacun) enchaînent
+des parcours réalistes couvrant toutes les routes de main.register_routes, à
+plusieurs niveaux de concurrence. Le rapport donne, par route, les latences
+p50/p95/p99, le débit et le taux d'erreur ; il est enregistré en JSON pour
+comparer deux versions
+
+Prérequis : l'application lancée sur une base locale (migrations appliquées et
+quelques produits), par exemple `python server.py`. Les parcours créent des
+utilisateurs et des produits préfixés par "loadtest" ; ils suppriment leurs produits.
+
+Utilisation :
+    python scripts/load_test.py                                   # 1, 10 et 50 utilisateurs, 30 s par palier
+    python scripts/load_test.py --concurrency 5,20 --duration 60 --mix browse=70,crud=25,auth=5
+    python scripts/load_test.py --output loadtest/avant.json
+    python scripts/load_test.py --compare loadtest/avant.json --fail-on-regression
+    python scripts/load_test.py --list-routes                     # routes enregistrées, sans charge
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode, urlsplit
+
+# Racine du projet (répertoire contenant main.py)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Répertoire par défaut des résultats
+DEFAULT_OUTPUT_DIR = os.path.join(PROJECT_ROOT, "loadtest")
+
+# Percentiles rapportés pour chaque route
+PERCENTILES = (50, 95, 99)
+
+# Parcours par défaut et leur poids : navigation anonyme, inscription/connexion, CRUD connecté
+DEFAULT_MIX = "browse=80,crud=15,auth=5"
+
+# Pages de la navigation anonyme : (poids, nom de la route)
+BROWSE_PAGES = (
+    (10, "list_produits"),
+    (10, "view_produit"),
+    (8, "search_produits"),
+    (8, "autocomplete_produits"),
+    (4, "home"),
+    (3, "stats_produits"),
+    (2, "stats_produits_data"),
+    (2, "analytics_prix"),
+    (2, "analytics_stock"),
+    (2, "analytics_valeur"),
+    (2, "login_form"),
+    (2, "register_form"),
+    (1, "catalog_events"),
+)
+
+# Compteurs de diagnostic (connexion requise), consultés une fois par parcours CRUD
+DIAGNOSTIC_PAGES = ("concurrency_stats", "single_flight_stats", "group_commit_stats")
+
+# Pages vues à chaque parcours de navigation
+BROWSE_PAGES_PER_VISIT = 5
+
+# Mot de passe des utilisateurs créés par le test
+PASSWORD = "loadtest-password"
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Percentile par interpolation linéaire
+
+    Args:
+        values: Valeurs triées
+        q: Percentile (0 à 100)
+    """
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Convertit "browse=80,crud=15,auth=5" en poids par parcours"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Parcours inconnu: {name} (parcours : {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Client:
+    """Connexion HTTP keep-alive avec les cookies de session d'un utilisateur"""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.cookies: Dict[str, str] = {}
+        self._connection: Optional[http.client.HTTPConnection] = None
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Envoie une requête (redirections non suivies)
+
+        Returns:
+            (statut, en-têtes en minuscules, corps)
+        """
+        headers = dict(headers or {})
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in self.cookies.items())
+        for attempt in (0, 1):
+            connection = self._connect()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # Connexion keep-alive fermée par le serveur entre deux requêtes
+                self.close()
+                if attempt:
+                    raise
+            except Exception:
+                self.close()
+                raise
+        self._store_cookies(response)
+        if response.getheader("connection", "").lower() == "close":
+            self.close()
+        return response.status, {name.lower(): value for name, value in response.getheaders()}, data
+
+    def first_event(self, path: str) -> int:
+        """
+        Ouvre un flux Server-Sent Events sur une connexion dédiée et lit son premier message
+
+        Returns:
+            Statut HTTP
+        """
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request("GET", path, headers={"Accept": "text/event-stream"})
+            response = connection.getresponse()
+            if response.status == 200:
+                buffer = b""
+                while b"\n\n" not in buffer:
+                    chunk = response.fp.readline()
+                    if not chunk:
+                        break
+                    buffer += chunk
+            return response.status
+        finally:
+            connection.close()
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._connection is None:
+            self._connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return self._connection
+
+    def _store_cookies(self, response: http.client.HTTPResponse) -> None:
+        for header in response.msg.get_all("set-cookie") or []:
+            name, _, value = header.split(";", 1)[0].partition("=")
+            if "max-age=0" in header.lower() or value in ("", "null"):
+                self.cookies.pop(name.strip(), None)
+            else:
+                self.cookies[name.strip()] = value.strip()
+
+
+class Catalog:
+    """IDs et mots des produits existants, relevés avant la charge"""
+
+    def __init__(self, ids: List[int], terms: List[str]):
+        self.ids = ids
+        self.terms = terms or ["produit"]
+
+    @classmethod
+    def discover(cls, client: Client) -> "Catalog":
+        _, _, body = client.request("GET", "/produits")
+        ids = sorted({int(id_p) for id_p in re.findall(rb'data-id="(\d+)"', body)})
+        terms = set()
+        for prefix in "acdeilmprst":
+            status, _, body = client.request("GET", "/produits/autocomplete?" + urlencode({"q": prefix}))
+            if status != 200:
+                continue
+            for suggestion in json.loads(body):
+                terms.update(word for word in re.findall(r"\w+", suggestion["designation_p"]) if len(word) > 3)
+        return cls(ids, sorted(terms))
+
+
+class VirtualUser:
+    """Utilisateur virtuel : enchaîne les parcours et mesure chaque requête"""
+
+    def __init__(self, index: int, base_url: str, catalog: Catalog, mix: Dict[str, float],
+                 seed: int, timeout: float, think_time: float):
+        self.index = index
+        self.client = Client(base_url, timeout)
+        self.catalog = catalog
+        self.rng = random.Random(seed * 100003 + index)
+        self.scenarios = list(mix)
+        self.weights = [mix[name] for name in self.scenarios]
+        self.think_time = think_time
+        self.login: Optional[str] = None
+        self.logged_in = False
+        # Mesures : route -> latences (secondes), statuts, erreurs
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Counter] = {}
+        self.errors: Dict[str, Counter] = {}
+        self.record_after = 0.0
+
+    def run(self, warmup_end: float, end: float) -> None:
+        """Enchaîne des parcours tirés selon le mélange jusqu'à la fin du palier"""
+        self.record_after = warmup_end
+        while time.perf_counter() < end:
+            scenario = self.rng.choices(self.scenarios, self.weights)[0]
+            try:
+                SCENARIOS[scenario](self)
+            except Exception as e:
+                # Erreur déjà comptée sur la route ; le parcours est abandonné
+                if not isinstance(e, StepFailed):
+                    self.count_error("scenario:" + scenario, type(e).__name__)
+            if self.think_time:
+                time.sleep(self.rng.uniform(0, 2 * self.think_time))
+        self.client.close()
+
+    def call(self, route: str, method: str, path: str, expect: Tuple[int, ...] = (200,),
+             form: Optional[Any] = None, json_body: Optional[Any] = None,
+             location: Optional[str] = None) -> bytes:
+        """
+        Envoie une requête mesurée sous le nom de sa route
+
+        Args:
+            route: Nom de la route (celui de main.register_routes)
+            expect: Statuts attendus
+            form: Champs de formulaire (dict ou liste de paires)
+            json_body: Corps JSON
+            location: Préfixe attendu de l'en-tête Location (une redirection vers
+                      /login signale une session perdue)
+
+        Returns:
+            Corps de la réponse
+
+        Raises:
+            StepFailed: Si la réponse n'est pas celle attendue
+        """
+        body, headers = None, {}
+        if form is not None:
+            body = urlencode(form, doseq=True).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        elif json_body is not None:
+            body = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+
+        started = time.perf_counter()
+        try:
+            status, response_headers, data = self.client.request(method, path, body, headers)
+        except Exception as e:
+            self._record(route, started, type(e).__name__)
+            raise StepFailed(route) from e
+        error = None
+        if status not in expect:
+            error = f"HTTP {status}"
+        elif location is not None and not response_headers.get("location", "").startswith(location):
+            error = f"redirection vers {response_headers.get('location')}"
+        self._record(route, started, error, status)
+        if error:
+            raise StepFailed(route)
+        return data
+
+    def stream(self, route: str, path: str) -> None:
+        """Mesure l'ouverture d'un flux SSE jusqu'à son premier message"""
+        started = time.perf_counter()
+        try:
+            status = self.client.first_event(path)
+        except Exception as e:
+            self._record(route, started, type(e).__name__)
+            raise StepFailed(route) from e
+        self._record(route, started, None if status == 200 else f"HTTP {status}", status)
+
+    def ensure_logged_in(self) -> None:
+        """Inscrit l'utilisateur virtuel au premier parcours qui en a besoin, puis le connecte"""
+        if self.login is None:
+            register(self)
+        elif not self.logged_in:
+            self.call("login_post", "POST", "/login", (303,),
+                      form={"login": self.login, "password": PASSWORD}, location="/")
+            self.logged_in = True
+
+    def random_id(self) -> Optional[int]:
+        return self.rng.choice(self.catalog.ids) if self.catalog.ids else None
+
+    def random_term(self) -> str:
+        return self.rng.choice(self.catalog.terms)
+
+    def _record(self, route: str, started: float, error: Optional[str], status: Optional[int] = None) -> None:
+        if started < self.record_after:
+            return
+        self.latencies.setdefault(route, []).append(time.perf_counter() - started)
+        self.statuses.setdefault(route, Counter())[str(status or "exception")] += 1
+        if error:
+            self.count_error(route, error)
+
+    def count_error(self, route: str, error: str) -> None:
+        self.errors.setdefault(route, Counter())[error] += 1
+
+
+class StepFailed(Exception):
+    """Réponse inattendue : le reste du parcours est abandonné"""
+
+
+def browse(vu: VirtualUser) -> None:
+    """Navigation anonyme : quelques pages tirées selon BROWSE_PAGES"""
+    weights = [weight for weight, _ in BROWSE_PAGES]
+    for _ in range(BROWSE_PAGES_PER_VISIT):
+        route = vu.rng.choices([route for _, route in BROWSE_PAGES], weights)[0]
+        if route == "view_produit":
+            id_p = vu.random_id()
+            if id_p is not None:
+                vu.call(route, "GET", f"/produits/{id_p}")
+        elif route == "search_produits":
+            vu.call(route, "GET", "/produits/search?" + urlencode({"q": vu.random_term()}))
+        elif route == "autocomplete_produits":
+            term = vu.random_term()
+            vu.call(route, "GET", "/produits/autocomplete?" + urlencode({"q": term[:vu.rng.randint(2, len(term))]}))
+        elif route == "catalog_events":
+            vu.stream(route, "/produits/events")
+        else:
+            vu.call(route, "GET", PAGE_PATHS[route])
+
+
+# Chemins des pages sans paramètre
+PAGE_PATHS = {
+    "home": "/",
+    "list_produits": "/produits",
+    "stats_produits": "/produits/stats",
+    "stats_produits_data": "/produits/stats.json",
+    "analytics_prix": "/produits/analytics/prix",
+    "analytics_stock": "/produits/analytics/stock?bins=20",
+    "analytics_valeur": "/produits/analytics/valeur?periode=mois",
+    "login_form": "/login",
+    "register_form": "/register",
+    "concurrency_stats": "/concurrency.json",
+    "single_flight_stats": "/produits/single-flight.json",
+    "group_commit_stats": "/produits/group-commit.json",
+}
+
+
+def register(vu: VirtualUser) -> None:
+    """Inscription d'un nouvel utilisateur (connecté à l'issue)"""
+    login = f"loadtest{uuid.uuid4().hex[:12]}"
+    vu.call("register_form", "GET", "/register")
+    vu.call("register_post", "POST", "/register", (303,),
+            form={"login": login, "email": f"{login}@example.com", "password": PASSWORD}, location="/")
+    vu.login = login
+    vu.logged_in = True
+
+
+def auth(vu: VirtualUser) -> None:
+    """Inscription, déconnexion puis reconnexion (hachage et vérification bcrypt)"""
+    register(vu)
+    vu.call("logout", "GET", "/logout", (303,))
+    vu.logged_in = False
+    vu.call("login_form", "GET", "/login")
+    vu.call("login_post", "POST", "/login", (303,), form={"login": vu.login, "password": PASSWORD}, location="/")
+    vu.logged_in = True
+
+
+def crud(vu: VirtualUser) -> None:
+    """Cycle de vie complet d'un produit par un utilisateur connecté"""
+    vu.ensure_logged_in()
+    token = f"loadtest{uuid.uuid4().hex[:10]}"
+    vu.call("add_produit_form", "GET", "/produits/add")
+    vu.call("add_produit_post", "POST", "/produits/add", (303,), form={
+        "type_p": "loadtest",
+        "designation_p": f"Produit {token}",
+        "prix_ht": f"{vu.rng.uniform(1, 500):.2f}",
+        "date_in": date.today().isoformat(),
+        "stock_p": vu.rng.randint(0, 100),
+    }, location="/produits")
+
+    # L'ajout redirige vers la liste : l'ID est retrouvé par l'autocomplétion
+    id_p = None
+    for _ in range(5):
+        suggestions = json.loads(vu.call("autocomplete_produits", "GET", "/produits/autocomplete?" + urlencode({"q": token})))
+        if suggestions:
+            id_p = suggestions[0]["id_p"]
+            break
+        time.sleep(0.05)
+    if id_p is None:
+        vu.count_error("add_produit_post", "produit introuvable après l'ajout")
+        return
+
+    vu.call("view_produit", "GET", f"/produits/{id_p}")
+    page = vu.call("edit_produit_form", "GET", f"/produits/{id_p}/edit")
+    match = re.search(rb'name="version" value="(\d+)"', page)
+    vu.call("edit_produit_post", "POST", f"/produits/{id_p}/edit", (303,), form={
+        "type_p": "loadtest",
+        "designation_p": f"Produit {token} modifié",
+        "prix_ht": f"{vu.rng.uniform(1, 500):.2f}",
+        "date_in": date.today().isoformat(),
+        "stock_p": vu.rng.randint(0, 100),
+        "version": match.group(1).decode() if match else "0",
+    }, location="/produits")
+    vu.call("adjust_stock", "POST", "/produits/stock", json_body={
+        "movements": [{"id_p": id_p, "delta": 5}, {"id_p": id_p, "delta": -2}]
+    })
+    vu.call("stock_history", "GET", f"/produits/{id_p}/stock.json")
+    diagnostic = vu.rng.choice(DIAGNOSTIC_PAGES)
+    vu.call(diagnostic, "GET", PAGE_PATHS[diagnostic])
+    vu.call("batch_update_produits", "POST", "/produits/batch/update", (303,), form={
+        "operation": "prix", "value": "5", "scope": "selection", "ids": [id_p]
+    }, location="/produits")
+    if vu.rng.random() < 0.5:
+        vu.call("delete_produit", "POST", f"/produits/{id_p}/delete", (303,), location="/produits")
+    else:
+        vu.call("batch_delete_produits", "POST", "/produits/batch/delete", (303,),
+                form={"ids": [id_p]}, location="/produits")
+
+
+# Parcours disponibles pour --mix
+SCENARIOS: Dict[str, Callable[[VirtualUser], None]] = {"browse": browse, "crud": crud, "auth": auth}
+
+
+def run_level(base_url: str, catalog: Catalog, concurrency: int, duration: float, warmup: float,
+              mix: Dict[str, float], seed: int, timeout: float, think_time: float) -> Dict[str, Any]:
+    """
+    Exécute un palier de charge (utilisateurs en boucle fermée)
+
+    Returns:
+        Résultats du palier : totaux et statistiques par route
+    """
+    users = [VirtualUser(index, base_url, catalog, mix, seed, timeout, think_time) for index in range(concurrency)]
+    start = time.perf_counter() + 0.1
+    warmup_end = start + warmup
+    end = warmup_end + duration
+    threads = [threading.Thread(target=user.run, args=(warmup_end, end), daemon=True) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Mesuré de la fin de la chauffe à la fin de la dernière requête
+    elapsed = max(time.perf_counter(), end) - warmup_end
+
+    routes = {}
+    names = sorted({name for user in users for name in list(user.latencies) + list(user.errors)})
+    for name in names:
+        latencies = sorted(value for user in users for value in user.latencies.get(name, []))
+        statuses = sum((user.statuses.get(name, Counter()) for user in users), Counter())
+        errors = sum((user.errors.get(name, Counter()) for user in users), Counter())
+        count = len(latencies)
+        error_count = sum(errors.values())
+        routes[name] = {
+            "count": count,
+            "throughput_rps": round(count / elapsed, 2),
+            "errors": error_count,
+            "error_rate": round(error_count / count, 4) if count else 1.0,
+            "statuses": dict(statuses),
+            "error_kinds": dict(errors),
+            "mean_ms": round(sum(latencies) / count * 1000, 2) if count else 0.0,
+            "max_ms": round(latencies[-1] * 1000, 2) if count else 0.0,
+            **{f"p{q}_ms": round(percentile(latencies, q) * 1000, 2) for q in PERCENTILES},
+        }
+
+    total = sum(route["count"] for route in routes.values())
+    total_errors = sum(route["errors"] for route in routes.values())
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2),
+        "errors": total_errors,
+        "error_rate": round(total_errors / total, 4) if total else 0.0,
+        "routes": routes,
+    }
+
+
+def registered_routes() -> List[Tuple[str, str, str]]:
+    """
+    Routes enregistrées par main.register_routes
+
+    Returns:
+        Liste de (nom, méthodes, chemin)
+    """
+    sys.path.insert(0, PROJECT_ROOT)
+    from fastapi.routing import APIRoute
+    from main import app
+    return [
+        (route.name, ",".join(sorted(route.methods)), route.path)
+        for route in app.routes if isinstance(route, APIRoute)
+    ]
+
+
+def git_revision() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def print_level(level: Dict[str, Any]) -> None:
+    print(f"\n=== {level['concurrency']} utilisateur(s) : {level['requests']} requêtes en {level['duration_s']} s, "
+          f"{level['throughput_rps']} req/s, erreurs {level['error_rate']:.2%}")
+    print(f"{'route':<26} {'n':>7} {'req/s':>8} {'err':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, route in level["routes"].items():
+        print(f"{name:<26} {route['count']:>7} {route['throughput_rps']:>8} {route['error_rate']:>7.2%} "
+              f"{route['p50_ms']:>9} {route['p95_ms']:>9} {route['p99_ms']:>9}")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compare deux résultats palier par palier et route par route
+
+    Args:
+        tolerance: Dégradation relative tolérée du p95 et du débit (0.1 = 10 %)
+
+    Returns:
+        Régressions détectées (une ligne par route)
+    """
+    regressions = []
+    baseline_levels = {level["concurrency"]: level for level in baseline["levels"]}
+    print(f"\n=== Comparaison avec {baseline.get('revision') or '?'} ({baseline.get('started_at')})")
+    for setting in ("mix", "seed", "duration_s", "think_ms"):
+        if baseline.get(setting) != current.get(setting):
+            print(f"Attention : {setting} différent ({baseline.get(setting)} -> {current.get(setting)})")
+    for level in current["levels"]:
+        before = baseline_levels.get(level["concurrency"])
+        if before is None:
+            continue
+        for name, route in level["routes"].items():
+            old = before["routes"].get(name)
+            if old is None or not old["count"] or not route["count"]:
+                continue
+            p95_change = (route["p95_ms"] - old["p95_ms"]) / old["p95_ms"] if old["p95_ms"] else 0.0
+            rps_change = ((route["throughput_rps"] - old["throughput_rps"]) / old["throughput_rps"]
+                          if old["throughput_rps"] else 0.0)
+            error_change = route["error_rate"] - old["error_rate"]
+            problems = []
+            if p95_change > tolerance:
+                problems.append(f"p95 {old['p95_ms']} -> {route['p95_ms']} ms ({p95_change:+.0%})")
+            if rps_change < -tolerance:
+                problems.append(f"débit {old['throughput_rps']} -> {route['throughput_rps']} req/s ({rps_change:+.0%})")
+            if error_change > 0.01:
+                problems.append(f"erreurs {old['error_rate']:.2%} -> {route['error_rate']:.2%}")
+            marker = "REGRESSION" if problems else "ok"
+            print(f"[{level['concurrency']:>4}] {name:<26} p95 {p95_change:+7.1%}  débit {rps_change:+7.1%}  {marker}")
+            if problems:
+                regressions.append(f"{level['concurrency']} utilisateur(s), {name} : " + ", ".join(problems))
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Test de charge HTTP de l'application")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", default="1,10,50", help="Paliers de concurrence, séparés par des virgules")
+    parser.add_argument("--duration", type=float, default=30.0, help="Durée mesurée de chaque palier (secondes)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Chauffe non mesurée avant chaque palier (secondes)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Poids des parcours (browse, crud, auth)")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pause moyenne entre deux parcours")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Délai d'une requête (secondes)")
+    parser.add_argument("--seed", type=int, default=1, help="Graine des tirages (parcours reproductibles)")
+    parser.add_argument("--output", help="Fichier de résultats JSON (par défaut loadtest/<révision>-<date>.json)")
+    parser.add_argument("--compare", help="Résultats JSON de référence")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Dégradation tolérée (0.1 = 10 %%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--list-routes", action="store_true", help="Affiche les routes enregistrées et quitte")
+    args = parser.parse_args()
+
+    if args.list_routes:
+        for name, methods, path in registered_routes():
+            print(f"{methods:<9} {path:<32} {name}")
+        return 0
+
+    mix = parse_mix(args.mix)
+    levels = [int(value) for value in args.concurrency.split(",")]
+    catalog = Catalog.discover(Client(args.base_url, args.timeout))
+    print(f"Catalogue : {len(catalog.ids)} produits, {len(catalog.terms)} mots de recherche")
+
+    started_at = datetime.now().isoformat(timespec="seconds")
+    results = {
+        "revision": git_revision(),
+        "started_at": started_at,
+        "base_url": args.base_url,
+        "mix": mix,
+        "seed": args.seed,
+        "duration_s": args.duration,
+        "warmup_s": args.warmup,
+        "think_ms": args.think_ms,
+        "python": platform.python_version(),
+        "levels": [],
+    }
+    for concurrency in levels:
+        level = run_level(args.base_url, catalog, concurrency, args.duration, args.warmup, mix,
+                          args.seed, args.timeout, args.think_ms / 1000)
+        results["levels"].append(level)
+        print_level(level)
+
+    measured = {name for level in results["levels"] for name in level["routes"]}
+    missing = [name for name, _, _ in registered_routes() if name not in measured]
+    if missing:
+        print(f"\nRoutes non mesurées (durée trop courte ou parcours absent du mélange) : {', '.join(missing)}")
+
+    output = args.output or os.path.join(
+        DEFAULT_OUTPUT_DIR, f"{results['revision'] or 'local'}-{started_at.replace(':', '')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\nRésultats enregistrés dans {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION : {regression}")
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Exécuteur de migrations du schéma MySQL
+Applique dans l'ordre les fichiers sql/migrations/NNN_description.sql qui ne
+figurent pas encore dans la table `schema_migrations`
+
+Utilisation :
+    python scripts/migrate.py              # applique les migrations en attente
+    python scripts/migrate.py --status     # liste les migrations appliquées / en attente
+    python scripts/migrate.py --target 3   # s'arrête après la migration 003
+
+Les instructions DDL de MySQL valident implicitement la transaction : une migration
+interrompue n'est pas annulée. Chaque fichier doit donc rester court et n'est
+enregistré comme appliqué qu'après l'exécution de toutes ses instructions.
+"""
+import argparse
+import os
+import re
+import sys
+from typing import List, NamedTuple, Optional, Set
+
+import mysql.connector
+from mysql.connector import Error
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database import db_config  # noqa: E402
+
+
+MIGRATIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sql", "migrations"
+)
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d+)_([\w-]+)\.sql$")
+
+
+class Migration(NamedTuple):
+    """Fichier de migration versionné"""
+    version: int
+    name: str
+    path: str
+
+
+def discover_migrations(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    """
+    Liste les fichiers de migration triés par version
+
+    Raises:
+        ValueError: si deux fichiers portent le même numéro de version
+    """
+    migrations = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    migrations.sort()
+
+    versions = [migration.version for migration in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError("Numéros de version de migration en double")
+    return migrations
+
+
+def split_statements(sql: str) -> List[str]:
+    """
+    Découpe un script SQL en instructions
+
+    Gère les commentaires `--` en début de ligne, les instructions terminées par le
+    délimiteur en fin de ligne et la commande `DELIMITER` du client mysql (corps de
+    triggers BEGIN ... END). Les migrations ne doivent pas contenir de délimiteur
+    en fin de ligne à l'intérieur d'une chaîne.
+    """
+    delimiter = ";"
+    statements = []
+    current = []
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("--"):
+            continue
+        if stripped.upper().startswith("DELIMITER "):
+            delimiter = stripped.split(None, 1)[1]
+            continue
+        current.append(line)
+        if stripped.endswith(delimiter):
+            statement = "\n".join(current).strip()[:-len(delimiter)].strip()
+            if statement:
+                statements.append(statement)
+            current = []
+    remainder = "\n".join(current).strip()
+    if remainder:
+        statements.append(remainder)
+    return statements
+
+
+def ensure_migrations_table(connection: mysql.connector.MySQLConnection) -> None:
+    """Crée la table de suivi des migrations si nécessaire"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            'CREATE TABLE IF NOT EXISTS `schema_migrations` ('
+            ' `version` int(11) NOT NULL PRIMARY KEY,'
+            ' `name` varchar(255) NOT NULL,'
+            ' `applied_at` timestamp NOT NULL DEFAULT current_timestamp()'
+            ') ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci'
+        )
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def applied_versions(connection: mysql.connector.MySQLConnection) -> Set[int]:
+    """Retourne les versions déjà appliquées"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute('SELECT version FROM `schema_migrations`')
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def apply_migration(connection: mysql.connector.MySQLConnection, migration: Migration) -> None:
+    """
+    Exécute une migration puis l'enregistre dans `schema_migrations`
+
+    Raises:
+        Error: si une instruction échoue (la migration n'est pas enregistrée)
+    """
+    with open(migration.path, encoding="utf-8") as f:
+        statements = split_statements(f.read())
+
+    cursor = connection.cursor()
+    try:
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.execute(
+            'INSERT INTO `schema_migrations` (version, name) VALUES (%s, %s)',
+            (migration.version, migration.name)
+        )
+        connection.commit()
+    except Error:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def migrate(connection: mysql.connector.MySQLConnection, target: Optional[int] = None) -> List[Migration]:
+    """
+    Applique les migrations en attente jusqu'à la version cible incluse
+
+    Returns:
+        Liste des migrations appliquées
+    """
+    ensure_migrations_table(connection)
+    done = applied_versions(connection)
+    applied = []
+    for migration in discover_migrations():
+        if migration.version in done or (target is not None and migration.version > target):
+            continue
+        print(f"Application de {migration.version:03d}_{migration.name}...")
+        apply_migration(connection, migration)
+        applied.append(migration)
+    return applied
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Migrations du schéma MySQL")
+    parser.add_argument("--status", action="store_true", help="Affiche l'état des migrations")
+    parser.add_argument("--target", type=int, help="Dernière version à appliquer")
+    args = parser.parse_args()
+
+    connection = None
+    try:
+        connection = mysql.connector.connect(**db_config.get_connection_params())
+        if args.status:
+            ensure_migrations_table(connection)
+            done = applied_versions(connection)
+            for migration in discover_migrations():
+                state = "appliquée" if migration.version in done else "en attente"
+                print(f"{migration.version:03d}_{migration.name}: {state}")
+            return 0
+
+        applied = migrate(connection, args.target)
+        print(f"{len(applied)} migration(s) appliquée(s)")
+        return 0
+    except Error as e:
+        print(f"Erreur MySQL lors de la migration: {e}")
+        return 1
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
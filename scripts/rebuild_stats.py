@@ -0,0 +1,38 @@
+"""
+Reconstruction de la synthèse du stock par type (table `produit_type_summary`)
+À lancer si la synthèse a dérivé (triggers désactivés, import SQL brut, etc.)
+
+Utilisation :
+    python scripts/rebuild_stats.py
+"""
+import os
+import sys
+
+import mysql.connector
+from mysql.connector import Error
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database import db_config  # noqa: E402
+from models.stats_model import ProduitTypeStats  # noqa: E402
+
+
+def main() -> int:
+    connection = None
+    try:
+        connection = mysql.connector.connect(**db_config.get_connection_params())
+        count = ProduitTypeStats.rebuild(connection)
+        if count is None:
+            return 1
+        print(f"Synthèse reconstruite pour {count} type(s) de produit")
+        return 0
+    except Error as e:
+        print(f"Erreur de connexion MySQL: {e}")
+        return 1
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
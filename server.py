@@ -0,0 +1,185 @@
+"""
+Lanceur de production
+Démarre Gunicorn avec des workers Uvicorn dimensionnés selon les cœurs, la mémoire
+et le max_connections de MySQL
+
+Utilisation :
+    python server.py                       # démarrage (application préchargée avant fork)
+    python server.py --no-preload          # chaque worker importe l'application
+    python server.py --workers 4 --max-connections 200
+    python server.py restart               # redémarrage progressif sans coupure
+    python server.py --dry-run             # affiche le dimensionnement sans démarrer
+"""
+import argparse
+import os
+import signal
+import sys
+import time
+from typing import Optional
+
+from gunicorn.app.base import BaseApplication
+
+from config.app_config import app_config
+from config.database import db_config
+from config.server_config import server_config, compute_sizing, ServerSizing
+
+
+DEFAULT_PID_FILE = "server.pid"
+
+
+def fetch_max_connections() -> int:
+    """
+    Lit max_connections sur le serveur MySQL
+
+    Returns:
+        Valeur de max_connections, ou la valeur par défaut de MySQL si le serveur
+        est injoignable
+    """
+    import mysql.connector
+    from mysql.connector import Error
+
+    connection = None
+    try:
+        connection = mysql.connector.connect(**db_config.get_connection_params())
+        cursor = connection.cursor()
+        cursor.execute("SHOW VARIABLES LIKE 'max_connections'")
+        row = cursor.fetchone()
+        cursor.close()
+        return int(row[1])
+    except Error as e:
+        print(f"max_connections indisponible ({e}), valeur par défaut utilisée")
+        return server_config.DB_DEFAULT_MAX_CONNECTIONS
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+
+
+class ProductionServer(BaseApplication):
+    """Application Gunicorn configurée par programme"""
+
+    def __init__(self, sizing: ServerSizing, preload: bool, bind: str, pid_file: str):
+        self.sizing = sizing
+        self.options = {
+            "bind": bind,
+            "workers": sizing.workers,
+            "worker_class": "uvicorn.workers.UvicornWorker",
+            "preload_app": preload,
+            "keepalive": server_config.KEEPALIVE_SECONDS,
+            "backlog": server_config.BACKLOG,
+            "timeout": server_config.WORKER_TIMEOUT,
+            "graceful_timeout": server_config.GRACEFUL_TIMEOUT,
+            # Recyclage progressif des workers (fuites mémoire) sans redémarrage simultané
+            "max_requests": server_config.MAX_REQUESTS,
+            "max_requests_jitter": server_config.MAX_REQUESTS_JITTER,
+            "pidfile": pid_file,
+        }
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from main import app
+        return app
+
+
+def apply_sizing(sizing: ServerSizing) -> None:
+    """
+    Transmet le dimensionnement à la configuration de l'application
+
+    Les workers héritent de ces valeurs par fork, qu'ils importent l'application
+    eux-mêmes ou qu'elle soit préchargée dans le maître.
+    """
+    db_config.pool_size = sizing.db_pool_size
+    app_config.THREADPOOL_SIZE = sizing.threadpool_size
+    os.environ["DB_POOL_SIZE"] = str(sizing.db_pool_size)
+    os.environ["THREADPOOL_SIZE"] = str(sizing.threadpool_size)
+
+
+def read_pid(pid_file: str) -> Optional[int]:
+    """Lit le PID du maître Gunicorn, None si absent"""
+    try:
+        with open(pid_file) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def rolling_restart(pid_file: str, preload: bool, warmup: float) -> int:
+    """
+    Redémarre les workers sans interrompre le service
+
+    - Sans préchargement : SIGHUP, Gunicorn démarre de nouveaux workers puis arrête
+      proprement les anciens.
+    - Avec préchargement, le code est chargé dans le maître : SIGUSR2 lance un nouveau
+      maître (nouveau code), puis l'ancien maître est arrêté proprement (SIGTERM).
+
+    Returns:
+        Code de sortie du processus
+    """
+    old_pid = read_pid(pid_file)
+    if old_pid is None:
+        print(f"Aucun serveur en cours d'exécution ({pid_file} introuvable)")
+        return 1
+
+    if not preload:
+        os.kill(old_pid, signal.SIGHUP)
+        print(f"Rechargement progressif demandé au maître {old_pid}")
+        return 0
+
+    os.kill(old_pid, signal.SIGUSR2)
+    deadline = time.monotonic() + server_config.GRACEFUL_TIMEOUT
+    new_pid = None
+    while time.monotonic() < deadline:
+        new_pid = read_pid(pid_file)
+        if new_pid and new_pid != old_pid:
+            break
+        time.sleep(0.2)
+    else:
+        print("Le nouveau maître n'a pas démarré, l'ancien est conservé")
+        return 1
+
+    # Laisse les nouveaux workers démarrer avant de retirer les anciens
+    time.sleep(warmup)
+    os.kill(old_pid, signal.SIGTERM)
+    print(f"Maître {new_pid} actif, arrêt progressif de l'ancien maître {old_pid}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Lanceur de production")
+    parser.add_argument("command", nargs="?", choices=["start", "restart"], default="start")
+    parser.add_argument("--bind", default=f"{server_config.HOST}:{server_config.PORT}")
+    parser.add_argument("--workers", type=int, help="Nombre de workers (calculé par défaut)")
+    parser.add_argument("--max-connections", type=int,
+                        help="max_connections MySQL (lu sur le serveur par défaut)")
+    parser.add_argument("--no-preload", action="store_true",
+                        help="Ne pas précharger l'application avant le fork")
+    parser.add_argument("--pid-file", default=DEFAULT_PID_FILE)
+    parser.add_argument("--warmup", type=float, default=5.0,
+                        help="Délai (s) avant l'arrêt de l'ancien maître lors d'un redémarrage")
+    parser.add_argument("--dry-run", action="store_true", help="Affiche le dimensionnement et quitte")
+    args = parser.parse_args()
+
+    preload = not args.no_preload
+    if args.command == "restart":
+        return rolling_restart(args.pid_file, preload, args.warmup)
+
+    max_connections = args.max_connections or fetch_max_connections()
+    sizing = compute_sizing(max_connections, workers=args.workers)
+    print(
+        f"{sizing.workers} workers x {sizing.db_pool_size} connexions MySQL "
+        f"({sizing.threadpool_size} threads/worker) = {sizing.total_db_connections} "
+        f"connexions sur max_connections={sizing.max_connections}"
+    )
+    if args.dry_run:
+        return 0
+
+    apply_sizing(sizing)
+    ProductionServer(sizing, preload, args.bind, args.pid_file).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
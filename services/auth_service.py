@@ -2,8 +2,11 @@
 Service d'authentification
 Gère le hachage des mots de passe et la vérification d'authentification
 """
-from passlib.context import CryptContext
 import hashlib
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
 
 
 class AuthService:
@@ -13,8 +16,26 @@ class AuthService:
     BCRYPT_MAX_BYTES = 72
     
     def __init__(self):
-        """Initialise le contexte de hachage des mots de passe"""
-        self.password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        """
+        Initialise le service sans construire le contexte de hachage
+
+        passlib/bcrypt est coûteux à importer : le contexte n'est créé
+        qu'au premier hachage ou à la première vérification.
+        """
+        self._password_context: Optional["CryptContext"] = None
+
+    @property
+    def password_context(self) -> "CryptContext":
+        """
+        Contexte de hachage des mots de passe, construit à la demande
+
+        Returns:
+            Instance de CryptContext configurée pour bcrypt
+        """
+        if self._password_context is None:
+            from passlib.context import CryptContext
+            self._password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        return self._password_context
     
     def _prepare_password(self, password: str) -> str:
         """
@@ -0,0 +1,318 @@
+"""
+Service de diffusion des modifications du catalogue entre workers
+Chaque worker écoute sur un socket Unix (datagrammes) dans un répertoire commun ;
+une écriture validée est annoncée à tous les autres workers de la machine,
+avec un numéro de version du catalogue partagé (fichier mappé en mémoire)
+"""
+import json
+import logging
+import mmap
+import os
+import socket
+import struct
+import threading
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from config.app_config import app_config
+from models.produit_model import Produit
+
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de coordination entre workers
+    fcntl = None
+
+
+# Taille maximale d'un message (les IDs au-delà sont remplacés par une invalidation complète)
+MAX_MESSAGE_SIZE = 60000
+
+# Écouteur distant : listener(event, ids, type_p), ids et type_p à None = tout le catalogue
+RemoteListener = Callable[[str, Optional[List[int]], Optional[str]], None]
+
+# Écouteur de messages : listener(message) pour chaque événement, local ou distant
+MessageListener = Callable[[Dict[str, Any]], None]
+
+
+def _json_default(value: Any) -> Any:
+    """Sérialise les prix (Decimal) et les dates des produits"""
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+class CatalogEventsService:
+    """
+    Diffuse les événements de Produit aux autres workers et notifie localement
+    ceux reçus des autres workers
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Répertoire commun des sockets et du compteur de version
+        """
+        self.directory = directory
+        # Version du catalogue jusqu'à laquelle ce worker a vu toutes les versions
+        self.version = 0
+        # Versions vues au-delà de self.version (un trou les sépare de self.version)
+        self._ahead: Set[int] = set()
+        self._listeners: List[RemoteListener] = []
+        self._message_listeners: List[MessageListener] = []
+        self._socket: Optional[socket.socket] = None
+        # Socket d'envoi non bloquant : une écriture ne doit pas attendre un worker lent
+        self._send_socket: Optional[socket.socket] = None
+        self._socket_path: Optional[str] = None
+        self._version_file = None
+        self._version_map: Optional[mmap.mmap] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._counters = {"sent": 0, "received": 0, "gaps": 0, "dropped": 0}
+        Produit.add_change_listener(self._on_local_change)
+
+    @property
+    def running(self) -> bool:
+        """True si le worker écoute les événements des autres workers"""
+        return self._socket is not None
+
+    def add_listener(self, listener: RemoteListener) -> None:
+        """
+        Enregistre un écouteur des modifications faites par les autres workers
+
+        Args:
+            listener: Fonction appelée avec (event, ids, type_p) ; ids et type_p
+                      valent None quand tout le catalogue doit être invalidé
+        """
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def add_message_listener(self, listener: MessageListener) -> None:
+        """
+        Enregistre un écouteur de tous les événements, ceux de ce worker compris
+
+        Args:
+            listener: Fonction appelée avec le message
+                      {"version", "origin", "event", "ids", "type_p", "data"} ;
+                      ids et type_p valent None quand tout le catalogue a pu changer
+        """
+        if listener not in self._message_listeners:
+            self._message_listeners.append(listener)
+
+    def start(self) -> None:
+        """Ouvre le socket de ce worker et démarre la réception (à appeler dans chaque worker)"""
+        if self.running or fcntl is None:
+            return
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            self._open_version_counter()
+            self.version = self._read_version()
+            self._ahead.clear()
+            self._socket_path = os.path.join(self.directory, f"{os.getpid()}.sock")
+            if os.path.exists(self._socket_path):
+                os.unlink(self._socket_path)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(self._socket_path)
+            sock.settimeout(1.0)
+            send_sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            send_sock.setblocking(False)
+            self._socket, self._send_socket = sock, send_sock
+        except OSError as e:
+            logger.error("Diffusion des modifications du catalogue désactivée: %s", e)
+            self._close_version_counter()
+            return
+        self._thread = threading.Thread(target=self._run, name="catalog-events-receiver", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Ferme le socket de ce worker"""
+        sock, self._socket = self._socket, None
+        send_sock, self._send_socket = self._send_socket, None
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if sock:
+            sock.close()
+        if send_sock:
+            send_sock.close()
+        if self._socket_path and os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+        self._close_version_counter()
+
+    @property
+    def latest_version(self) -> int:
+        """Plus grande version du catalogue vue par ce worker (des versions inférieures peuvent manquer)"""
+        with self._lock:
+            return max(self._ahead, default=self.version)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Compteurs depuis le démarrage du worker
+
+        Returns:
+            {"version": version jusqu'à laquelle tout a été vu, "latest_version": plus
+             grande version vue, "sent": événements diffusés, "received": événements reçus,
+             "gaps": trous de versions détectés, "dropped": envois abandonnés (destinataire plein)}
+        """
+        with self._lock:
+            return {"version": self.version, "latest_version": max(self._ahead, default=self.version),
+                    **self._counters}
+
+    def _on_local_change(self, event: str, payload: Dict[str, Any]) -> None:
+        """
+        Numérote une écriture validée par ce worker et la diffuse aux autres
+
+        Sans coordination (Windows, socket indisponible), la version est locale au worker.
+        """
+        if "produit" in payload:
+            ids = [payload["produit"].id_p]
+            data = {"produit": payload["produit"].to_dict()}
+        elif "movements" in payload:
+            ids = sorted({id_p for id_p, _ in payload["movements"]})
+            data = {"movements": [{"id_p": id_p, "delta": delta} for id_p, delta in payload["movements"]]}
+        else:
+            ids = payload.get("ids")
+            data = None
+        if self.running:
+            version = self._next_version()
+        else:
+            with self._lock:
+                version = max(self._ahead, default=self.version) + 1
+        message = {
+            "origin": os.getpid(),
+            "version": version,
+            "event": event,
+            "ids": ids,
+            "type_p": payload.get("type_p"),
+            "data": data
+        }
+        encoded = json.dumps(message, default=_json_default).encode()
+        if len(encoded) > MAX_MESSAGE_SIZE:
+            message["ids"] = message["data"] = None
+            encoded = json.dumps(message, default=_json_default).encode()
+        with self._lock:
+            # Une version locale ne comble pas les trous : celles des autres workers peuvent manquer
+            self._record(version)
+            if self.running:
+                self._counters["sent"] += 1
+        self._notify_messages(json.loads(encoded))
+        self._broadcast(encoded)
+
+    def _broadcast(self, data: bytes) -> None:
+        sock = self._send_socket
+        if sock is None:
+            return
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.endswith(".sock") or path == self._socket_path:
+                continue
+            try:
+                sock.sendto(data, path)
+            except BlockingIOError:
+                # Tampon du destinataire plein : abandonné, il détectera le trou de version
+                with self._lock:
+                    self._counters["dropped"] += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Worker arrêté sans nettoyage : son socket est retiré
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except OSError as e:
+                logger.error("Erreur lors de la diffusion d'une modification du catalogue: %s", e)
+
+    def _run(self) -> None:
+        sock = self._socket
+        while self._socket is sock:
+            try:
+                data = sock.recv(MAX_MESSAGE_SIZE)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            try:
+                message = json.loads(data)
+            except ValueError:
+                continue
+            self._dispatch(message)
+
+    def _record(self, version: int) -> None:
+        """Note une version vue et avance self.version sur les versions contiguës (sous self._lock)"""
+        if version <= self.version:
+            return
+        self._ahead.add(version)
+        while self.version + 1 in self._ahead:
+            self.version += 1
+            self._ahead.remove(self.version)
+
+    def _dispatch(self, message: Dict[str, Any]) -> None:
+        """
+        Notifie les écouteurs ; un trou dans les versions invalide tout le catalogue
+
+        Une version d'un autre worker qui laisse une version antérieure manquante
+        (datagramme perdu, ou pas encore arrivé) est traitée comme un trou : le
+        trou est alors comblé, une invalidation complète couvrant les versions manquantes.
+        """
+        with self._lock:
+            self._counters["received"] += 1
+            self._record(message["version"])
+            gap = bool(self._ahead)
+            if gap:
+                self._counters["gaps"] += 1
+                self.version = max(self._ahead)
+                self._ahead.clear()
+        if gap:
+            message = {**message, "ids": None, "type_p": None, "data": None}
+        event, ids, type_p = message["event"], message["ids"], message["type_p"]
+        for listener in self._listeners:
+            try:
+                listener(event, ids, type_p)
+            except Exception:
+                logger.exception("Erreur d'un écouteur des modifications distantes (%s)", event)
+        self._notify_messages(message)
+
+    def _notify_messages(self, message: Dict[str, Any]) -> None:
+        for listener in self._message_listeners:
+            try:
+                listener(message)
+            except Exception:
+                logger.exception("Erreur d'un écouteur des messages du catalogue (%s)", message['event'])
+
+    def _open_version_counter(self) -> None:
+        """Mappe en mémoire le compteur de version partagé (8 octets)"""
+        path = os.path.join(self.directory, "version")
+        self._version_file = open(path, "a+b")
+        if os.fstat(self._version_file.fileno()).st_size < 8:
+            fcntl.flock(self._version_file, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self._version_file.fileno()).st_size < 8:
+                    self._version_file.truncate(8)
+            finally:
+                fcntl.flock(self._version_file, fcntl.LOCK_UN)
+        self._version_map = mmap.mmap(self._version_file.fileno(), 8)
+
+    def _close_version_counter(self) -> None:
+        if self._version_map:
+            self._version_map.close()
+            self._version_map = None
+        if self._version_file:
+            self._version_file.close()
+            self._version_file = None
+
+    def _read_version(self) -> int:
+        return struct.unpack("<Q", self._version_map[:8])[0]
+
+    def _next_version(self) -> int:
+        """Incrémente le compteur partagé sous verrou de fichier"""
+        fcntl.flock(self._version_file, fcntl.LOCK_EX)
+        try:
+            version = self._read_version() + 1
+            self._version_map[:8] = struct.pack("<Q", version)
+            return version
+        finally:
+            fcntl.flock(self._version_file, fcntl.LOCK_UN)
+
+
+# Instance globale de diffusion des modifications
+catalog_events_service = CatalogEventsService(directory=app_config.CATALOG_EVENTS_DIR)
@@ -0,0 +1,153 @@
+"""
+Service de flux des modifications du catalogue (Server-Sent Events)
+Garde les derniers événements dans un tampon circulaire pour la reprise
+(Last-Event-ID) et les pousse aux abonnés, chacun servi par une coroutine
+"""
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set
+
+from config.app_config import app_config
+from services.catalog_events_service import catalog_events_service
+
+
+def format_event(message: Dict[str, Any]) -> str:
+    """Met un message du catalogue au format text/event-stream"""
+    data = {key: message[key] for key in ("ids", "type_p", "data")}
+    return f"id: {message['version']}\nevent: {message['event']}\ndata: {json.dumps(data)}\n\n"
+
+
+class CatalogFeedService:
+    """
+    Diffuse les événements du catalogue (écritures de ce worker et des autres)
+
+    Les événements arrivent depuis des threads (routes synchrones, réception des
+    autres workers) et sont remis aux abonnés sur la boucle d'événements.
+    """
+
+    def __init__(self, buffer_size: int, queue_size: int, heartbeat: float, max_subscribers: int):
+        """
+        Args:
+            buffer_size: Nombre d'événements gardés pour la reprise
+            queue_size: Événements en attente par abonné avant sa déconnexion
+            heartbeat: Intervalle (secondes) des commentaires de maintien de connexion
+            max_subscribers: Nombre maximal d'abonnés par worker
+        """
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.max_subscribers = max_subscribers
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        catalog_events_service.add_message_listener(self.publish)
+
+    @property
+    def full(self) -> bool:
+        """True si le worker a atteint son nombre maximal d'abonnés"""
+        return len(self._subscribers) >= self.max_subscribers
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        """
+        Ajoute un événement au tampon et le transmet aux abonnés (depuis n'importe quel thread)
+
+        Args:
+            message: Message de catalog_events_service
+        """
+        with self._lock:
+            self._buffer.append(message)
+            loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._fan_out, message)
+
+    def replay(self, last_event_id: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Événements postérieurs à last_event_id, par version croissante
+
+        Le tampon est dans l'ordre d'arrivée, qui n'est pas celui des versions
+        (workers différents) : chaque version jusqu'à la dernière vue doit y être.
+
+        Returns:
+            Liste des événements, ou None si la reprise est impossible (version
+            manquante : sortie du tampon, antérieure au worker ou jamais reçue ;
+            ou numérotation redémarrée)
+        """
+        current = catalog_events_service.latest_version
+        if last_event_id == current:
+            return []
+        # Client en avance (redémarrage) ou plus d'événements manqués que le tampon n'en garde
+        if last_event_id > current or current - last_event_id > len(self._buffer):
+            return None
+        with self._lock:
+            events = {message["version"]: message for message in self._buffer
+                      if last_event_id < message["version"] <= current}
+        if len(events) != current - last_event_id:
+            return None
+        return [events[version] for version in range(last_event_id + 1, current + 1)]
+
+    async def stream(self, last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Flux text/event-stream d'un abonné
+
+        L'abonnement précède la relecture du tampon : aucun événement ne peut
+        tomber entre les deux, les doublons sont écartés.
+
+        Args:
+            last_event_id: Dernier événement reçu par le client (reprise après déconnexion)
+        """
+        queue = self._subscribe()
+        try:
+            yield f"retry: {app_config.CATALOG_FEED_RETRY_MS}\n\n"
+            replayed_versions = set()
+            if last_event_id is not None:
+                replayed = self.replay(last_event_id)
+                if replayed is None:
+                    # Reprise impossible : le client doit recharger tout le catalogue
+                    yield "event: reset\ndata: {}\n\n"
+                    replayed = []
+                for message in replayed:
+                    yield format_event(message)
+                    replayed_versions.add(message["version"])
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if message is None:
+                    # Abonné trop lent : il se reconnecte et reprend avec Last-Event-ID
+                    return
+                if message["version"] in replayed_versions:
+                    continue
+                yield format_event(message)
+        finally:
+            self._subscribers.discard(queue)
+
+    def _subscribe(self) -> asyncio.Queue:
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def _fan_out(self, message: Dict[str, Any]) -> None:
+        """Remet un événement à chaque abonné (sur la boucle d'événements)"""
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._subscribers.discard(queue)
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+
+# Instance globale du flux du catalogue
+catalog_feed_service = CatalogFeedService(
+    buffer_size=app_config.CATALOG_FEED_BUFFER_SIZE,
+    queue_size=app_config.CATALOG_FEED_QUEUE_SIZE,
+    heartbeat=app_config.CATALOG_FEED_HEARTBEAT,
+    max_subscribers=app_config.CATALOG_FEED_MAX_SUBSCRIBERS
+)
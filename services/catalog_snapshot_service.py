@@ -0,0 +1,374 @@
+"""
+Service d'instantané en colonnes du catalogue
+Garde en mémoire des tableaux NumPy (prix_ht, stock_p, date_in, type_p encodé
+par dictionnaire) pour calculer les statistiques sans matérialiser d'objets Produit
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config.app_config import app_config
+from config.database import close_connection, open_connection
+from models.produit_model import Produit
+from services.catalog_events_service import catalog_events_service
+
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogSnapshot:
+    """
+    Instantané immuable du catalogue, une colonne par tableau, trié par id_p
+
+    Un rafraîchissement produit un nouvel instantané : les lecteurs qui tiennent
+    une référence vers l'ancien ne voient jamais un état partiellement modifié.
+    """
+
+    def __init__(self, ids: np.ndarray, prix_ht: np.ndarray, stock_p: np.ndarray,
+                 date_in: np.ndarray, type_codes: np.ndarray, types: List[str],
+                 watermark: Optional[datetime]):
+        self.ids = ids
+        self.prix_ht = prix_ht
+        self.stock_p = stock_p
+        self.date_in = date_in
+        self.type_codes = type_codes
+        # Dictionnaire des types : type_codes[i] est l'indice de types
+        self.types = types
+        # Plus grand updated_at lu (marqueur du prochain rafraîchissement)
+        self.watermark = watermark
+        self.refreshed_at = time.time()
+        # Prix triés par type (None = tous), calculés à la première demande
+        self._sorted_prices: Dict[Optional[str], np.ndarray] = {}
+        # date_in convertie en numéro de mois ou d'année, calculée à la première demande
+        self._period_codes: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def from_rows(rows: Sequence[tuple], types: Optional[List[str]] = None) -> 'CatalogSnapshot':
+        """
+        Construit un instantané à partir des tuples de Produit.find_columns
+
+        Args:
+            rows: Tuples (id_p, type_p, prix_ht, stock_p, date_in, updated_at)
+            types: Dictionnaire de types à prolonger (copié)
+        """
+        types = list(types or [])
+        codes = {type_p: code for code, type_p in enumerate(types)}
+        if rows:
+            id_col, type_col, prix_col, stock_col, date_col, updated_col = zip(*rows)
+        else:
+            id_col = type_col = prix_col = stock_col = date_col = updated_col = ()
+
+        for type_p in type_col:
+            if type_p not in codes:
+                codes[type_p] = len(types)
+                types.append(type_p)
+
+        ids = np.array(id_col, dtype=np.int64)
+        prix_ht = np.array([float(prix) for prix in prix_col], dtype=np.float64)
+        stock_p = np.array([stock or 0 for stock in stock_col], dtype=np.int64)
+        date_in = np.array(date_col, dtype="datetime64[D]")
+        type_codes = np.array([codes[type_p] for type_p in type_col], dtype=np.int32)
+        watermark = max(filter(None, updated_col), default=None)
+
+        order = np.argsort(ids, kind="stable")
+        return CatalogSnapshot(ids[order], prix_ht[order], stock_p[order], date_in[order],
+                               type_codes[order], types, watermark)
+
+    def merge(self, rows: Sequence[tuple]) -> 'CatalogSnapshot':
+        """
+        Applique des produits créés ou modifiés et renvoie un nouvel instantané
+
+        Args:
+            rows: Tuples (id_p, type_p, prix_ht, stock_p, date_in, updated_at)
+        """
+        if not rows:
+            return self
+        changes = CatalogSnapshot.from_rows(rows, self.types)
+        positions = np.searchsorted(self.ids, changes.ids)
+        if len(self.ids):
+            clipped = np.minimum(positions, len(self.ids) - 1)
+            existing = (positions < len(self.ids)) & (self.ids[clipped] == changes.ids)
+        else:
+            existing = np.zeros(len(changes.ids), dtype=bool)
+
+        columns = []
+        for name in ("ids", "prix_ht", "stock_p", "date_in", "type_codes"):
+            column = getattr(self, name).copy()
+            change = getattr(changes, name)
+            column[positions[existing]] = change[existing]
+            columns.append(np.concatenate([column, change[~existing]]))
+
+        watermark = max(filter(None, [self.watermark, changes.watermark]), default=None)
+        merged = CatalogSnapshot(*columns, types=changes.types, watermark=watermark)
+        if (~existing).any():
+            merged = merged._take(np.argsort(merged.ids, kind="stable"))
+        return merged
+
+    def keep_ids(self, ids: Sequence[int]) -> 'CatalogSnapshot':
+        """Renvoie un instantané limité aux IDs fournis (retire les produits supprimés)"""
+        return self._take(np.isin(self.ids, np.asarray(ids, dtype=np.int64)))
+
+    def _take(self, selector: np.ndarray) -> 'CatalogSnapshot':
+        return CatalogSnapshot(self.ids[selector], self.prix_ht[selector], self.stock_p[selector],
+                               self.date_in[selector], self.type_codes[selector], self.types,
+                               self.watermark)
+
+    def type_mask(self, type_p: Optional[str]) -> np.ndarray:
+        """Masque des produits du type demandé"""
+        if type_p not in self.types:
+            return np.zeros(len(self.ids), dtype=bool)
+        return self.type_codes == self.types.index(type_p)
+
+    def _column(self, name: str, type_p: Optional[str]) -> np.ndarray:
+        """Colonne complète, ou restreinte au type demandé"""
+        column = getattr(self, name)
+        return column if type_p is None else column[self.type_mask(type_p)]
+
+    def price_percentiles(self, percentiles: Sequence[float], type_p: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Percentiles du prix HT (interpolation linéaire)
+
+        Les prix triés sont gardés par l'instantané : les appels suivants ne font
+        qu'une lecture par percentile.
+
+        Returns:
+            {"count": n, "percentiles": {"p50": ..., ...}}
+        """
+        prices = self._sorted_prices.get(type_p)
+        if prices is None:
+            prices = self._sorted_prices[type_p] = np.sort(self._column("prix_ht", type_p))
+        if not len(prices):
+            return {"count": 0, "percentiles": {}}
+        positions = np.asarray(percentiles, dtype=np.float64) / 100 * (len(prices) - 1)
+        lower = np.floor(positions).astype(np.int64)
+        upper = np.minimum(lower + 1, len(prices) - 1)
+        values = prices[lower] + (prices[upper] - prices[lower]) * (positions - lower)
+        return {
+            "count": int(len(prices)),
+            "percentiles": {f"p{p:g}": round(float(v), 2) for p, v in zip(percentiles, values)}
+        }
+
+    def stock_histogram(self, bins: int, type_p: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Histogramme des quantités en stock
+
+        Returns:
+            {"edges": [...], "counts": [...]} (bins intervalles, bins + 1 bornes)
+        """
+        stocks = self._column("stock_p", type_p)
+        if not len(stocks):
+            return {"edges": [], "counts": []}
+        counts, edges = np.histogram(stocks, bins=bins)
+        return {"edges": [round(float(edge), 2) for edge in edges], "counts": counts.tolist()}
+
+    def value_by_period(self, period: str = "M", type_p: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Valeur du stock (prix_ht * stock_p) et nombre de produits par période de date_in
+
+        Les périodes sont converties une fois par instantané en entiers, puis agrégées
+        par bincount, sans tri.
+
+        Args:
+            period: "M" (mois) ou "Y" (année)
+            type_p: Type de produit (tous si None)
+
+        Returns:
+            Liste de {"periode", "nb_produits", "valeur_stock"} triée par période
+        """
+        codes = self._period_codes.get(period)
+        if codes is None:
+            # NaT devient le plus petit int64 : exclu ci-dessous
+            codes = self._period_codes[period] = self.date_in.astype(f"datetime64[{period}]").astype(np.int64)
+        mask = codes != np.iinfo(np.int64).min
+        if type_p is not None:
+            mask &= self.type_mask(type_p)
+        periods = codes[mask]
+        if not len(periods):
+            return []
+        values = self.prix_ht[mask] * self.stock_p[mask]
+        first = periods.min()
+        offsets = periods - first
+        totals = np.bincount(offsets, weights=values)
+        counts = np.bincount(offsets)
+        return [
+            {
+                "periode": str(np.datetime64(int(first + offset), period)),
+                "nb_produits": int(counts[offset]),
+                "valeur_stock": round(float(totals[offset]), 2)
+            }
+            for offset in np.flatnonzero(counts)
+        ]
+
+
+class CatalogSnapshotService:
+    """
+    Tient à jour l'instantané du catalogue : chargement complet au premier usage,
+    puis rafraîchissements incrémentaux (marqueur updated_at) en tâche de fond,
+    périodiquement et après chaque écriture, locale ou d'un autre worker
+    """
+
+    def __init__(self, refresh_interval: float, watermark_overlap: float, max_staleness: float):
+        """
+        Args:
+            refresh_interval: Intervalle (secondes) entre deux rafraîchissements
+            watermark_overlap: Recouvrement (secondes) appliqué au marqueur updated_at
+            max_staleness: Retard maximal (secondes) de l'instantané servi après une écriture
+        """
+        self.refresh_interval = refresh_interval
+        self.watermark_overlap = watermark_overlap
+        self.max_staleness = max_staleness
+        self._snapshot: Optional[CatalogSnapshot] = None
+        # Date (monotone) de la première écriture non reprise par l'instantané, None s'il est à jour
+        self._stale_since: Optional[float] = None
+        self._refresh_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        Produit.add_change_listener(self._on_catalog_change)
+        catalog_events_service.add_listener(self._on_remote_change)
+
+    def get(self, connection) -> Optional[CatalogSnapshot]:
+        """
+        Retourne l'instantané courant, chargé depuis la base au premier appel
+
+        Après une écriture, l'instantané courant reste servi pendant que la tâche de
+        fond le rafraîchit ; la lecture ne le rafraîchit elle-même que s'il a plus de
+        max_staleness secondes de retard (ou sans tâche de fond).
+
+        Args:
+            connection: Connexion à la bdd (utilisée seulement si un rafraîchissement est nécessaire)
+
+        Returns:
+            CatalogSnapshot ou None si le chargement a échoué
+        """
+        if self._snapshot is None:
+            self.refresh(connection)
+            return self._snapshot
+        stale_since = self._stale_since
+        if stale_since is not None:
+            background = self._thread is not None and self._thread.is_alive()
+            limit = time.monotonic() - (self.max_staleness if background else 0)
+            if stale_since <= limit:
+                self.refresh(connection, stale_before=limit)
+        return self._snapshot
+
+    def refresh(self, connection, stale_before: Optional[float] = None) -> bool:
+        """
+        Rafraîchit l'instantané
+
+        Relit seulement les produits dont updated_at dépasse le marqueur (moins le
+        recouvrement), puis compare le nombre de produits pour détecter les
+        suppressions, auquel cas seuls les IDs sont relus.
+
+        Args:
+            connection: Connexion à la bdd
+            stale_before: Si fourni, ne rafraîchit que si l'instantané a toujours une écriture
+                en retard antérieure à cette date (un autre thread l'a peut-être rafraîchi
+                pendant l'attente du verrou)
+
+        Returns:
+            True si l'instantané est à jour, False en cas d'erreur
+        """
+        with self._refresh_lock:
+            if stale_before is not None and (self._stale_since is None or self._stale_since > stale_before):
+                return True
+            # Remis à zéro avant la lecture : une écriture pendant le rafraîchissement le relancera
+            self._stale_since = None
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.watermark is None:
+                rows = Produit.find_columns(connection)
+                if rows is None:
+                    return False
+                self._snapshot = CatalogSnapshot.from_rows(rows)
+                return True
+
+            since = snapshot.watermark - timedelta(seconds=self.watermark_overlap)
+            rows = Produit.find_columns(connection, since)
+            count = Produit.count(connection)
+            if rows is None or count is None:
+                return False
+
+            merged = snapshot.merge(rows)
+            if count != len(merged):
+                ids = Produit.find_ids(connection)
+                if ids is None:
+                    return False
+                merged = merged.keep_ids(ids)
+                if len(merged) != len(ids):
+                    # Insertion manquée (transaction très longue) : rechargement complet
+                    rows = Produit.find_columns(connection)
+                    if rows is None:
+                        return False
+                    merged = CatalogSnapshot.from_rows(rows)
+            self._snapshot = merged
+            return True
+
+    def _mark_stale(self) -> None:
+        """Note la première écriture non reprise et réveille la tâche de fond"""
+        if self._stale_since is None:
+            self._stale_since = time.monotonic()
+        self._wakeup.set()
+
+    def _on_catalog_change(self, event: str, payload: Dict[str, Any]) -> None:
+        """Une écriture validée par ce worker : rafraîchissement en tâche de fond"""
+        self._mark_stale()
+
+    def _on_remote_change(self, event: str, ids: Optional[List[int]], type_p: Optional[str]) -> None:
+        """Idem pour les écritures des autres workers"""
+        self._mark_stale()
+
+    def start(self) -> None:
+        """Démarre le rafraîchissement périodique (à appeler dans chaque worker)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="catalog-snapshot-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Arrête le rafraîchissement périodique"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        # Les écritures rapprochées sont regroupées : au plus un rafraîchissement par
+        # demi-retard maximal, pour rester sous max_staleness sans relire en continu
+        min_gap = self.max_staleness / 2
+        last_refresh = 0.0
+        while True:
+            self._wakeup.wait(self.refresh_interval)
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                return
+            # Seuls les workers qui ont servi une statistique gardent un instantané à jour
+            if self._snapshot is None:
+                continue
+            if self._stopping.wait(max(0.0, last_refresh + min_gap - time.monotonic())):
+                return
+            last_refresh = time.monotonic()
+            connection = None
+            try:
+                connection = open_connection()
+                self.refresh(connection)
+            except Exception:
+                logger.exception("Erreur lors du rafraîchissement de l'instantané du catalogue")
+            finally:
+                close_connection(connection)
+
+
+# Instance globale du service d'instantané
+catalog_snapshot_service = CatalogSnapshotService(
+    refresh_interval=app_config.SNAPSHOT_REFRESH_INTERVAL,
+    watermark_overlap=app_config.SNAPSHOT_WATERMARK_OVERLAP,
+    max_staleness=app_config.SNAPSHOT_MAX_STALENESS
+)
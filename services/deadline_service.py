@@ -0,0 +1,61 @@
+"""
+Service d'échéance des requêtes HTTP
+Chaque requête reçoit une échéance (durée par défaut ou propre à la route),
+propagée jusqu'aux instructions SQL par config.database
+"""
+from typing import Dict, Optional
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config.app_config import app_config
+from config.database import set_deadline, reset_deadline
+
+
+def route_name(scope: Scope) -> Optional[str]:
+    """
+    Nom de la route visée par une requête (même résolution que le routeur)
+
+    Le résultat est gardé dans le scope : les middlewares suivants ne refont pas
+    la résolution.
+    """
+    if "route_name" not in scope:
+        scope["route_name"] = None
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                scope["route_name"] = getattr(route, "name", None)
+                break
+    return scope["route_name"]
+
+
+class DeadlineMiddleware:
+    """
+    Middleware ASGI posant l'échéance de chaque requête
+
+    À placer en tête de la pile : l'attente dans les files du délestage est
+    décomptée du temps accordé à la requête.
+    """
+
+    def __init__(self, app: ASGIApp, default_timeout: Optional[float] = None,
+                 route_timeouts: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            app: Application ASGI
+            default_timeout: Durée (secondes) accordée aux routes sans durée propre
+            route_timeouts: Durée par nom de route
+        """
+        self.app = app
+        self.default_timeout = default_timeout or app_config.REQUEST_TIMEOUT
+        self.route_timeouts = app_config.REQUEST_TIMEOUTS if route_timeouts is None else route_timeouts
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timeout = self.route_timeouts.get(route_name(scope), self.default_timeout)
+        token = set_deadline(timeout)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_deadline(token)
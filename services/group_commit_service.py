@@ -0,0 +1,220 @@
+"""
+Service d'écriture groupée des ajouts de produits (group commit)
+Les ajouts concurrents arrivés dans une courte fenêtre sont insérés par une seule
+instruction INSERT multi-lignes et un seul commit ; chaque appelant reçoit
+l'ID de son produit, ou sa propre erreur
+"""
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.app_config import app_config
+from config.database import LazyConnection
+from models.produit_model import Produit
+
+
+# Bornes supérieures des classes de l'histogramme des tailles de lot
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+# Résultat d'un suiveur dont le lot a échoué pour une raison propre au meneur
+# (échéance, connexion) : il insère son produit lui-même
+_RETRY = object()
+
+
+class _Batch:
+    """Lot en cours de constitution : (produit, résultat, instant d'arrivée) par appelant"""
+
+    def __init__(self):
+        self.items: List[Tuple[Produit, Future, float]] = []
+        self.sealed = threading.Event()
+
+
+class GroupCommitService:
+    """
+    Regroupe les insertions de produits concurrentes
+
+    Le premier appelant d'un lot en est le meneur : il attend la fin de la
+    fenêtre (ou que le lot soit plein) puis écrit le lot avec sa propre connexion.
+    Les autres appelants attendent le résultat sans utiliser leur connexion, sauf
+    si l'écriture échoue du fait du meneur (échéance dépassée, connexion perdue) :
+    chacun insère alors son produit seul, avec sa connexion et sa propre échéance.
+    """
+
+    def __init__(self, enabled: bool, window: float, max_rows: int):
+        """
+        Args:
+            enabled: Regroupement actif (sinon chaque produit est inséré par Produit.save)
+            window: Durée (secondes) pendant laquelle un lot accueille des produits
+            max_rows: Nombre de produits au-delà duquel le lot est écrit sans attendre
+        """
+        self.enabled = enabled
+        self.window = window
+        self.max_rows = max(1, max_rows)
+        self._open: Optional[_Batch] = None
+        self._lock = threading.Lock()
+        self._counters = {"rows": 0, "batches": 0, "fallbacks": 0, "retried": 0, "errors": 0}
+        self._sizes = {bound: 0 for bound in BATCH_SIZE_BUCKETS}
+        self._sizes_over = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def save(self, connection, produit: Produit) -> bool:
+        """
+        Insère un nouveau produit, groupé avec les ajouts concurrents
+
+        Args:
+            connection: Connexion de la requête (utilisée si l'appelant mène le lot)
+            produit: Produit sans ID
+
+        Returns:
+            True si le produit a été inséré (produit.id_p renseigné), False sinon
+        """
+        if not self.enabled:
+            return produit.save(connection)
+
+        result: Future = Future()
+        # Clé résolue par le lot : oubliée si le produit doit être réinséré seul
+        resolve_type = produit.id_type is None
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            batch.items.append((produit, result, time.perf_counter()))
+            if len(batch.items) >= self.max_rows:
+                self._seal(batch)
+
+        if leader:
+            batch.sealed.wait(self.window)
+            with self._lock:
+                self._seal(batch)
+            self._write(connection, batch)
+
+        saved = result.result()
+        if saved is _RETRY:
+            if resolve_type:
+                produit.id_type = None
+            return produit.save(connection)
+        if saved and not leader and isinstance(connection, LazyConnection):
+            # Écriture validée par la connexion du meneur : les lectures suivantes
+            # de cette session doivent tout de même la voir
+            connection.mark_written()
+        return saved
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Compteurs depuis le démarrage du worker
+
+        Returns:
+            Produits et lots écrits, lots réécrits ligne par ligne après un échec,
+            produits réinsérés par leur appelant après un échec du meneur, histogramme des tailles de lot ("<=n": nombre de lots) et latence
+            ajoutée par l'attente du lot (millisecondes, moyenne et maximale)
+        """
+        with self._lock:
+            rows = self._counters["rows"]
+            batches = self._counters["batches"]
+            sizes = {f"<={bound}": count for bound, count in self._sizes.items()}
+            sizes[f">{BATCH_SIZE_BUCKETS[-1]}"] = self._sizes_over
+            return {
+                "enabled": self.enabled,
+                "window_ms": self.window * 1000,
+                "max_rows": self.max_rows,
+                **self._counters,
+                "batch_size_avg": round(rows / batches, 2) if batches else 0.0,
+                "batch_sizes": sizes,
+                "added_latency_avg_ms": round(self._wait_total / rows * 1000, 2) if rows else 0.0,
+                "added_latency_max_ms": round(self._wait_max * 1000, 2)
+            }
+
+    def _seal(self, batch: _Batch) -> None:
+        """Ferme le lot aux nouveaux appelants (sous verrou)"""
+        if self._open is batch:
+            self._open = None
+        batch.sealed.set()
+
+    def _write(self, connection, batch: _Batch) -> None:
+        """Écrit le lot et transmet son résultat à chaque appelant"""
+        started = time.perf_counter()
+        self._record(batch, started)
+        produits = [produit for produit, _, _ in batch.items]
+        try:
+            if len(produits) == 1:
+                saved = produits[0].save(connection)
+            else:
+                saved = Produit.insert_many(connection, produits)
+        except BaseException as e:
+            self._fail(batch, 0, e)
+            return
+
+        if saved or len(produits) == 1:
+            if not saved:
+                with self._lock:
+                    self._counters["errors"] += 1
+            for _, result, _ in batch.items:
+                result.set_result(saved)
+            return
+
+        # Une ligne invalide fait échouer toute l'instruction : chaque produit est
+        # réinséré seul pour que seul l'appelant fautif reçoive l'erreur
+        with self._lock:
+            self._counters["fallbacks"] += 1
+        for index, (produit, result, _) in enumerate(batch.items):
+            try:
+                saved = produit.save(connection)
+            except BaseException as e:
+                self._fail(batch, index, e)
+                return
+            if not saved:
+                with self._lock:
+                    self._counters["errors"] += 1
+            result.set_result(saved)
+
+    def _fail(self, batch: _Batch, start: int, error: BaseException) -> None:
+        """
+        Transmet un échec de la connexion du meneur aux appelants pas encore servis
+
+        Une erreur MySQL sur une ligne est rendue par save (False) ; une exception
+        vient de la requête du meneur (échéance dépassée, connexion perdue) et ne
+        concerne pas les autres produits : seul le meneur la reçoit, ses suiveurs
+        réinsèrent leur produit seuls.
+
+        Args:
+            batch: Lot en cours d'écriture (le meneur est son premier appelant)
+            start: Indice du premier appelant sans résultat
+            error: Exception levée par l'écriture
+        """
+        pending = batch.items[start:]
+        leader_pending = start == 0
+        with self._lock:
+            self._counters["errors"] += int(leader_pending)
+            self._counters["retried"] += len(pending) - int(leader_pending)
+        if leader_pending:
+            batch.items[0][1].set_exception(error)
+            pending = pending[1:]
+        for _, result, _ in pending:
+            result.set_result(_RETRY)
+
+    def _record(self, batch: _Batch, started: float) -> None:
+        """Ajoute le lot à l'histogramme et l'attente de chaque appelant à la latence ajoutée"""
+        size = len(batch.items)
+        with self._lock:
+            self._counters["rows"] += size
+            self._counters["batches"] += 1
+            bound = next((bound for bound in BATCH_SIZE_BUCKETS if size <= bound), None)
+            if bound is None:
+                self._sizes_over += 1
+            else:
+                self._sizes[bound] += 1
+            for _, _, enqueued in batch.items:
+                waited = started - enqueued
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+
+# Instance globale de l'écriture groupée des ajouts
+group_commit_service = GroupCommitService(
+    enabled=app_config.GROUP_COMMIT_ENABLED,
+    window=app_config.GROUP_COMMIT_WINDOW_MS / 1000,
+    max_rows=app_config.GROUP_COMMIT_MAX_ROWS
+)
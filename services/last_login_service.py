@@ -0,0 +1,110 @@
+"""
+Service d'écriture différée des dates de connexion
+Retire l'UPDATE de `user_date_login` du chemin critique de la connexion :
+les dates sont gardées en mémoire puis écrites périodiquement en une requête
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from config.app_config import app_config
+from config.database import close_connection, open_connection
+from models.user_model import User
+
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginService:
+    """Tampon en mémoire des dates de dernière connexion, vidé en tâche de fond"""
+
+    def __init__(self, max_staleness: float, max_pending: int):
+        """
+        Args:
+            max_staleness: Délai maximal (secondes) entre une connexion et son écriture
+            max_pending: Nombre d'utilisateurs en attente déclenchant une écriture anticipée
+        """
+        self.max_staleness = max_staleness
+        self.max_pending = max_pending
+        self._pending: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, user_id: int, when: Optional[datetime] = None) -> None:
+        """
+        Enregistre une connexion sans accéder à la base
+
+        Args:
+            user_id: ID de l'utilisateur
+            when: Date de connexion (maintenant par défaut)
+        """
+        with self._lock:
+            self._pending[user_id] = when or datetime.now()
+            pending = len(self._pending)
+        if pending >= self.max_pending:
+            self._wakeup.set()
+
+    def flush(self) -> bool:
+        """
+        Écrit les dates en attente en une seule requête
+
+        En cas d'échec, les dates sont remises dans le tampon (sans écraser une
+        connexion plus récente) pour la prochaine tentative.
+
+        Returns:
+            True si le tampon a été écrit (ou était vide), False sinon
+        """
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return True
+
+        connection = None
+        try:
+            connection = open_connection()
+            if User.update_last_logins(connection, batch):
+                return True
+        except Exception:
+            logger.exception("Erreur lors de l'écriture des dates de connexion")
+        finally:
+            close_connection(connection)
+
+        with self._lock:
+            for user_id, when in batch.items():
+                if user_id not in self._pending:
+                    self._pending[user_id] = when
+        return False
+
+    def start(self) -> None:
+        """Démarre le thread d'écriture périodique (à appeler dans chaque worker)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="last-login-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Arrête le thread et écrit les dates restantes"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=self.max_staleness + 5)
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.max_staleness)
+            self._wakeup.clear()
+            if not self._stopping.is_set():
+                self.flush()
+
+
+# Instance globale du service d'écriture différée
+last_login_service = LastLoginService(
+    max_staleness=app_config.LAST_LOGIN_MAX_STALENESS,
+    max_pending=app_config.LAST_LOGIN_MAX_PENDING
+)
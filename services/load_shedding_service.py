@@ -0,0 +1,255 @@
+"""
+Service de délestage (load shedding)
+Limite le nombre de requêtes traitées simultanément par route et pour tout le
+worker, avec des files d'attente bornées : une requête en trop reçoit
+immédiatement une réponse 503 au lieu d'attendre un thread puis une connexion MySQL
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config.app_config import app_config
+from config.database import db_config, remaining_time
+from services.deadline_service import route_name
+
+
+class Overloaded(Exception):
+    """Levée quand une requête est délestée (file pleine ou attente trop longue)"""
+
+
+class ConcurrencyLimit:
+    """
+    Limite de concurrence avec file d'attente bornée (FIFO)
+
+    Utilisée depuis la boucle d'événements du worker uniquement : pas de verrou.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float):
+        """
+        Args:
+            name: Nom de la limite (route ou "global")
+            limit: Nombre de requêtes traitées simultanément
+            max_queue: Nombre de requêtes en attente au-delà duquel on déleste
+            queue_timeout: Attente maximale (secondes) dans la file
+        """
+        self.name = name
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._counters = {"admitted": 0, "queued": 0, "shed_queue_full": 0, "shed_timeout": 0}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def acquire(self) -> float:
+        """
+        Prend une place, en attendant dans la file si besoin
+
+        Returns:
+            Temps passé dans la file (secondes)
+
+        Raises:
+            Overloaded: Si la file est pleine ou si l'attente dépasse queue_timeout
+                        (ou l'échéance de la requête)
+        """
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self._counters["admitted"] += 1
+            return 0.0
+        if len(self._waiters) >= self.max_queue:
+            self._counters["shed_queue_full"] += 1
+            raise Overloaded(f"File d'attente pleine ({self.name})")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._counters["queued"] += 1
+        started = time.perf_counter()
+        # L'attente ne dépasse pas non plus l'échéance de la requête
+        remaining = remaining_time()
+        timeout = self.queue_timeout if remaining is None else max(0.0, min(self.queue_timeout, remaining))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # La place a été attribuée au moment de l'expiration : elle est rendue
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._counters["shed_timeout"] += 1
+            raise Overloaded(f"Attente trop longue ({self.name})") from None
+
+        waited = time.perf_counter() - started
+        self._counters["admitted"] += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        return waited
+
+    def release(self) -> None:
+        """Libère une place et la donne à la première requête en attente"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # La place passe directement à la requête suivante (active inchangé)
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Compteurs depuis le démarrage du worker
+
+        Returns:
+            Limites, requêtes en cours et en attente, requêtes admises/délestées,
+            attente moyenne et maximale dans la file (millisecondes)
+        """
+        queued = self._counters["queued"] - self._counters["shed_timeout"]
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": len(self._waiters),
+            **self._counters,
+            "wait_avg_ms": round(self._wait_total / queued * 1000, 2) if queued > 0 else 0.0,
+            "wait_max_ms": round(self._wait_max * 1000, 2)
+        }
+
+
+class LoadSheddingService:
+    """Limites de concurrence du worker : une globale et une par route coûteuse"""
+
+    def __init__(self, global_limit: Optional[int], route_shares: Dict[str, float], queue_factor: float,
+                 queue_timeout: float, exempt_prefixes: List[str]):
+        """
+        Args:
+            global_limit: Requêtes simultanées toutes routes confondues ; None pour la
+                          taille du threadpool et du pool MySQL, lue par start()
+            route_shares: Part de la limite globale accordée à chaque route (par nom de route)
+            queue_factor: Taille des files, en multiple de la limite
+            queue_timeout: Attente maximale (secondes) dans une file
+            exempt_prefixes: Chemins jamais limités (fichiers statiques, métriques)
+        """
+        self.exempt_prefixes = tuple(exempt_prefixes)
+        self.configured_limit = global_limit
+        self.route_shares = route_shares
+        self.queue_factor = queue_factor
+        self.queue_timeout = queue_timeout
+        self.global_limit: ConcurrencyLimit
+        self.route_limits: Dict[str, ConcurrencyLimit] = {}
+        self._build_limits()
+
+    def resolve_global_limit(self) -> int:
+        """
+        Limite globale : celle configurée, sinon la taille du threadpool, bornée par le
+        pool MySQL (une requête de plus attendrait une connexion)
+        """
+        if self.configured_limit is not None:
+            return self.configured_limit
+        if db_config.pool_size > 0:
+            return min(app_config.THREADPOOL_SIZE, db_config.pool_size)
+        return app_config.THREADPOOL_SIZE
+
+    def start(self) -> None:
+        """
+        Recalcule les limites avec le dimensionnement final (à appeler dans chaque
+        worker, avant la première requête) : server.py fixe la taille du threadpool
+        et du pool après l'import de la configuration
+        """
+        self._build_limits()
+
+    def _build_limits(self) -> None:
+        global_limit = self.resolve_global_limit()
+        self.global_limit = ConcurrencyLimit(
+            "global", global_limit, int(global_limit * self.queue_factor), self.queue_timeout
+        )
+        self.route_limits = {}
+        for name, share in self.route_shares.items():
+            limit = max(1, int(global_limit * share))
+            self.route_limits[name] = ConcurrencyLimit(
+                name, limit, int(limit * self.queue_factor), self.queue_timeout
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs de la limite globale et de chaque route limitée"""
+        return {
+            "global": self.global_limit.stats(),
+            "routes": {name: limit.stats() for name, limit in self.route_limits.items()}
+        }
+
+
+class LoadSheddingMiddleware:
+    """
+    Middleware ASGI appliquant les limites de load_shedding_service
+
+    La limite de la route est prise avant la limite globale : une route coûteuse
+    qui attend sa place n'occupe pas une place globale des routes légères.
+    """
+
+    def __init__(self, app: ASGIApp, service: Optional[LoadSheddingService] = None):
+        self.app = app
+        self.service = service or load_shedding_service
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.service.exempt_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        limits = [self.service.global_limit]
+        route_limit = self.service.route_limits.get(route_name(scope))
+        if route_limit is not None:
+            limits.insert(0, route_limit)
+
+        acquired: List[ConcurrencyLimit] = []
+        waited = 0.0
+        try:
+            for limit in limits:
+                waited += await limit.acquire()
+                acquired.append(limit)
+        except Overloaded:
+            for limit in reversed(acquired):
+                limit.release()
+            await self._reject(send)
+            return
+
+        async def send_with_wait(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-queue-wait-ms", f"{waited * 1000:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_wait)
+        finally:
+            for limit in reversed(acquired):
+                limit.release()
+
+    async def _reject(self, send: Send) -> None:
+        body = "Service momentanément surchargé, veuillez réessayer.".encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(app_config.CONCURRENCY_RETRY_AFTER).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# Instance globale du délestage (limites propres à chaque worker)
+load_shedding_service = LoadSheddingService(
+    global_limit=app_config.CONCURRENCY_GLOBAL_LIMIT,
+    route_shares=app_config.CONCURRENCY_ROUTE_SHARES,
+    queue_factor=app_config.CONCURRENCY_QUEUE_FACTOR,
+    queue_timeout=app_config.CONCURRENCY_QUEUE_TIMEOUT,
+    # Le flux SSE garde sa connexion ouverte : il a sa propre limite d'abonnés
+    exempt_prefixes=[app_config.STATIC_URL, "/concurrency.json", "/produits/events"]
+)
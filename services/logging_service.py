@@ -0,0 +1,299 @@
+"""
+Service de journalisation structurée
+Les enregistrements sont mis en file par les threads qui journalisent puis écrits
+en JSON (une ligne par enregistrement) sur la sortie standard par un thread
+dédié : aucune écriture ne bloque le traitement d'une requête
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+import traceback
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.app_config import app_config
+from config.database import StatementStats, set_statement_stats, reset_statement_stats
+from services.deadline_service import route_name
+
+
+# Identifiant et nom de route de la requête en cours, ajoutés à chaque enregistrement
+_request_context: ContextVar[Optional[Tuple[str, Optional[str]]]] = ContextVar("request_context", default=None)
+
+# Attributs propres à logging.LogRecord : les autres sont les champs passés par extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+# Longueur maximale d'un X-Request-ID fourni par le client (sinon un identifiant est généré)
+REQUEST_ID_MAX_LENGTH = 128
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """
+    Niveaux par module
+
+    Args:
+        spec: "module=NIVEAU" séparés par des virgules (ex. "models=WARNING,access=ERROR")
+
+    Returns:
+        Niveau numérique par nom de logger (les entrées invalides sont ignorées)
+    """
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        value = logging.getLevelName(level.strip().upper())
+        if name.strip() and isinstance(value, int):
+            levels[name.strip()] = value
+    return levels
+
+
+class JsonFormatter(logging.Formatter):
+    """Formate un enregistrement en objet JSON sur une ligne"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Ajoute l'identifiant et le nom de route de la requête en cours"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _request_context.get()
+        if context is not None and not hasattr(record, "request_id"):
+            record.request_id, record.route = context
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limite les répétitions d'un même message d'avertissement ou d'erreur
+
+    Un message (logger, niveau, modèle du message avant ses arguments) est écrit
+    au plus `burst` fois par fenêtre de `window` secondes ; le premier
+    enregistrement écrit après des suppressions porte leur nombre (champ
+    "suppressed"). Une panne de la base ne produit ainsi que quelques lignes
+    par minute et par site d'appel.
+    """
+
+    def __init__(self, burst: int, window: float, min_level: int = logging.WARNING):
+        """
+        Args:
+            burst: Enregistrements écrits par fenêtre pour un même message
+            window: Durée de la fenêtre (secondes)
+            min_level: Niveau à partir duquel la limite s'applique
+        """
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.min_level = min_level
+        self._windows: Dict[Tuple[str, int, str], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level or self.burst <= 0:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            # [début de la fenêtre, écrits dans la fenêtre, supprimés non encore signalés]
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state is not None else 0
+                state = self._windows[key] = [now, 0, suppressed]
+            if state[1] >= self.burst:
+                state[2] += 1
+                return False
+            state[1] += 1
+            suppressed, state[2] = state[2], 0
+        if suppressed:
+            record.suppressed = int(suppressed)
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler qui n'attend jamais : file pleine, l'enregistrement est abandonné
+    et compté (le nombre est joint au prochain enregistrement mis en file)
+
+    Le message et la trace éventuelle sont calculés dans le thread appelant (les
+    arguments peuvent changer ensuite) ; le formatage JSON et l'écriture ont lieu
+    dans le thread du QueueListener.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.dropped:
+            record.dropped = self.dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        else:
+            self.dropped = 0
+
+
+class LoggingService:
+    """Installation de la journalisation structurée dans un worker"""
+
+    def __init__(self, level: str, levels: str, queue_size: int, rate_limit_burst: int, rate_limit_window: float):
+        """
+        Args:
+            level: Niveau par défaut (logger racine)
+            levels: Niveaux par module, "module=NIVEAU" séparés par des virgules
+            queue_size: Enregistrements en attente d'écriture au plus (au-delà, abandonnés)
+            rate_limit_burst: Répétitions d'un même avertissement ou erreur écrites par fenêtre
+            rate_limit_window: Durée de la fenêtre de limitation (secondes)
+        """
+        self.level = parse_levels(f"root={level}").get("root", logging.INFO)
+        self.levels = parse_levels(levels)
+        self.queue_size = queue_size
+        self.rate_limit_burst = rate_limit_burst
+        self.rate_limit_window = rate_limit_window
+        self._handler: Optional[NonBlockingQueueHandler] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._previous_handlers: List[logging.Handler] = []
+        self._previous_level = logging.WARNING
+
+    def start(self, stream=None) -> None:
+        """
+        Remplace les gestionnaires du logger racine par la file et démarre le
+        thread d'écriture (à appeler dans chaque worker, après le fork)
+
+        Args:
+            stream: Flux de sortie (sortie standard par défaut)
+        """
+        if self._listener is not None:
+            return
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter())
+
+        self._handler = NonBlockingQueueHandler(queue.Queue(self.queue_size))
+        self._handler.addFilter(RateLimitFilter(self.rate_limit_burst, self.rate_limit_window))
+        self._handler.addFilter(RequestContextFilter())
+
+        root = logging.getLogger()
+        self._previous_handlers, self._previous_level = root.handlers[:], root.level
+        root.handlers = [self._handler]
+        root.setLevel(self.level)
+        for name, level in self.levels.items():
+            logging.getLogger(name).setLevel(level)
+
+        self._listener = logging.handlers.QueueListener(self._handler.queue, output)
+        self._listener.start()
+
+    def stop(self) -> None:
+        """Écrit les enregistrements en attente et rétablit les gestionnaires précédents"""
+        if self._listener is None:
+            return
+        self._listener.stop()
+        root = logging.getLogger()
+        root.handlers, self._previous_handlers = self._previous_handlers, []
+        root.setLevel(self._previous_level)
+        self._listener = None
+        self._handler = None
+
+
+class AccessLogMiddleware:
+    """
+    Middleware ASGI journalisant chaque requête (logger "access")
+
+    Pose l'identifiant de la requête (en-tête X-Request-ID reçu, sinon généré,
+    renvoyé dans la réponse) et les compteurs SQL de config.database ; à la fin
+    de la requête écrit route, statut, durée, temps et nombre d'instructions SQL.
+    À placer en tête de la pile pour mesurer toute la durée de la requête.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.logger = logging.getLogger("access")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        request_id = self._request_id(scope)
+        route = route_name(scope)
+        stats = StatementStats()
+        context_token = _request_context.set((request_id, route))
+        stats_token = set_statement_stats(stats)
+        status = None
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(
+                    "%s %s %s", scope["method"], scope["path"], status or 500,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status or 500,
+                        "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+                        "db_ms": round(stats.seconds * 1000, 2),
+                        "db_statements": stats.count
+                    }
+                )
+            reset_statement_stats(stats_token)
+            _request_context.reset(context_token)
+
+    @staticmethod
+    def _request_id(scope: Scope) -> str:
+        """X-Request-ID du client s'il est raisonnable (imprimable, borné), sinon un nouvel identifiant"""
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                if 0 < len(value) <= REQUEST_ID_MAX_LENGTH and all(0x21 <= byte <= 0x7e for byte in value):
+                    return value.decode("ascii")
+                break
+        return uuid.uuid4().hex
+
+
+# Instance globale de la journalisation
+logging_service = LoggingService(
+    level=app_config.LOG_LEVEL,
+    levels=app_config.LOG_LEVELS,
+    queue_size=app_config.LOG_QUEUE_SIZE,
+    rate_limit_burst=app_config.LOG_RATE_LIMIT_BURST,
+    rate_limit_window=app_config.LOG_RATE_LIMIT_WINDOW
+)
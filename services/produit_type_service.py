@@ -0,0 +1,122 @@
+"""
+Service du dictionnaire des types de produits
+Les types changent rarement : ils sont chargés au démarrage du worker et gardés
+en mémoire pour les listes déroulantes des formulaires et les filtres de la
+liste, sans requête ; un type créé par un worker est appris par tous grâce aux
+messages du catalogue
+"""
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from mysql.connector import Error
+
+from config.database import close_connection, open_connection
+from models.produit_type_model import ProduitType
+from services.catalog_events_service import catalog_events_service
+
+
+logger = logging.getLogger(__name__)
+
+
+def type_key(libelle: str) -> str:
+    """Clé de comparaison d'un libellé (la colonne libelle est insensible à la casse)"""
+    return libelle.strip().casefold()
+
+
+class ProduitTypeService:
+    """
+    Dictionnaire en mémoire des types de produits (id_type <-> libellé)
+
+    Un libellé inconnu n'est pas une erreur : Produit.save crée le type dans la
+    transaction du produit, puis le dictionnaire l'apprend par le message de création.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._libelles: Dict[int, str] = {}
+        self._ids: Dict[str, int] = {}
+        # Libellés triés, recalculés à chaque nouveau type
+        self._sorted: List[str] = []
+        catalog_events_service.add_message_listener(self._on_message)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, connection) -> bool:
+        """
+        Charge (ou recharge) tous les types depuis la base
+
+        Args:
+            connection: Connexion à la bdd
+
+        Returns:
+            True si le dictionnaire est chargé, False en cas d'erreur
+        """
+        types = ProduitType.find_all(connection)
+        if types is None:
+            return False
+        with self._lock:
+            self._libelles = {produit_type.id_type: produit_type.libelle for produit_type in types}
+            self._ids = {type_key(produit_type.libelle): produit_type.id_type for produit_type in types}
+            self._sorted = sorted(self._libelles.values(), key=type_key)
+            self._loaded = True
+        return True
+
+    def ensure_loaded(self, connection) -> None:
+        """
+        Charge les types s'ils ne l'ont pas été au démarrage (base injoignable)
+
+        Args:
+            connection: Connexion à la bdd (utilisée seulement si le dictionnaire est vide)
+        """
+        if not self._loaded:
+            self.load(connection)
+
+    def start(self) -> None:
+        """Charge les types au démarrage du worker ; en cas d'échec, ensure_loaded réessaiera"""
+        connection = None
+        try:
+            connection = open_connection()
+            self.load(connection)
+        except Error as e:
+            logger.error("Erreur lors du chargement des types de produits: %s", e)
+        finally:
+            close_connection(connection)
+
+    def libelles(self) -> List[str]:
+        """Libellés de tous les types, triés"""
+        return self._sorted
+
+    def id_for(self, libelle: str) -> Optional[int]:
+        """
+        Clé d'un type d'après son libellé
+
+        Returns:
+            id_type, ou None si le type est inconnu de ce worker
+        """
+        return self._ids.get(type_key(libelle))
+
+    def libelle_for(self, id_type: int) -> Optional[str]:
+        """Libellé d'un type d'après sa clé, ou None s'il est inconnu"""
+        return self._libelles.get(id_type)
+
+    def _learn(self, id_type: int, libelle: str) -> None:
+        with self._lock:
+            if id_type in self._libelles:
+                return
+            self._libelles = {**self._libelles, id_type: libelle}
+            self._ids = {**self._ids, type_key(libelle): id_type}
+            self._sorted = sorted(self._libelles.values(), key=type_key)
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        """Apprend le type d'un produit créé ou modifié (par ce worker ou un autre)"""
+        produit = (message.get("data") or {}).get("produit")
+        if produit and produit.get("id_type") is not None:
+            self._learn(produit["id_type"], produit["type_p"])
+
+
+# Instance globale du dictionnaire des types
+produit_type_service = ProduitTypeService()
@@ -0,0 +1,270 @@
+"""
+Service de profilage des requêtes à la demande
+Une requête portant le jeton de profilage (en-tête X-Profile ou paramètre
+?profile=), ou tirée au sort, est échantillonnée pendant son traitement ; les
+piles sont enregistrées au format « collapsed stacks » (flame graph, speedscope)
+"""
+import contextvars
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.app_config import app_config
+from services.deadline_service import route_name
+
+
+logger = logging.getLogger(__name__)
+
+
+# Profil de la requête en cours (visible dans les threads du threadpool)
+_current_profile: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar(
+    "current_profile", default=None
+)
+
+# Cadres ajoutés au-dessus du premier appel MySQL ou Jinja2 d'une pile
+SQL_MARKER = "[SQL]"
+TEMPLATE_MARKER = "[template]"
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _frame_category(filename: str) -> Optional[str]:
+    """Catégorie d'un cadre : SQL (mysql.connector), template (Jinja2 ou template compilé)"""
+    if f"{os.sep}mysql{os.sep}" in filename:
+        return SQL_MARKER
+    if f"{os.sep}jinja2{os.sep}" in filename or filename.endswith(".html"):
+        return TEMPLATE_MARKER
+    return None
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(PROJECT_ROOT):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    # Les « ; » séparent les cadres dans le format collapsed
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+
+class RequestProfile:
+    """
+    Profil d'une requête : un thread échantillonne les piles des threads qui la traitent
+
+    Sont retenus le thread de la boucle d'événements quand il exécute la coroutine
+    de la requête, et les threads du threadpool qui exécutent une fonction dans le
+    contexte de la requête (Context.run d'anyio).
+    """
+
+    def __init__(self, request_frame, interval: float):
+        """
+        Args:
+            request_frame: Cadre de la coroutine du middleware pour cette requête
+            interval: Intervalle d'échantillonnage (secondes)
+        """
+        self.request_frame = request_frame
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.category_samples: Counter = Counter()
+        self.threads = set()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self.started = 0.0
+        self.duration = 0.0
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.duration = time.perf_counter() - self.started
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own:
+                    self._sample(thread_id, frame)
+
+    def _sample(self, thread_id: int, frame) -> None:
+        """Ajoute la pile d'un thread si elle appartient à la requête"""
+        frames = []
+        belongs = False
+        while frame is not None:
+            if frame is self.request_frame:
+                belongs = True
+            elif "context" in frame.f_code.co_varnames:
+                context = frame.f_locals.get("context")
+                if isinstance(context, contextvars.Context) and context.get(_current_profile) is self:
+                    belongs = True
+            frames.append(frame.f_code)
+            frame = frame.f_back
+        if not belongs:
+            return
+
+        labels: List[str] = []
+        category = None
+        for code in reversed(frames):
+            frame_category = _frame_category(code.co_filename)
+            if frame_category and category is None:
+                category = frame_category
+                labels.append(category)
+            labels.append(_frame_label(code))
+        self.stacks[";".join(labels)] += 1
+        self.samples += 1
+        self.category_samples[category or "python"] += 1
+        self.threads.add(thread_id)
+
+    def summary(self) -> Dict[str, Any]:
+        """Durée, nombre d'échantillons et temps estimé par catégorie (millisecondes)"""
+        # Temps estimé : part des échantillons d'une catégorie dans la durée de la requête
+        per_sample = self.duration / self.samples * 1000 if self.samples else 0.0
+        return {
+            "duration_ms": round(self.duration * 1000, 2),
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "threads": len(self.threads),
+            "sql_ms": round(self.category_samples[SQL_MARKER] * per_sample, 2),
+            "template_ms": round(self.category_samples[TEMPLATE_MARKER] * per_sample, 2),
+            "python_ms": round(self.category_samples["python"] * per_sample, 2),
+        }
+
+
+class ProfilingService:
+    """Choix des requêtes profilées et enregistrement des profils"""
+
+    def __init__(self, token: str, sample_rate: float, interval: float, directory: str, max_concurrent: int):
+        """
+        Args:
+            token: Jeton autorisant le profilage à la demande (désactivé si vide)
+            sample_rate: Part des requêtes profilées sans jeton (0 à 1)
+            interval: Intervalle d'échantillonnage (secondes)
+            directory: Répertoire des profils enregistrés
+            max_concurrent: Profils simultanés au plus (surcoût borné)
+        """
+        self.token = token
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.directory = directory
+        self.max_concurrent = max_concurrent
+        self.active = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token) or self.sample_rate > 0
+
+    def requested(self, scope: Scope) -> bool:
+        """True si la requête porte le jeton de profilage, ou est tirée au sort"""
+        if self.token:
+            supplied = None
+            for name, value in scope["headers"]:
+                if name == b"x-profile":
+                    supplied = value.decode("latin-1")
+                    break
+            if supplied is None and b"profile=" in scope["query_string"]:
+                supplied = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [None])[0]
+            if supplied is not None and hmac.compare_digest(supplied, self.token):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self.active >= self.max_concurrent:
+                return False
+            self.active += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.active -= 1
+
+    def new_id(self, scope: Scope) -> str:
+        """Identifiant d'un profil (nom de ses fichiers, renvoyé dans l'en-tête X-Profile-Id)"""
+        return f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{os.getpid()}-{route_name(scope) or 'inconnue'}"
+
+    def save(self, profile_id: str, profile: RequestProfile, scope: Scope, status: Optional[int]) -> None:
+        """Enregistre le profil : <id>.collapsed (piles, une par ligne avec son nombre d'échantillons) et <id>.json (résumé)"""
+        try:
+            self._write(profile_id, profile, scope, status)
+        except OSError as e:
+            logger.error("Erreur lors de l'enregistrement du profil %s: %s", profile_id, e)
+
+    def _write(self, profile_id: str, profile: RequestProfile, scope: Scope, status: Optional[int]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{profile_id}.collapsed"), "w", encoding="utf-8") as f:
+            for stack, count in profile.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(os.path.join(self.directory, f"{profile_id}.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "route": route_name(scope),
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                **profile.summary()
+            }, f, indent=2)
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI profilant les requêtes choisies par profiling_service
+
+    Sans jeton ni échantillonnage configurés, les requêtes sont transmises telles quelles.
+    """
+
+    def __init__(self, app: ASGIApp, service: Optional[ProfilingService] = None):
+        self.app = app
+        self.service = service or profiling_service
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (scope["type"] != "http" or not self.service.enabled or not self.service.requested(scope)
+                or not self.service.acquire()):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = self.service.new_id(scope)
+        profile = RequestProfile(sys._getframe(), self.service.interval)
+        token = _current_profile.set(profile)
+        status = None
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.stop()
+            _current_profile.reset(token)
+            self.service.release()
+            self.service.save(profile_id, profile, scope, status)
+
+
+# Instance globale du profilage à la demande
+profiling_service = ProfilingService(
+    token=app_config.PROFILING_TOKEN,
+    sample_rate=app_config.PROFILING_SAMPLE_RATE,
+    interval=app_config.PROFILING_INTERVAL_MS / 1000,
+    directory=app_config.PROFILING_DIR,
+    max_concurrent=app_config.PROFILING_MAX_CONCURRENT
+)
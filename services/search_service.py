@@ -0,0 +1,286 @@
+"""
+Service de recherche de produits
+Index inversé en mémoire sur la désignation et le type, insensible aux accents,
+avec recherche par préfixe pour l'autocomplétion
+"""
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from models.produit_model import Produit
+from services.catalog_events_service import catalog_events_service
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Poids des correspondances dans le score de pertinence
+WEIGHT_EXACT_DESIGNATION = 3
+WEIGHT_PREFIX_DESIGNATION = 2
+WEIGHT_TYPE = 1
+
+
+def normalize(text: str) -> str:
+    """
+    Normalise un texte pour la recherche : minuscules et sans accents
+
+    "Électronique" -> "electronique", "Pâtes" -> "pates"
+    """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """Découpe un texte normalisé en mots"""
+    return TOKEN_PATTERN.findall(normalize(text))
+
+
+class SearchService:
+    """
+    Index de recherche du catalogue, chargé à la première recherche puis tenu
+    à jour par les notifications de Produit (création, modification, suppression)
+    et par celles des autres workers (produits relus à la recherche suivante)
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        # Mot normalisé -> IDs des produits le contenant
+        self._postings: Dict[str, Set[int]] = {}
+        # Vocabulaire trié pour les recherches par préfixe (bisect)
+        self._vocabulary: List[str] = []
+        # ID -> (désignation, type, mots de la désignation, mots du type)
+        self._documents: Dict[int, Tuple[str, str, Set[str], Set[str]]] = {}
+        # IDs modifiés par d'autres workers, à relire depuis la base
+        self._dirty: Set[int] = set()
+        Produit.add_change_listener(self._on_catalog_change)
+        catalog_events_service.add_listener(self._on_remote_change)
+
+    @property
+    def loaded(self) -> bool:
+        """True si l'index a été construit"""
+        return self._loaded
+
+    def ensure_loaded(self, connection) -> None:
+        """
+        Construit l'index depuis la base si ce n'est pas déjà fait, sinon relit
+        les produits modifiés par d'autres workers
+
+        Args:
+            connection: Connexion à la bdd (utilisée au premier appel et après
+                        une modification faite par un autre worker)
+        """
+        if self._loaded:
+            if self._dirty:
+                self._reindex_dirty(connection)
+            return
+        produits = Produit.find_all(connection)
+        with self._lock:
+            if self._loaded:
+                return
+            for produit in produits:
+                self._add(produit.id_p, produit.designation_p, produit.type_p, keep_sorted=False)
+            self._vocabulary = sorted(self._postings)
+            self._loaded = True
+
+    def clear(self) -> None:
+        """Vide l'index (il sera reconstruit à la prochaine recherche)"""
+        with self._lock:
+            self._postings.clear()
+            self._vocabulary.clear()
+            self._documents.clear()
+            self._dirty.clear()
+            self._loaded = False
+
+    def search(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Recherche les produits contenant tous les mots de la requête
+
+        Le dernier mot est traité comme un préfixe. Les résultats sont classés par
+        pertinence (mots exacts dans la désignation, puis préfixes, puis type).
+
+        Args:
+            query: Texte recherché
+            limit: Nombre maximal de résultats
+
+        Returns:
+            Liste de dictionnaires {id_p, designation_p, type_p, score}
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            candidates = self._candidates(terms)
+            if not candidates:
+                return []
+            scored = ((self._score(id_p, terms), id_p) for id_p in candidates)
+            best = heapq.nlargest(
+                limit, scored,
+                key=lambda item: (item[0], -len(self._documents[item[1]][0]), -item[1])
+            )
+            return [self._result(id_p, score) for score, id_p in best]
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Suggestions pour une saisie en cours
+
+        Ne parcourt que la plage du vocabulaire correspondant au préfixe et s'arrête
+        dès que limit produits sont trouvés : le coût ne dépend pas de la taille du
+        catalogue.
+
+        Args:
+            prefix: Texte saisi
+            limit: Nombre maximal de suggestions
+
+        Returns:
+            Liste de dictionnaires {id_p, designation_p, type_p}
+        """
+        terms = tokenize(prefix)
+        if not terms:
+            return []
+
+        with self._lock:
+            required: Optional[Set[int]] = None
+            for term in terms[:-1]:
+                postings = self._postings.get(term, set())
+                required = postings if required is None else required & postings
+                if not required:
+                    return []
+
+            suggestions: List[int] = []
+            seen: Set[int] = set()
+            for token in self._prefix_range(terms[-1]):
+                for id_p in self._postings[token]:
+                    if id_p in seen or (required is not None and id_p not in required):
+                        continue
+                    seen.add(id_p)
+                    suggestions.append(id_p)
+                    if len(suggestions) >= limit:
+                        return [self._result(id_p) for id_p in suggestions]
+            return [self._result(id_p) for id_p in suggestions]
+
+    def _candidates(self, terms: List[str]) -> Set[int]:
+        """IDs des produits contenant tous les termes (le dernier en préfixe)"""
+        sets = [self._postings.get(term, set()) for term in terms[:-1]]
+        last: Set[int] = set()
+        for token in self._prefix_range(terms[-1]):
+            last |= self._postings[token]
+        sets.append(last)
+        sets.sort(key=len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+            if not result:
+                break
+        return result
+
+    def _score(self, id_p: int, terms: List[str]) -> int:
+        _, _, designation_tokens, type_tokens = self._documents[id_p]
+        score = 0
+        for term in terms:
+            if term in designation_tokens:
+                score += WEIGHT_EXACT_DESIGNATION
+            elif any(token.startswith(term) for token in designation_tokens):
+                score += WEIGHT_PREFIX_DESIGNATION
+            if any(token.startswith(term) for token in type_tokens):
+                score += WEIGHT_TYPE
+        return score
+
+    def _result(self, id_p: int, score: Optional[int] = None) -> Dict[str, Any]:
+        designation_p, type_p, _, _ = self._documents[id_p]
+        result = {"id_p": id_p, "designation_p": designation_p, "type_p": type_p}
+        if score is not None:
+            result["score"] = score
+        return result
+
+    def _prefix_range(self, prefix: str) -> List[str]:
+        """Mots du vocabulaire commençant par le préfixe"""
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\uffff", start)
+        return self._vocabulary[start:end]
+
+    def _add(self, id_p: int, designation_p: str, type_p: str, keep_sorted: bool = True) -> None:
+        """
+        Indexe un produit
+
+        keep_sorted=False évite l'insertion triée dans le vocabulaire lors du
+        chargement initial, qui trie le vocabulaire une seule fois à la fin.
+        """
+        designation_tokens = set(tokenize(designation_p))
+        type_tokens = set(tokenize(type_p))
+        self._documents[id_p] = (designation_p, type_p, designation_tokens, type_tokens)
+        for token in designation_tokens | type_tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                if keep_sorted:
+                    bisect.insort(self._vocabulary, token)
+            postings.add(id_p)
+
+    def _remove(self, id_p: int) -> None:
+        document = self._documents.pop(id_p, None)
+        if document is None:
+            return
+        for token in document[2] | document[3]:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.discard(id_p)
+            if not postings:
+                del self._postings[token]
+                index = bisect.bisect_left(self._vocabulary, token)
+                if index < len(self._vocabulary) and self._vocabulary[index] == token:
+                    self._vocabulary.pop(index)
+
+    def _on_catalog_change(self, event: str, payload: Dict[str, Any]) -> None:
+        """Tient l'index à jour après les écritures validées de ce processus"""
+        if not self._loaded or event not in ("create", "update", "delete"):
+            return
+        with self._lock:
+            if event == "delete":
+                for id_p in payload["ids"]:
+                    self._remove(id_p)
+            else:
+                produit = payload["produit"]
+                self._remove(produit.id_p)
+                self._add(produit.id_p, produit.designation_p, produit.type_p)
+
+    def _reindex_dirty(self, connection) -> None:
+        """Relit et réindexe les produits modifiés par d'autres workers"""
+        with self._lock:
+            ids, self._dirty = self._dirty, set()
+        produits = Produit.find_by_ids(connection, sorted(ids))
+        with self._lock:
+            for id_p in ids:
+                self._remove(id_p)
+            for produit in produits:
+                self._add(produit.id_p, produit.designation_p, produit.type_p)
+
+    def _on_remote_change(self, event: str, ids: Optional[List[int]], type_p: Optional[str]) -> None:
+        """
+        Tient l'index à jour après les écritures d'un autre worker
+
+        Les mouvements de stock et les mises à jour groupées ne modifient ni la
+        désignation ni le type : ils sont ignorés.
+        """
+        if not self._loaded:
+            return
+        if ids is None and type_p is None:
+            # Événements manqués : reconstruction à la prochaine recherche
+            self.clear()
+            return
+        if event in ("stock", "batch_update"):
+            return
+        with self._lock:
+            if event == "delete":
+                for id_p in ids:
+                    self._remove(id_p)
+            else:
+                self._dirty.update(ids)
+
+
+# Instance globale du service de recherche
+search_service = SearchService()
@@ -9,6 +9,13 @@ from fastapi import Request
 from models.user_model import User
 
 
+class LoginRequired(Exception):
+    """
+    Levée par la dépendance require_user quand aucun utilisateur n'est connecté
+    Convertie en redirection vers /login par le gestionnaire enregistré dans main.py
+    """
+
+
 class SessionService:
     """Service pour la gestion des sessions utilisateur"""
     
@@ -40,6 +47,28 @@ class SessionService:
         """
         return request.session.get("user")
     
+    @staticmethod
+    def require_user(request: Request) -> Dict[str, Any]:
+        """
+        Dependency FastAPI pour les routes réservées aux utilisateurs connectés
+
+        À déclarer avant les dépendances d'accès aux données (get_db) : une requête
+        anonyme est rejetée avant qu'une ressource de base de données soit utilisée.
+
+        Args:
+            request: Requête FastAPI
+
+        Returns:
+            Dictionnaire avec les données utilisateur
+
+        Raises:
+            LoginRequired: si aucun utilisateur n'est connecté
+        """
+        user = request.session.get("user")
+        if not user:
+            raise LoginRequired()
+        return user
+    
     @staticmethod
     def clear_session(request: Request) -> None:
         """
@@ -0,0 +1,204 @@
+"""
+Service de regroupement des lectures identiques (single-flight)
+Les requêtes concurrentes portant sur la même clé partagent une seule requête
+SQL en cours et son résultat, depuis le threadpool comme depuis une route async
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from config.app_config import app_config
+from config.database import DeadlineExceeded, LazyConnection
+from models.produit_model import Produit
+from services.catalog_events_service import catalog_events_service
+
+
+class SingleFlightTimeout(TimeoutError):
+    """
+    Levée quand l'attente du résultat partagé dépasse le délai de la clé
+    Convertie en réponse 503 par le gestionnaire enregistré dans main.py
+    """
+
+
+class SingleFlightService:
+    """
+    Regroupe les lectures concurrentes identiques
+
+    Les clés sont des tuples dont le premier élément est l'espace de noms
+    ("produit", "produits"), qui détermine le délai d'attente.
+
+    Les lectures d'une requête qui doit voir les écritures de sa session
+    (LazyConnection.reads_primary) ne sont pas regroupées : un appel commencé
+    avant l'écriture, ou sur un réplica en retard, ne doit pas leur être servi.
+    """
+
+    def __init__(self, timeouts: Dict[str, float], default_timeout: float):
+        """
+        Args:
+            timeouts: Délai d'attente (secondes) par espace de noms de clé
+            default_timeout: Délai des espaces de noms absents de timeouts
+        """
+        self.timeouts = timeouts
+        self.default_timeout = default_timeout
+        # Clé -> résultat de la lecture en cours (exécutée par le premier appelant)
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._counters = {"executed": 0, "shared": 0, "errors": 0, "timeouts": 0, "bypassed": 0, "retried": 0}
+        Produit.add_change_listener(self._on_catalog_change)
+        catalog_events_service.add_listener(self._on_remote_change)
+
+    def timeout_for(self, key: Tuple) -> float:
+        """Délai d'attente d'une clé, selon son espace de noms"""
+        return self.timeouts.get(key[0], self.default_timeout)
+
+    def do(self, key: Tuple, fn: Callable[[], Any], timeout: Optional[float] = None,
+           connection: Any = None) -> Any:
+        """
+        Exécute fn, ou attend le résultat d'un appel identique déjà en cours
+
+        Une exception levée par fn est propagée à tous les appelants de l'appel,
+        sauf DeadlineExceeded : l'échéance dépassée est celle de la requête du
+        premier appelant, les autres relancent la lecture avec leur propre échéance.
+
+        Args:
+            key: Clé identifiant la lecture, par exemple ("produit", 42)
+            fn: Fonction sans argument exécutant la lecture
+            timeout: Délai d'attente (celui de la clé par défaut)
+            connection: Connexion de la requête ; pas de regroupement si ses lectures vont au primaire
+
+        Returns:
+            Résultat de fn
+
+        Raises:
+            SingleFlightTimeout: Si le résultat partagé n'arrive pas dans le délai
+        """
+        if self._bypass(connection):
+            return fn()
+        wait_until = time.monotonic() + (timeout or self.timeout_for(key))
+        while True:
+            call, leader = self._join(key)
+            if leader:
+                self._run(key, call, fn)
+                return call.result()
+            try:
+                return call.result(timeout=max(0.0, wait_until - time.monotonic()))
+            except FutureTimeoutError:
+                raise self._timeout(key) from None
+            except DeadlineExceeded:
+                self._count("retried")
+
+    async def do_async(self, key: Tuple, fn: Callable[[], Any], timeout: Optional[float] = None,
+                       connection: Any = None) -> Any:
+        """
+        Équivalent de do pour une route async : fn (synchrone) est exécutée dans
+        le threadpool et l'attente ne bloque pas la boucle d'événements
+
+        Les appels sont partagés avec ceux faits par do pour la même clé.
+        """
+        import anyio.to_thread
+        if self._bypass(connection):
+            return await anyio.to_thread.run_sync(fn)
+        wait_until = time.monotonic() + (timeout or self.timeout_for(key))
+        while True:
+            call, leader = self._join(key)
+            if leader:
+                await anyio.to_thread.run_sync(self._run, key, call, fn)
+                return call.result()
+            try:
+                # shield : l'annulation d'un appelant n'annule pas le résultat partagé
+                return await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(call)),
+                    max(0.0, wait_until - time.monotonic())
+                )
+            except asyncio.TimeoutError:
+                raise self._timeout(key) from None
+            except DeadlineExceeded:
+                self._count("retried")
+
+    def forget(self, namespace: Optional[str] = None) -> None:
+        """
+        Détache les appels en cours : les appelants suivants relancent une lecture
+
+        Les appelants déjà en attente reçoivent tout de même le résultat en cours.
+
+        Args:
+            namespace: Espace de noms à détacher (tous si None)
+        """
+        with self._lock:
+            for key in [key for key in self._calls if namespace is None or key[0] == namespace]:
+                del self._calls[key]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Compteurs depuis le démarrage du worker
+
+        Returns:
+            {"executed": lectures exécutées, "shared": lectures évitées,
+             "errors": lectures en erreur, "timeouts": attentes expirées,
+             "bypassed": lectures non regroupées (session sur le primaire),
+             "retried": lectures relancées après l'échéance du premier appelant,
+             "in_flight": lectures en cours}
+        """
+        with self._lock:
+            return {**self._counters, "in_flight": len(self._calls)}
+
+    def _bypass(self, connection: Any) -> bool:
+        """True si la lecture doit être exécutée sans regroupement"""
+        if isinstance(connection, LazyConnection) and connection.reads_primary:
+            self._count("bypassed")
+            return True
+        return False
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _join(self, key: Tuple) -> Tuple[Future, bool]:
+        """Retourne l'appel en cours pour la clé (créé si besoin) et True si l'appelant l'exécute"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._counters["shared"] += 1
+                return call, False
+            call = self._calls[key] = Future()
+            self._counters["executed"] += 1
+            return call, True
+
+    def _run(self, key: Tuple, call: Future, fn: Callable[[], Any]) -> None:
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                self._counters["errors"] += 1
+                self._detach(key, call)
+            call.set_exception(e)
+            return
+        with self._lock:
+            self._detach(key, call)
+        call.set_result(result)
+
+    def _detach(self, key: Tuple, call: Future) -> None:
+        # L'appel a pu être remplacé après un forget
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def _timeout(self, key: Tuple) -> SingleFlightTimeout:
+        self._count("timeouts")
+        return SingleFlightTimeout(f"Lecture {key!r} toujours en cours après {self.timeout_for(key)}s")
+
+    def _on_catalog_change(self, event: str, payload: Dict[str, Any]) -> None:
+        """Une lecture commencée avant une écriture ne doit pas être servie après elle"""
+        self.forget()
+
+    def _on_remote_change(self, event: str, ids: Optional[List[int]], type_p: Optional[str]) -> None:
+        """Idem pour les écritures des autres workers"""
+        self.forget()
+
+
+# Instance globale du regroupement des lectures
+single_flight_service = SingleFlightService(
+    timeouts=app_config.SINGLE_FLIGHT_TIMEOUTS,
+    default_timeout=app_config.SINGLE_FLIGHT_DEFAULT_TIMEOUT
+)
@@ -0,0 +1,129 @@
+"""
+Service de maintenance de l'historique des stocks
+Prend périodiquement un instantané des stocks modifiés puis compacte les
+mouvements anciens couverts par un instantané ; un seul worker à la fois
+(verrou nommé en base), les autres passent leur tour
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config.app_config import app_config
+from config.database import close_connection, open_connection
+from models.stock_model import StockSnapshot
+
+
+logger = logging.getLogger(__name__)
+
+
+class StockLedgerService:
+    """Instantanés et compactage de l'historique des stocks, en tâche de fond"""
+
+    def __init__(self, interval: float, retention_days: int, batch_size: int, safety_margin: float):
+        """
+        Args:
+            interval: Intervalle (secondes) entre deux maintenances
+            retention_days: Ancienneté (jours) au-delà de laquelle les mouvements sont compactés
+            batch_size: Mouvements parcourus ou supprimés par transaction
+            safety_margin: Ancienneté minimale (secondes) des mouvements pris par un instantané
+        """
+        self.interval = interval
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.safety_margin = safety_margin
+        self._lock = threading.Lock()
+        self._counters = {"runs": 0, "skipped": 0, "errors": 0, "snapshots": 0, "compacted": 0}
+        self._last_run: Optional[float] = None
+        self._last_duration = 0.0
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> bool:
+        """
+        Prend un instantané puis compacte les mouvements (si aucun autre worker ne le fait)
+
+        Returns:
+            True si la maintenance a été faite ou laissée à un autre worker, False en cas d'erreur
+        """
+        started = time.perf_counter()
+        connection = None
+        locked = False
+        try:
+            connection = open_connection()
+            locked = StockSnapshot.acquire_lock(connection)
+            if not locked:
+                self._count("skipped")
+                return True
+            snapshots = StockSnapshot.take(connection, self.batch_size, self.safety_margin)
+            compacted = StockSnapshot.compact(connection, self.retention_days, self.batch_size) \
+                if snapshots is not None else None
+        except Exception:
+            logger.exception("Erreur lors de la maintenance de l'historique des stocks")
+            snapshots = compacted = None
+        finally:
+            if locked and connection.is_connected():
+                StockSnapshot.release_lock(connection)
+            close_connection(connection)
+
+        with self._lock:
+            self._last_run = time.time()
+            self._last_duration = time.perf_counter() - started
+            if snapshots is None or compacted is None:
+                self._counters["errors"] += 1
+                return False
+            self._counters["runs"] += 1
+            self._counters["snapshots"] += snapshots
+            self._counters["compacted"] += compacted
+        if snapshots or compacted:
+            logger.info("Historique des stocks : %d instantanés, %d mouvements compactés", snapshots, compacted)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Compteurs depuis le démarrage du worker
+
+        Returns:
+            Maintenances faites, laissées à un autre worker ou en erreur, instantanés
+            écrits, mouvements compactés, date et durée (ms) de la dernière maintenance
+        """
+        with self._lock:
+            return {
+                "interval": self.interval,
+                "retention_days": self.retention_days,
+                **self._counters,
+                "last_run": self._last_run,
+                "last_duration_ms": round(self._last_duration * 1000, 2)
+            }
+
+    def start(self) -> None:
+        """Démarre le thread de maintenance périodique (à appeler dans chaque worker)"""
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="stock-ledger", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Arrête le thread (une maintenance en cours se termine)"""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            self.run_once()
+
+
+# Instance globale de la maintenance de l'historique des stocks
+stock_ledger_service = StockLedgerService(
+    interval=app_config.STOCK_SNAPSHOT_INTERVAL,
+    retention_days=app_config.STOCK_MOVEMENT_RETENTION_DAYS,
+    batch_size=app_config.STOCK_LEDGER_BATCH_SIZE,
+    safety_margin=app_config.STOCK_SNAPSHOT_SAFETY_MARGIN
+)
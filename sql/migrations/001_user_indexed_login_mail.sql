@@ -0,0 +1,19 @@
+-- =====================================================
+-- 001 : index uniques sur user_login et user_mail
+-- =====================================================
+-- Les colonnes TEXT ne peuvent pas être indexées entièrement : elles passent en
+-- VARCHAR avec une collation insensible à la casse, si bien que les index uniques
+-- empêchent aussi les doublons « Bob » / « bob ».
+-- Les emails sont stockés en minuscules (normalisés aussi par le modèle User).
+-- La migration échoue sur les index uniques si des doublons existent déjà :
+-- ils doivent être fusionnés à la main avant de la relancer.
+
+UPDATE `user`
+  SET `user_login` = TRIM(`user_login`),
+      `user_mail` = LOWER(TRIM(`user_mail`));
+
+ALTER TABLE `user`
+  MODIFY `user_login` varchar(50) COLLATE utf8mb4_general_ci NOT NULL,
+  MODIFY `user_mail` varchar(255) COLLATE utf8mb4_general_ci NOT NULL,
+  ADD UNIQUE KEY `uniq_user_login` (`user_login`),
+  ADD UNIQUE KEY `uniq_user_mail` (`user_mail`);
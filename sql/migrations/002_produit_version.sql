@@ -0,0 +1,8 @@
+-- =====================================================
+-- 002 : numéro de version des produits (verrouillage optimiste)
+-- =====================================================
+-- Incrémenté à chaque modification d'un produit ; une modification n'est
+-- appliquée que si la version lue par l'éditeur est toujours la version courante.
+
+ALTER TABLE `produit`
+  ADD `version` int(11) NOT NULL DEFAULT 0;
@@ -0,0 +1,78 @@
+-- =====================================================
+-- 003 : synthèse du stock par type de produit
+-- =====================================================
+-- Nombre de produits, valeur du stock (prix_ht * stock_p), produits en stock faible
+-- (1 à 10 unités, comme l'affichage de la liste) et en rupture, par type_p.
+-- La table est tenue à jour par des triggers, dans la même transaction que chaque
+-- écriture sur `produit` (Produit.save, suppressions, mouvements de stock,
+-- opérations groupées), quel que soit le worker qui écrit.
+-- Reconstruction complète en cas de dérive : python scripts/rebuild_stats.py
+
+CREATE TABLE `produit_type_summary` (
+  `type_p` varchar(100) NOT NULL,
+  `nb_produits` int(11) NOT NULL DEFAULT 0,
+  `valeur_stock` decimal(16,2) NOT NULL DEFAULT 0,
+  `nb_stock_faible` int(11) NOT NULL DEFAULT 0,
+  `nb_rupture` int(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`type_p`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+DELIMITER $$
+
+CREATE TRIGGER `produit_summary_insert` AFTER INSERT ON `produit`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `produit_type_summary` (type_p, nb_produits, valeur_stock, nb_stock_faible, nb_rupture)
+    VALUES (NEW.type_p, 1, NEW.prix_ht * COALESCE(NEW.stock_p, 0),
+            COALESCE(NEW.stock_p, 0) BETWEEN 1 AND 10, COALESCE(NEW.stock_p, 0) <= 0)
+  ON DUPLICATE KEY UPDATE
+    nb_produits = nb_produits + 1,
+    valeur_stock = valeur_stock + NEW.prix_ht * COALESCE(NEW.stock_p, 0),
+    nb_stock_faible = nb_stock_faible + (COALESCE(NEW.stock_p, 0) BETWEEN 1 AND 10),
+    nb_rupture = nb_rupture + (COALESCE(NEW.stock_p, 0) <= 0);
+END$$
+
+CREATE TRIGGER `produit_summary_delete` AFTER DELETE ON `produit`
+FOR EACH ROW
+BEGIN
+  UPDATE `produit_type_summary`
+    SET nb_produits = nb_produits - 1,
+        valeur_stock = valeur_stock - OLD.prix_ht * COALESCE(OLD.stock_p, 0),
+        nb_stock_faible = nb_stock_faible - (COALESCE(OLD.stock_p, 0) BETWEEN 1 AND 10),
+        nb_rupture = nb_rupture - (COALESCE(OLD.stock_p, 0) <= 0)
+    WHERE type_p = OLD.type_p;
+END$$
+
+CREATE TRIGGER `produit_summary_update` AFTER UPDATE ON `produit`
+FOR EACH ROW
+BEGIN
+  UPDATE `produit_type_summary`
+    SET nb_produits = nb_produits - 1,
+        valeur_stock = valeur_stock - OLD.prix_ht * COALESCE(OLD.stock_p, 0),
+        nb_stock_faible = nb_stock_faible - (COALESCE(OLD.stock_p, 0) BETWEEN 1 AND 10),
+        nb_rupture = nb_rupture - (COALESCE(OLD.stock_p, 0) <= 0)
+    WHERE type_p = OLD.type_p;
+  INSERT INTO `produit_type_summary` (type_p, nb_produits, valeur_stock, nb_stock_faible, nb_rupture)
+    VALUES (NEW.type_p, 1, NEW.prix_ht * COALESCE(NEW.stock_p, 0),
+            COALESCE(NEW.stock_p, 0) BETWEEN 1 AND 10, COALESCE(NEW.stock_p, 0) <= 0)
+  ON DUPLICATE KEY UPDATE
+    nb_produits = nb_produits + 1,
+    valeur_stock = valeur_stock + NEW.prix_ht * COALESCE(NEW.stock_p, 0),
+    nb_stock_faible = nb_stock_faible + (COALESCE(NEW.stock_p, 0) BETWEEN 1 AND 10),
+    nb_rupture = nb_rupture + (COALESCE(NEW.stock_p, 0) <= 0);
+END$$
+
+DELIMITER ;
+
+-- Remplissage initial après la création des triggers : les écritures concurrentes
+-- attendent la fin de l'INSERT ... SELECT puis sont répercutées par les triggers
+DELETE FROM `produit_type_summary`;
+
+INSERT INTO `produit_type_summary` (type_p, nb_produits, valeur_stock, nb_stock_faible, nb_rupture)
+  SELECT type_p,
+         COUNT(*),
+         COALESCE(SUM(prix_ht * COALESCE(stock_p, 0)), 0),
+         SUM(COALESCE(stock_p, 0) BETWEEN 1 AND 10),
+         SUM(COALESCE(stock_p, 0) <= 0)
+  FROM `produit`
+  GROUP BY type_p;
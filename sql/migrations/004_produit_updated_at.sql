@@ -0,0 +1,10 @@
+-- =====================================================
+-- 004 : date de dernière modification des produits
+-- =====================================================
+-- timeS_in n'est renseigné qu'à l'insertion : updated_at sert de marqueur pour
+-- relire seulement les produits créés ou modifiés depuis le dernier
+-- rafraîchissement (instantané en colonnes, services/catalog_snapshot_service.py).
+
+ALTER TABLE `produit`
+  ADD `updated_at` timestamp NOT NULL DEFAULT current_timestamp() ON UPDATE current_timestamp(),
+  ADD KEY `idx_produit_updated_at` (`updated_at`);
@@ -0,0 +1,105 @@
+-- =====================================================
+-- 005 : types de produits normalisés
+-- =====================================================
+-- Le libellé du type (varchar(100) répété sur chaque produit) est remplacé par
+-- une clé entière `id_type` vers la table `produit_type` : les filtres et
+-- regroupements par type comparent des entiers indexés. L'application garde
+-- les types en mémoire (services/produit_type_service.py) et lit le libellé
+-- par jointure. La synthèse par type (003) est désormais indexée par id_type.
+
+CREATE TABLE `produit_type` (
+  `id_type` smallint(5) UNSIGNED NOT NULL AUTO_INCREMENT,
+  `libelle` varchar(100) NOT NULL,
+  PRIMARY KEY (`id_type`),
+  UNIQUE KEY `uk_produit_type_libelle` (`libelle`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+INSERT INTO `produit_type` (libelle)
+  SELECT DISTINCT type_p FROM `produit` ORDER BY type_p;
+
+-- Les triggers de la synthèse lisent type_p : retirés avant la conversion
+DROP TRIGGER IF EXISTS `produit_summary_insert`;
+DROP TRIGGER IF EXISTS `produit_summary_delete`;
+DROP TRIGGER IF EXISTS `produit_summary_update`;
+
+ALTER TABLE `produit`
+  ADD `id_type` smallint(5) UNSIGNED NULL AFTER `id_p`;
+
+-- updated_at inchangé : la conversion n'est pas une modification des produits
+UPDATE `produit` p
+  JOIN `produit_type` t ON t.libelle = p.type_p
+  SET p.id_type = t.id_type, p.updated_at = p.updated_at;
+
+ALTER TABLE `produit`
+  MODIFY `id_type` smallint(5) UNSIGNED NOT NULL,
+  ADD KEY `idx_produit_type` (`id_type`),
+  ADD CONSTRAINT `fk_produit_type` FOREIGN KEY (`id_type`) REFERENCES `produit_type` (`id_type`),
+  DROP COLUMN `type_p`;
+
+DROP TABLE `produit_type_summary`;
+
+CREATE TABLE `produit_type_summary` (
+  `id_type` smallint(5) UNSIGNED NOT NULL,
+  `nb_produits` int(11) NOT NULL DEFAULT 0,
+  `valeur_stock` decimal(16,2) NOT NULL DEFAULT 0,
+  `nb_stock_faible` int(11) NOT NULL DEFAULT 0,
+  `nb_rupture` int(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`id_type`),
+  CONSTRAINT `fk_produit_type_summary_type` FOREIGN KEY (`id_type`) REFERENCES `produit_type` (`id_type`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+DELIMITER $$
+
+CREATE TRIGGER `produit_summary_insert` AFTER INSERT ON `produit`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `produit_type_summary` (id_type, nb_produits, valeur_stock, nb_stock_faible, nb_rupture)
+    VALUES (NEW.id_type, 1, NEW.prix_ht * COALESCE(NEW.stock_p, 0),
+            COALESCE(NEW.stock_p, 0) BETWEEN 1 AND 10, COALESCE(NEW.stock_p, 0) <= 0)
+  ON DUPLICATE KEY UPDATE
+    nb_produits = nb_produits + 1,
+    valeur_stock = valeur_stock + NEW.prix_ht * COALESCE(NEW.stock_p, 0),
+    nb_stock_faible = nb_stock_faible + (COALESCE(NEW.stock_p, 0) BETWEEN 1 AND 10),
+    nb_rupture = nb_rupture + (COALESCE(NEW.stock_p, 0) <= 0);
+END$$
+
+CREATE TRIGGER `produit_summary_delete` AFTER DELETE ON `produit`
+FOR EACH ROW
+BEGIN
+  UPDATE `produit_type_summary`
+    SET nb_produits = nb_produits - 1,
+        valeur_stock = valeur_stock - OLD.prix_ht * COALESCE(OLD.stock_p, 0),
+        nb_stock_faible = nb_stock_faible - (COALESCE(OLD.stock_p, 0) BETWEEN 1 AND 10),
+        nb_rupture = nb_rupture - (COALESCE(OLD.stock_p, 0) <= 0)
+    WHERE id_type = OLD.id_type;
+END$$
+
+CREATE TRIGGER `produit_summary_update` AFTER UPDATE ON `produit`
+FOR EACH ROW
+BEGIN
+  UPDATE `produit_type_summary`
+    SET nb_produits = nb_produits - 1,
+        valeur_stock = valeur_stock - OLD.prix_ht * COALESCE(OLD.stock_p, 0),
+        nb_stock_faible = nb_stock_faible - (COALESCE(OLD.stock_p, 0) BETWEEN 1 AND 10),
+        nb_rupture = nb_rupture - (COALESCE(OLD.stock_p, 0) <= 0)
+    WHERE id_type = OLD.id_type;
+  INSERT INTO `produit_type_summary` (id_type, nb_produits, valeur_stock, nb_stock_faible, nb_rupture)
+    VALUES (NEW.id_type, 1, NEW.prix_ht * COALESCE(NEW.stock_p, 0),
+            COALESCE(NEW.stock_p, 0) BETWEEN 1 AND 10, COALESCE(NEW.stock_p, 0) <= 0)
+  ON DUPLICATE KEY UPDATE
+    nb_produits = nb_produits + 1,
+    valeur_stock = valeur_stock + NEW.prix_ht * COALESCE(NEW.stock_p, 0),
+    nb_stock_faible = nb_stock_faible + (COALESCE(NEW.stock_p, 0) BETWEEN 1 AND 10),
+    nb_rupture = nb_rupture + (COALESCE(NEW.stock_p, 0) <= 0);
+END$$
+
+DELIMITER ;
+
+INSERT INTO `produit_type_summary` (id_type, nb_produits, valeur_stock, nb_stock_faible, nb_rupture)
+  SELECT id_type,
+         COUNT(*),
+         COALESCE(SUM(prix_ht * COALESCE(stock_p, 0)), 0),
+         SUM(COALESCE(stock_p, 0) BETWEEN 1 AND 10),
+         SUM(COALESCE(stock_p, 0) <= 0)
+  FROM `produit`
+  GROUP BY id_type;
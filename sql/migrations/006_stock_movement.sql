@@ -0,0 +1,71 @@
+-- =====================================================
+-- 006 : historique des stocks (mouvements et instantanés)
+-- =====================================================
+-- Chaque changement de stock_p ajoute une ligne à `stock_movement`, par des
+-- triggers, dans la transaction de l'écriture : quantité, stock obtenu, auteur
+-- et date. L'auteur est `produit.updated_by`, renseigné par l'application à
+-- chaque écriture (@stock_user_id pour les suppressions).
+-- `stock_snapshot` garde le stock de chaque produit après un mouvement donné :
+-- le stock à une date se lit sur l'instantané le plus proche plus les quelques
+-- mouvements suivants. Les instantanés sont pris et les mouvements anciens
+-- compactés en tâche de fond (services/stock_ledger_service.py).
+-- Appliquer sans écriture concurrente : l'instantané initial et les triggers
+-- doivent voir le même état du catalogue.
+
+ALTER TABLE `produit`
+  ADD `updated_by` int(11) NULL;
+
+CREATE TABLE `stock_movement` (
+  `id_movement` bigint(20) UNSIGNED NOT NULL AUTO_INCREMENT,
+  `id_p` int(11) NOT NULL,
+  `delta` int(11) NOT NULL,
+  `stock_after` int(11) NOT NULL,
+  `operation` enum('creation','modification','suppression') NOT NULL,
+  `user_id` int(11) NULL,
+  `created_at` datetime(6) NOT NULL DEFAULT current_timestamp(6),
+  PRIMARY KEY (`id_movement`),
+  KEY `idx_stock_movement_produit` (`id_p`, `created_at`),
+  KEY `idx_stock_movement_date` (`created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- Stock du produit après le mouvement last_movement_id (0 : instantané initial)
+CREATE TABLE `stock_snapshot` (
+  `id_p` int(11) NOT NULL,
+  `last_movement_id` bigint(20) UNSIGNED NOT NULL,
+  `snapshot_at` datetime(6) NOT NULL,
+  `stock_p` int(11) NOT NULL,
+  PRIMARY KEY (`id_p`, `last_movement_id`),
+  KEY `idx_stock_snapshot_date` (`id_p`, `snapshot_at`),
+  KEY `idx_stock_snapshot_movement` (`last_movement_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+INSERT INTO `stock_snapshot` (id_p, last_movement_id, snapshot_at, stock_p)
+  SELECT id_p, 0, current_timestamp(6), COALESCE(stock_p, 0) FROM `produit`;
+
+DELIMITER $$
+
+CREATE TRIGGER `produit_stock_insert` AFTER INSERT ON `produit`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `stock_movement` (id_p, delta, stock_after, operation, user_id)
+    VALUES (NEW.id_p, COALESCE(NEW.stock_p, 0), COALESCE(NEW.stock_p, 0), 'creation', NEW.updated_by);
+END$$
+
+CREATE TRIGGER `produit_stock_update` AFTER UPDATE ON `produit`
+FOR EACH ROW
+BEGIN
+  IF COALESCE(NEW.stock_p, 0) <> COALESCE(OLD.stock_p, 0) THEN
+    INSERT INTO `stock_movement` (id_p, delta, stock_after, operation, user_id)
+      VALUES (NEW.id_p, COALESCE(NEW.stock_p, 0) - COALESCE(OLD.stock_p, 0), COALESCE(NEW.stock_p, 0),
+              'modification', NEW.updated_by);
+  END IF;
+END$$
+
+CREATE TRIGGER `produit_stock_delete` AFTER DELETE ON `produit`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `stock_movement` (id_p, delta, stock_after, operation, user_id)
+    VALUES (OLD.id_p, -COALESCE(OLD.stock_p, 0), 0, 'suppression', @stock_user_id);
+END$$
+
+DELIMITER ;
@@ -0,0 +1,92 @@
+-- =====================================================
+-- 007 : synthèse par type répartie en tranches
+-- =====================================================
+-- La synthèse (003, 005) avait une ligne par type : tous les écrivains d'un
+-- même type se succédaient sur cette ligne, et deux écritures multi-lignes
+-- pouvaient verrouiller les lignes de deux types dans des ordres opposés
+-- (ordre des produits, pas des types) et s'interbloquer.
+-- Chaque type a désormais 16 tranches (`slot`) : les triggers écrivent dans la
+-- tranche de la connexion (CONNECTION_ID() MOD 16), les lectures additionnent
+-- les tranches. L'application verrouille ses tranches dans l'ordre des id_type
+-- avant chaque écriture (Produit._lock_summaries) ; les triggers ne touchent
+-- ensuite que des lignes déjà verrouillées. Le nombre de tranches est repris
+-- par SUMMARY_SLOTS dans models/stats_model.py.
+
+DROP TRIGGER IF EXISTS `produit_summary_insert`;
+DROP TRIGGER IF EXISTS `produit_summary_delete`;
+DROP TRIGGER IF EXISTS `produit_summary_update`;
+
+DROP TABLE `produit_type_summary`;
+
+CREATE TABLE `produit_type_summary` (
+  `id_type` smallint(5) UNSIGNED NOT NULL,
+  `slot` tinyint(3) UNSIGNED NOT NULL,
+  `nb_produits` int(11) NOT NULL DEFAULT 0,
+  `valeur_stock` decimal(16,2) NOT NULL DEFAULT 0,
+  `nb_stock_faible` int(11) NOT NULL DEFAULT 0,
+  `nb_rupture` int(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`id_type`, `slot`),
+  CONSTRAINT `fk_produit_type_summary_type` FOREIGN KEY (`id_type`) REFERENCES `produit_type` (`id_type`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+DELIMITER $$
+
+CREATE TRIGGER `produit_summary_insert` AFTER INSERT ON `produit`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `produit_type_summary` (id_type, slot, nb_produits, valeur_stock, nb_stock_faible, nb_rupture)
+    VALUES (NEW.id_type, CONNECTION_ID() MOD 16, 1, NEW.prix_ht * COALESCE(NEW.stock_p, 0),
+            COALESCE(NEW.stock_p, 0) BETWEEN 1 AND 10, COALESCE(NEW.stock_p, 0) <= 0)
+  ON DUPLICATE KEY UPDATE
+    nb_produits = nb_produits + 1,
+    valeur_stock = valeur_stock + NEW.prix_ht * COALESCE(NEW.stock_p, 0),
+    nb_stock_faible = nb_stock_faible + (COALESCE(NEW.stock_p, 0) BETWEEN 1 AND 10),
+    nb_rupture = nb_rupture + (COALESCE(NEW.stock_p, 0) <= 0);
+END$$
+
+-- Une tranche peut devenir négative (produit créé par une autre connexion) : seule la somme compte
+CREATE TRIGGER `produit_summary_delete` AFTER DELETE ON `produit`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `produit_type_summary` (id_type, slot, nb_produits, valeur_stock, nb_stock_faible, nb_rupture)
+    VALUES (OLD.id_type, CONNECTION_ID() MOD 16, -1, -OLD.prix_ht * COALESCE(OLD.stock_p, 0),
+            -(COALESCE(OLD.stock_p, 0) BETWEEN 1 AND 10), -(COALESCE(OLD.stock_p, 0) <= 0))
+  ON DUPLICATE KEY UPDATE
+    nb_produits = nb_produits - 1,
+    valeur_stock = valeur_stock - OLD.prix_ht * COALESCE(OLD.stock_p, 0),
+    nb_stock_faible = nb_stock_faible - (COALESCE(OLD.stock_p, 0) BETWEEN 1 AND 10),
+    nb_rupture = nb_rupture - (COALESCE(OLD.stock_p, 0) <= 0);
+END$$
+
+CREATE TRIGGER `produit_summary_update` AFTER UPDATE ON `produit`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `produit_type_summary` (id_type, slot, nb_produits, valeur_stock, nb_stock_faible, nb_rupture)
+    VALUES (OLD.id_type, CONNECTION_ID() MOD 16, -1, -OLD.prix_ht * COALESCE(OLD.stock_p, 0),
+            -(COALESCE(OLD.stock_p, 0) BETWEEN 1 AND 10), -(COALESCE(OLD.stock_p, 0) <= 0))
+  ON DUPLICATE KEY UPDATE
+    nb_produits = nb_produits - 1,
+    valeur_stock = valeur_stock - OLD.prix_ht * COALESCE(OLD.stock_p, 0),
+    nb_stock_faible = nb_stock_faible - (COALESCE(OLD.stock_p, 0) BETWEEN 1 AND 10),
+    nb_rupture = nb_rupture - (COALESCE(OLD.stock_p, 0) <= 0);
+  INSERT INTO `produit_type_summary` (id_type, slot, nb_produits, valeur_stock, nb_stock_faible, nb_rupture)
+    VALUES (NEW.id_type, CONNECTION_ID() MOD 16, 1, NEW.prix_ht * COALESCE(NEW.stock_p, 0),
+            COALESCE(NEW.stock_p, 0) BETWEEN 1 AND 10, COALESCE(NEW.stock_p, 0) <= 0)
+  ON DUPLICATE KEY UPDATE
+    nb_produits = nb_produits + 1,
+    valeur_stock = valeur_stock + NEW.prix_ht * COALESCE(NEW.stock_p, 0),
+    nb_stock_faible = nb_stock_faible + (COALESCE(NEW.stock_p, 0) BETWEEN 1 AND 10),
+    nb_rupture = nb_rupture + (COALESCE(NEW.stock_p, 0) <= 0);
+END$$
+
+DELIMITER ;
+
+INSERT INTO `produit_type_summary` (id_type, slot, nb_produits, valeur_stock, nb_stock_faible, nb_rupture)
+  SELECT id_type,
+         0,
+         COUNT(*),
+         COALESCE(SUM(prix_ht * COALESCE(stock_p, 0)), 0),
+         SUM(COALESCE(stock_p, 0) BETWEEN 1 AND 10),
+         SUM(COALESCE(stock_p, 0) <= 0)
+  FROM `produit`
+  GROUP BY id_type;
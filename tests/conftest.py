@@ -0,0 +1,8 @@
+"""
+Configuration commune des tests
+Les tests s'exécutent depuis la racine du projet : python -m pytest
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,81 @@
+"""
+Tests de la détection des trous de versions (CatalogEventsService)
+Les versions locales et distantes sont injectées sans sockets
+"""
+import pytest
+
+from services.catalog_events_service import CatalogEventsService
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, event, ids, type_p):
+        self.calls.append((event, ids, type_p))
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = CatalogEventsService(directory=str(tmp_path))
+    # Simule un worker démarré : versions tirées du compteur partagé, pas de diffusion
+    service._socket = object()
+    return service
+
+
+def local_write(service, version, ids=(1,)):
+    service._next_version = lambda: version
+    service._on_local_change("update", {"ids": list(ids)})
+
+
+def remote(version, ids=(2,)):
+    return {"origin": 0, "version": version, "event": "update", "ids": list(ids), "type_p": None, "data": None}
+
+
+def test_contiguous_versions_keep_ids(service):
+    recorder = Recorder()
+    service.add_listener(recorder)
+    service._dispatch(remote(1))
+    service._dispatch(remote(2, ids=(3,)))
+    assert recorder.calls == [("update", [2], None), ("update", [3], None)]
+    assert service.stats()["gaps"] == 0
+    assert service.version == 2
+
+
+def test_local_version_does_not_close_gap(service):
+    recorder = Recorder()
+    service.add_listener(recorder)
+    local_write(service, 2)
+    assert service.version == 0
+    assert service.latest_version == 2
+    # La version 1 (autre worker) est perdue : la suivante révèle le trou
+    service._dispatch(remote(3))
+    assert recorder.calls == [("update", None, None)]
+    assert service.stats()["gaps"] == 1
+    assert service.version == 3
+
+
+def test_late_remote_version_fills_gap_before_local_one(service):
+    recorder = Recorder()
+    service.add_listener(recorder)
+    local_write(service, 2)
+    service._dispatch(remote(1))
+    assert recorder.calls == [("update", [2], None)]
+    assert service.stats()["gaps"] == 0
+    assert service.version == 2
+
+
+def test_message_listeners_receive_full_invalidation_on_gap(service):
+    messages = []
+    service.add_message_listener(messages.append)
+    service._dispatch(remote(1))
+    service._dispatch(remote(3))
+    assert messages[0]["ids"] == [2]
+    assert messages[1]["version"] == 3 and messages[1]["ids"] is None
+
+
+def test_duplicate_version_is_not_a_gap(service):
+    service._dispatch(remote(1))
+    service._dispatch(remote(1))
+    assert service.stats()["gaps"] == 0
+    assert service.version == 1
@@ -0,0 +1,67 @@
+"""
+Tests de la reprise du flux du catalogue (CatalogFeedService.replay)
+"""
+import pytest
+
+from services import catalog_feed_service as feed_module
+from services.catalog_feed_service import CatalogFeedService
+
+
+class Versions:
+    """Remplace catalog_events_service : seule la dernière version vue compte"""
+    latest_version = 0
+
+    def add_message_listener(self, listener):
+        pass
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    versions = Versions()
+    monkeypatch.setattr(feed_module, "catalog_events_service", versions)
+    service = CatalogFeedService(buffer_size=5, queue_size=10, heartbeat=15, max_subscribers=10)
+
+    def publish(*numbers):
+        for version in numbers:
+            service.publish({"version": version, "event": "update", "ids": [version], "type_p": None, "data": None})
+            versions.latest_version = max(versions.latest_version, version)
+
+    return service, publish
+
+
+def versions_of(events):
+    return [message["version"] for message in events]
+
+
+def test_up_to_date_client_gets_nothing(feed):
+    service, publish = feed
+    publish(1, 2)
+    assert service.replay(2) == []
+
+
+def test_events_arrived_out_of_order_are_replayed_in_version_order(feed):
+    service, publish = feed
+    publish(1, 3, 2, 4)
+    assert versions_of(service.replay(1)) == [2, 3, 4]
+
+
+def test_missing_version_prevents_replay(feed):
+    service, publish = feed
+    # La version 2 n'a jamais été reçue (datagramme perdu) ; la 3 est arrivée avant la 1
+    publish(3, 1, 4)
+    assert service.replay(0) is None
+    assert service.replay(1) is None
+    assert versions_of(service.replay(2)) == [3, 4]
+
+
+def test_events_out_of_buffer_prevent_replay(feed):
+    service, publish = feed
+    publish(1, 2, 3, 4, 5, 6, 7)
+    assert service.replay(1) is None
+    assert versions_of(service.replay(2)) == [3, 4, 5, 6, 7]
+
+
+def test_client_ahead_of_worker_must_reset(feed):
+    service, publish = feed
+    publish(1)
+    assert service.replay(5) is None
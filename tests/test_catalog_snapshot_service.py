@@ -0,0 +1,88 @@
+"""
+Tests du rafraîchissement de l'instantané du catalogue après une écriture
+Les lectures de Produit sont remplacées par des fonctions qui comptent leurs appels
+"""
+import threading
+import time
+from datetime import date, datetime
+
+from models.produit_model import Produit
+from services.catalog_snapshot_service import CatalogSnapshotService
+
+ROWS = [(1, "Livre", 10.0, 3, date(2024, 1, 1), datetime(2024, 1, 1))]
+
+
+def make_service(monkeypatch, max_staleness=60.0):
+    calls = {"find_columns": 0, "count": 0}
+
+    def find_columns(connection, since=None):
+        calls["find_columns"] += 1
+        return ROWS if since is None else []
+
+    def count(connection):
+        calls["count"] += 1
+        return len(ROWS)
+
+    monkeypatch.setattr(Produit, "find_columns", staticmethod(find_columns))
+    monkeypatch.setattr(Produit, "count", staticmethod(count))
+    service = CatalogSnapshotService(refresh_interval=3600, watermark_overlap=60, max_staleness=max_staleness)
+    return service, calls
+
+
+def with_background(service):
+    """Simule une tâche de fond vivante sans la démarrer"""
+    stop = threading.Event()
+    service._thread = threading.Thread(target=stop.wait, daemon=True)
+    service._thread.start()
+    return stop
+
+
+def test_first_read_loads_synchronously(monkeypatch):
+    service, calls = make_service(monkeypatch)
+    assert len(service.get(None)) == 1
+    assert calls == {"find_columns": 1, "count": 0}
+
+
+def test_stale_snapshot_is_served_while_background_refreshes(monkeypatch):
+    service, calls = make_service(monkeypatch)
+    snapshot = service.get(None)
+    stop = with_background(service)
+    try:
+        service._on_catalog_change("update", {})
+        assert service._wakeup.is_set()
+        assert service.get(None) is snapshot
+        assert calls["count"] == 0
+    finally:
+        stop.set()
+
+
+def test_read_refreshes_beyond_max_staleness(monkeypatch):
+    service, calls = make_service(monkeypatch, max_staleness=0.05)
+    service.get(None)
+    stop = with_background(service)
+    try:
+        service._on_remote_change("update", [1], None)
+        time.sleep(0.1)
+        service.get(None)
+        assert calls["count"] == 1
+        assert service._stale_since is None
+    finally:
+        stop.set()
+
+
+def test_read_refreshes_without_background_thread(monkeypatch):
+    service, calls = make_service(monkeypatch)
+    service.get(None)
+    service._on_catalog_change("update", {})
+    service.get(None)
+    assert calls["count"] == 1
+
+
+def test_refresh_skipped_when_done_while_waiting(monkeypatch):
+    service, calls = make_service(monkeypatch)
+    service.get(None)
+    service._on_catalog_change("update", {})
+    limit = time.monotonic()
+    assert service.refresh(None)
+    assert service.refresh(None, stale_before=limit)
+    assert calls["count"] == 1
@@ -0,0 +1,109 @@
+"""
+Tests de l'attente d'une connexion du pool (config/database.py)
+Le pool de mysql-connector est remplacé par un pool factice : aucune base n'est nécessaire
+"""
+import threading
+import time
+
+import pytest
+from mysql.connector import errors
+
+from config import database
+from config.database import LazyConnection, ConnectionUnavailable
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+        self.connected = True
+
+    def close(self):
+        self.connected = False
+        self.pool.available += 1
+
+    def is_connected(self):
+        return self.connected
+
+
+class FakePool:
+    """Pool qui échoue immédiatement quand il est vide, comme celui de mysql-connector"""
+
+    def __init__(self, pool_size, **params):
+        self.available = pool_size
+
+    def get_connection(self):
+        if self.available == 0:
+            raise errors.PoolError("Failed getting connection; pool exhausted")
+        self.available -= 1
+        return FakeConnection(self)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(database.pooling, "MySQLConnectionPool", FakePool)
+    monkeypatch.setattr(database.db_config, "pool_size", 1)
+    monkeypatch.setattr(database.db_config, "pool_timeout", 0.2)
+    monkeypatch.setattr(database, "_pool", None)
+    return database
+
+
+def test_waits_for_a_returned_connection(pool):
+    first = pool.open_connection()
+    threading.Timer(0.05, first.close).start()
+    second = pool.open_connection()
+    assert second.is_connected()
+    second.close()
+
+
+def test_times_out_when_no_connection_is_returned(pool):
+    held = pool.open_connection()
+    started = time.monotonic()
+    with pytest.raises(errors.PoolError):
+        pool.open_connection()
+    assert 0.15 <= time.monotonic() - started < 1
+    held.close()
+
+
+def test_wait_is_bounded_by_the_request_deadline(pool):
+    held = pool.open_connection()
+    token = pool.set_deadline(0.01)
+    try:
+        started = time.monotonic()
+        with pytest.raises(errors.PoolError):
+            pool.open_connection()
+        assert time.monotonic() - started < 0.15
+    finally:
+        pool.reset_deadline(token)
+        held.close()
+
+
+def test_double_close_releases_one_slot(pool):
+    connection = pool.open_connection()
+    connection.close()
+    connection.close()
+    again = pool.open_connection()
+    with pytest.raises(errors.PoolError):
+        pool.open_connection()
+    again.close()
+
+
+def test_lazy_connection_reports_exhaustion_as_unavailable(pool):
+    held = pool.open_connection()
+    with pytest.raises(ConnectionUnavailable):
+        LazyConnection().cursor()
+    held.close()
+
+
+def test_dropped_connection_returns_its_slot(pool):
+    for _ in range(3):
+        db = LazyConnection()
+        db._get_connection()
+        # Connexion perdue pendant la requête (redémarrage MySQL, wait_timeout)
+        db._connection._connection.connected = False
+        assert not db.is_connected()
+        db.close()
+    with pool.get_db_connection() as connection:
+        connection._connection.connected = False
+    again = pool.open_connection()
+    assert again.is_connected()
+    again.close()
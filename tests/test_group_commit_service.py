@@ -0,0 +1,71 @@
+"""
+Tests de l'écriture groupée des ajouts (GroupCommitService) : échec propre à la
+connexion du meneur, que ses suiveurs contournent avec leur propre connexion
+"""
+import threading
+import time
+
+from config.database import DeadlineExceeded
+from models.produit_model import Produit
+from services.group_commit_service import GroupCommitService
+
+
+def test_leader_deadline_does_not_fail_followers(monkeypatch):
+    service = GroupCommitService(enabled=True, window=0.2, max_rows=10)
+    leader_connection, follower_connection = object(), object()
+    saved_on = []
+
+    def insert_many(connection, produits):
+        raise DeadlineExceeded("échéance du meneur dépassée")
+
+    def save(produit, connection):
+        saved_on.append(connection)
+        produit.id_p = 42
+        return True
+
+    monkeypatch.setattr(Produit, "insert_many", staticmethod(insert_many))
+    monkeypatch.setattr(Produit, "save", save)
+
+    leader = {}
+
+    def run_leader():
+        try:
+            service.save(leader_connection, Produit(type_p="Livre", designation_p="meneur"))
+        except BaseException as e:
+            leader["error"] = e
+
+    thread = threading.Thread(target=run_leader)
+    thread.start()
+    time.sleep(0.05)
+    follower = Produit(type_p="Livre", designation_p="suiveur")
+    assert service.save(follower_connection, follower) is True
+    thread.join()
+
+    assert isinstance(leader["error"], DeadlineExceeded)
+    assert follower.id_p == 42
+    assert saved_on == [follower_connection]
+    assert service.stats()["retried"] == 1
+    assert service.stats()["errors"] == 1
+
+
+def test_single_row_error_stays_with_its_caller(monkeypatch):
+    service = GroupCommitService(enabled=True, window=0.2, max_rows=2)
+    monkeypatch.setattr(Produit, "insert_many", staticmethod(lambda connection, produits: False))
+    monkeypatch.setattr(Produit, "save", lambda produit, connection: produit.designation_p != "invalide")
+
+    results = {}
+    threads = [
+        threading.Thread(target=lambda name=name: results.setdefault(
+            name, service.save(object(), Produit(type_p="Livre", designation_p=name))
+        ))
+        for name in ("valide", "invalide")
+    ]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join()
+
+    assert results == {"valide": True, "invalide": False}
+    assert service.stats()["fallbacks"] == 1
+    assert service.stats()["retried"] == 0
@@ -0,0 +1,85 @@
+"""
+Tests des limites de délestage (LoadSheddingService, ConcurrencyLimit)
+"""
+import asyncio
+
+import pytest
+
+from config.app_config import app_config
+from config.database import db_config
+from services.load_shedding_service import ConcurrencyLimit, LoadSheddingService, Overloaded
+
+
+def make_service(global_limit=None):
+    return LoadSheddingService(
+        global_limit=global_limit,
+        route_shares={"login_post": 0.25},
+        queue_factor=2,
+        queue_timeout=0.05,
+        exempt_prefixes=["/static"]
+    )
+
+
+def test_limit_follows_sizing_applied_after_import(monkeypatch):
+    monkeypatch.setattr(app_config, "THREADPOOL_SIZE", 40)
+    monkeypatch.setattr(db_config, "pool_size", 40)
+    service = make_service()
+    assert service.global_limit.limit == 40
+    # Dimensionnement de server.py (apply_sizing) après la création du service
+    monkeypatch.setattr(app_config, "THREADPOOL_SIZE", 12)
+    monkeypatch.setattr(db_config, "pool_size", 12)
+    service.start()
+    assert service.global_limit.limit == 12
+    assert service.global_limit.max_queue == 24
+    assert service.route_limits["login_post"].limit == 3
+
+
+def test_limit_is_bounded_by_db_pool(monkeypatch):
+    monkeypatch.setattr(app_config, "THREADPOOL_SIZE", 40)
+    monkeypatch.setattr(db_config, "pool_size", 10)
+    assert make_service().global_limit.limit == 10
+
+
+def test_configured_limit_wins(monkeypatch):
+    monkeypatch.setattr(app_config, "THREADPOOL_SIZE", 12)
+    monkeypatch.setattr(db_config, "pool_size", 12)
+    service = make_service(global_limit=100)
+    service.start()
+    assert service.global_limit.limit == 100
+    assert service.route_limits["login_post"].limit == 25
+
+
+def test_queue_full_and_timeout_shed_requests():
+    async def scenario():
+        limit = ConcurrencyLimit("test", limit=1, max_queue=1, queue_timeout=0.05)
+        assert await limit.acquire() == 0.0
+        waiting = asyncio.ensure_future(limit.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            await limit.acquire()
+        with pytest.raises(Overloaded):
+            await waiting
+        limit.release()
+        return limit.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["shed_queue_full"] == 1
+    assert stats["shed_timeout"] == 1
+    assert stats["active"] == 0
+
+
+def test_release_hands_slot_to_next_waiter():
+    async def scenario():
+        limit = ConcurrencyLimit("test", limit=1, max_queue=1, queue_timeout=1.0)
+        await limit.acquire()
+        waiting = asyncio.ensure_future(limit.acquire())
+        await asyncio.sleep(0)
+        limit.release()
+        await waiting
+        assert limit.active == 1
+        limit.release()
+        return limit.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["admitted"] == 2
+    assert stats["active"] == 0
@@ -0,0 +1,31 @@
+"""
+Tests de l'accès anonyme aux formulaires de modification des produits : la
+redirection vers /login précède la validation des champs du formulaire
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+@pytest.mark.parametrize("path", [
+    "/produits/add",
+    "/produits/1/edit",
+    "/produits/batch/delete",
+    "/produits/batch/update",
+])
+def test_anonymous_incomplete_form_redirects_to_login(client, path):
+    response = client.post(path, data={"type_p": "Livre"}, follow_redirects=False)
+    assert response.status_code == 303
+    assert response.headers["location"] == "/login"
+
+
+def test_anonymous_invalid_stock_batch_redirects_to_login(client):
+    response = client.post("/produits/stock", json={"movements": "invalide"}, follow_redirects=False)
+    assert response.status_code == 303
+    assert response.headers["location"] == "/login"
@@ -0,0 +1,90 @@
+"""
+Tests de l'ordre de verrouillage de la synthèse par type (Produit._lock_summaries)
+Les instructions sont enregistrées par une connexion factice
+"""
+from models.produit_model import Produit
+from models.stats_model import SUMMARY_SLOTS
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+        self.lastrowid = 1
+        self._rows = []
+
+    def execute(self, statement, params=()):
+        self.connection.statements.append((statement, params))
+        self._rows = self.connection.respond(statement, params)
+        self.rowcount = 1
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, types_by_id):
+        self.types_by_id = types_by_id
+        self.statements = []
+
+    def respond(self, statement, params):
+        if statement.startswith("SELECT DISTINCT id_type"):
+            return [(type_id,) for type_id in sorted({self.types_by_id[id_p] for id_p in params}, reverse=True)]
+        if statement.startswith("SELECT id_type FROM `produit_type`"):
+            return [(7,)]
+        return []
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def lock_statements(connection):
+    return [(statement, params) for statement, params in connection.statements if "produit_type_summary" in statement]
+
+
+def test_adjust_stocks_locks_summary_rows_in_type_order_before_writing():
+    connection = FakeConnection({1: 9, 2: 3, 3: 5})
+    Produit.adjust_stocks(connection, [(1, 1), (2, -1), (3, 2)])
+
+    locks = lock_statements(connection)
+    assert len(locks) == 1
+    statement, params = locks[0]
+    assert params == (3, SUMMARY_SLOTS, 5, SUMMARY_SLOTS, 9, SUMMARY_SLOTS)
+    assert connection.statements.index(locks[0]) < min(
+        index for index, (sql, _) in enumerate(connection.statements) if sql.startswith("UPDATE")
+    )
+
+
+def test_batch_update_by_ids_locks_every_chunk_type_first():
+    connection = FakeConnection({id_p: id_p % 4 for id_p in range(1, 11)})
+    Produit.reset_stocks(connection, 0, ids=list(range(10, 0, -1)), chunk_size=3)
+
+    locks = lock_statements(connection)
+    assert len(locks) == 1
+    assert locks[0][1][::2] == (0, 1, 2, 3)
+    first_update = min(index for index, (sql, _) in enumerate(connection.statements) if sql.startswith("UPDATE"))
+    assert connection.statements.index(locks[0]) < first_update
+
+
+def test_batch_update_by_type_locks_that_type():
+    connection = FakeConnection({})
+    Produit.update_prices(connection, 0, type_p="Jardin")
+    assert lock_statements(connection)[0][1] == (7, SUMMARY_SLOTS)
+
+
+def test_zero_deltas_lock_nothing():
+    connection = FakeConnection({1: 2})
+    Produit.adjust_stocks(connection, [(1, 0)])
+    assert lock_statements(connection) == []
@@ -0,0 +1,137 @@
+"""
+Tests de la répartition des lectures sur les réplicas (config/database.py) :
+écartement sur erreur de connexion ou de lecture, pool épuisé, création du pool
+"""
+import threading
+import time
+
+import pytest
+from mysql.connector import errors
+
+from config import database
+from config.database import LazyConnection, Replica, ReplicaSet
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+
+    def execute(self, statement, params=()):
+        self.connection.statements.append(statement)
+        if self.connection.error is not None:
+            raise self.connection.error
+        self.rows = [(self.connection.name,)]
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, name, error=None):
+        self.name = name
+        self.error = error
+        self.statements = []
+        self.closed = False
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self)
+
+    def is_connected(self):
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    replica_set = ReplicaSet([("r1", 3306), ("r2", 3306)], "round_robin", 60)
+    monkeypatch.setattr(database, "replica_set", replica_set)
+    monkeypatch.setattr(database, "open_connection", lambda: FakeConnection("primaire"))
+    return replica_set
+
+
+def fail_open(error):
+    def open_():
+        raise error
+    return open_
+
+
+def test_pool_exhaustion_skips_replica_without_ejecting(replicas):
+    r1, r2 = replicas.replicas
+    r1.open = fail_open(errors.PoolError("Failed getting connection; pool exhausted"))
+    r2.open = fail_open(errors.PoolError("Failed getting connection; pool exhausted"))
+    assert replicas.acquire() is None
+    assert r1.healthy and r2.healthy
+
+
+def test_connection_error_ejects_replica(replicas):
+    r1, r2 = replicas.replicas
+    r1.open = fail_open(errors.InterfaceError("Can't connect", errno=2003))
+    r2.open = lambda: FakeConnection("r2")
+    for _ in range(2):
+        replica, connection = replicas.acquire()
+        assert replica is r2
+        replicas.release(replica, connection)
+    assert not r1.healthy and r2.healthy
+
+
+def read(db):
+    cursor = database.read_connection(db).cursor()
+    cursor.execute("SELECT name")
+    return cursor.fetchall()
+
+
+def test_replica_query_error_falls_back_to_primary_and_ejects(replicas):
+    r1, r2 = replicas.replicas
+    broken = FakeConnection("r1", errors.DatabaseError("Table 'produit' doesn't exist", errno=1146))
+    r1.open = lambda: broken
+    r2.open = lambda: FakeConnection("r2")
+    replicas._candidates = lambda: [r1, r2]
+    db = LazyConnection()
+    assert read(db) == [("primaire",)]
+    assert not r1.healthy
+    assert broken.closed and r1.active == 0
+    # Lecture suivante de la requête : autre réplica
+    replicas._candidates = lambda: [replica for replica in (r1, r2) if replica.healthy]
+    assert read(db) == [("r2",)]
+    db.close()
+
+
+def test_statement_error_on_primary_too_keeps_replica(replicas, monkeypatch):
+    r1, _ = replicas.replicas
+    error = errors.ProgrammingError("You have an error in your SQL syntax", errno=1064)
+    r1.open = lambda: FakeConnection("r1", error)
+    replicas._candidates = lambda: [r1]
+    monkeypatch.setattr(database, "open_connection", lambda: FakeConnection("primaire", error))
+    db = LazyConnection()
+    with pytest.raises(errors.ProgrammingError):
+        read(db)
+    assert r1.healthy
+    db.close()
+
+
+def test_concurrent_first_reads_create_one_pool(monkeypatch):
+    created = []
+
+    class SlowPool:
+        def __init__(self, **params):
+            created.append(self)
+            time.sleep(0.05)
+
+        def get_connection(self):
+            return FakeConnection("r1")
+
+    monkeypatch.setattr(database.pooling, "MySQLConnectionPool", SlowPool)
+    monkeypatch.setattr(database.db_config, "pool_size", 2)
+    replica = Replica("r1", 3306)
+    threads = [threading.Thread(target=replica.open) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
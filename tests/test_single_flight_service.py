@@ -0,0 +1,130 @@
+"""
+Tests du regroupement des lectures (SingleFlightService) : partage, erreurs,
+délais d'attente, échéance du premier appelant et sessions sur le primaire
+"""
+import threading
+import time
+
+import pytest
+
+from config.database import SESSION_PRIMARY_UNTIL, DeadlineExceeded, LazyConnection
+from services.single_flight_service import SingleFlightService, SingleFlightTimeout
+
+
+@pytest.fixture
+def service():
+    return SingleFlightService(timeouts={"lent": 0.1}, default_timeout=5.0)
+
+
+def start_leader(service, key, fn):
+    """Lance un premier appelant dans un thread et attend que son appel soit en cours"""
+    started = threading.Event()
+    outcome = {}
+
+    def run():
+        def leader_fn():
+            started.set()
+            return fn()
+        try:
+            outcome["result"] = service.do(key, leader_fn)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    assert started.wait(1)
+    return thread, outcome
+
+
+def test_concurrent_callers_share_one_execution(service):
+    release = threading.Event()
+    thread, outcome = start_leader(service, ("produit", 1), lambda: release.wait(1) and "produit 1")
+    follower = {}
+    follower_thread = threading.Thread(
+        target=lambda: follower.setdefault("result", service.do(("produit", 1), lambda: "autre lecture"))
+    )
+    follower_thread.start()
+    time.sleep(0.05)
+    release.set()
+    thread.join()
+    follower_thread.join()
+    assert outcome["result"] == follower["result"] == "produit 1"
+    assert service.stats()["executed"] == 1
+    assert service.stats()["shared"] == 1
+    assert service.stats()["in_flight"] == 0
+
+
+def test_error_is_propagated_to_followers(service):
+    release = threading.Event()
+
+    def failing():
+        release.wait(1)
+        raise ValueError("lecture en échec")
+
+    thread, outcome = start_leader(service, ("produit", 2), failing)
+    errors = []
+
+    def follow():
+        try:
+            service.do(("produit", 2), lambda: "jamais exécutée")
+        except ValueError as e:
+            errors.append(e)
+
+    follower_thread = threading.Thread(target=follow)
+    follower_thread.start()
+    time.sleep(0.05)
+    release.set()
+    thread.join()
+    follower_thread.join()
+    assert isinstance(outcome["error"], ValueError)
+    assert len(errors) == 1
+    assert service.stats()["errors"] == 1
+
+
+def test_follower_times_out_while_leader_runs(service):
+    release = threading.Event()
+    thread, _ = start_leader(service, ("lent",), lambda: release.wait(1))
+    started = time.monotonic()
+    with pytest.raises(SingleFlightTimeout):
+        service.do(("lent",), lambda: "jamais exécutée")
+    assert time.monotonic() - started < 0.5
+    release.set()
+    thread.join()
+    assert service.stats()["timeouts"] == 1
+
+
+def test_leader_deadline_is_not_passed_to_followers(service):
+    release = threading.Event()
+
+    def leader_fn():
+        release.wait(1)
+        raise DeadlineExceeded("échéance du premier appelant")
+
+    thread, outcome = start_leader(service, ("produit", 3), leader_fn)
+    follower = {}
+    follower_thread = threading.Thread(
+        target=lambda: follower.setdefault("result", service.do(("produit", 3), lambda: "lecture du suivant"))
+    )
+    follower_thread.start()
+    time.sleep(0.05)
+    release.set()
+    thread.join()
+    follower_thread.join()
+    assert isinstance(outcome["error"], DeadlineExceeded)
+    assert follower["result"] == "lecture du suivant"
+    assert service.stats()["retried"] == 1
+
+
+def test_sessions_reading_their_writes_are_not_coalesced(service):
+    release = threading.Event()
+    thread, _ = start_leader(service, ("produit", 4), lambda: release.wait(1) and "avant l'écriture")
+
+    pinned = LazyConnection()
+    pinned.pin_primary()
+    recent_writer = LazyConnection({SESSION_PRIMARY_UNTIL: time.time() + 60})
+    assert service.do(("produit", 4), lambda: "après l'écriture", connection=pinned) == "après l'écriture"
+    assert service.do(("produit", 4), lambda: "après l'écriture", connection=recent_writer) == "après l'écriture"
+    assert service.stats()["bypassed"] == 2
+
+    release.set()
+    thread.join()
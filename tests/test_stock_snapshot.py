@@ -0,0 +1,69 @@
+"""
+Tests de la prise d'instantanés des stocks (StockSnapshot.take)
+Les instructions sont enregistrées par une connexion factice
+"""
+from models.stock_model import StockSnapshot
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+        self._row = None
+
+    def execute(self, statement, params=()):
+        self.connection.statements.append((statement, params))
+        self._row = None
+        if "MAX(last_movement_id)" in statement:
+            self._row = (self.connection.last_snapshot,)
+        elif statement.startswith("SELECT id_movement"):
+            start, margin = params
+            # Mouvements (id, âge en secondes) : le plus grand ID assez ancien
+            eligible = [id_m for id_m, age in self.connection.movements if id_m > start and age > margin]
+            self._row = (max(eligible),) if eligible else None
+        elif statement.startswith("INSERT IGNORE"):
+            self.rowcount = 1
+
+    def fetchone(self):
+        return self._row
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, last_snapshot, movements):
+        self.last_snapshot = last_snapshot
+        self.movements = movements
+        self.statements = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def snapshot_ranges(connection):
+    return [params for statement, params in connection.statements if statement.startswith("INSERT IGNORE")]
+
+
+def test_recent_movements_are_left_for_the_next_snapshot():
+    connection = FakeConnection(10, [(11, 600), (12, 300), (13, 5), (14, 1)])
+    assert StockSnapshot.take(connection, chunk_size=100, safety_margin=120) == 1
+    assert snapshot_ranges(connection) == [(10, 12)]
+
+
+def test_nothing_old_enough_writes_nothing():
+    connection = FakeConnection(10, [(11, 5)])
+    assert StockSnapshot.take(connection, chunk_size=100, safety_margin=120) == 0
+    assert snapshot_ranges(connection) == []
+
+
+def test_ranges_are_chunked():
+    connection = FakeConnection(0, [(id_m, 600) for id_m in range(1, 26)])
+    StockSnapshot.take(connection, chunk_size=10, safety_margin=120)
+    assert snapshot_ranges(connection) == [(0, 10), (10, 20), (20, 25)]